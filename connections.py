@@ -1,8 +1,14 @@
-from typing import Dict, List, Optional
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
 from fastapi import WebSocket
 from logger import logger
 from screens import Screen, screen_manager
 
+# A healthy kiosk acks a frame in milliseconds; anything slower than this
+# is a half-dead socket and gets dropped rather than holding up the batch.
+SEND_TIMEOUT_S = 2.0
+
 
 class ConnectionManager:
     def __init__(self):
@@ -52,9 +58,14 @@ class ConnectionManager:
                 websocket, str(screen.id), screen.connected, screen.client_host
             )
 
-    def disconnect(self, screen_id: str):
-        logger.warning("Screen %s disconnected", screen_id)
+    def disconnect(self, screen_id: str, websocket: Optional[WebSocket] = None):
         screen_index = int(screen_id) - 1
+        if (websocket is not None and 0 <= screen_index < len(screen_manager.screens)
+                and screen_manager.screens[screen_index].websocket is not websocket):
+            # A socket we already dropped (see _drop) finally noticed; the
+            # screen may have reconnected since — leave it alone.
+            return
+        logger.warning("Screen %s disconnected", screen_id)
         if 0 <= screen_index < len(screen_manager.screens):
             screen_manager.screens[screen_index].connected = False
             screen_manager.screens[screen_index].client_host = None
@@ -71,35 +82,102 @@ class ConnectionManager:
         if websocket in self.admin_connections:
             self.admin_connections.remove(websocket)
 
-    async def notify_screen(self, screen: Screen):
-        logger.info("Attempting to broadcast message to screen %i", screen.id)
-
+    def _reload_message(self, screen: Screen) -> dict:
         # Compute the screen's CURRENT content URL via the module registry, so
         # the client doesn't have to trust its stale window.contentUrl from
         # when the frame first loaded. The URL we send is a path (leading
         # slash) for backend-served types and an absolute URL for external
         # ones (e.g. type=url). screen.js resolves to the full URL.
+        # Resolved through the same per-screen cache as the page render.
         content_url = None
         try:
-            from modules import registry as _reg
-            from modules.base import DisplayModule
-            from modules.default import DefaultModule
-            m = _reg.get(screen.type)
-            if not isinstance(m, DisplayModule) or not _reg.is_enabled(m.id):
-                m = DefaultModule()
-            content_url = m.get_screen_url(screen, "/")
+            from modules.content_url import content_urls
+            content_url = content_urls.url(screen, "/")
         except Exception as e:
             logger.warning("notify_screen: could not compute content_url: %s", e)
 
-        message = {
+        return {
             "type": "reload",
             "content_url": content_url,
         }
-        if screen.connected:
-            logger.info("Notifying screen %i: %s", screen.id, message)
-            await screen.websocket.send_json(message)
+
+    async def _send(self, screen: Screen, message: dict, timeout: float = SEND_TIMEOUT_S) -> dict:
+        """Send one message to one screen under a deadline. Never raises:
+        returns {"id", "ok", "latency_ms"} plus "reason" on failure. A
+        socket that errors or times out is dropped (see _drop)."""
+        if not screen.connected or screen.websocket is None:
+            return {"id": screen.id, "ok": False, "latency_ms": None, "reason": "not connected"}
+        websocket = screen.websocket
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(websocket.send_json(message), timeout)
+        except asyncio.TimeoutError:
+            reason = f"send timed out after {timeout:g}s"
+        except Exception as e:
+            reason = str(e) or e.__class__.__name__
         else:
+            return {"id": screen.id, "ok": True,
+                    "latency_ms": round((time.monotonic() - started) * 1000, 1)}
+        logger.warning("Dropping screen %i: %s", screen.id, reason)
+        await self._drop(screen, websocket)
+        return {"id": screen.id, "ok": False,
+                "latency_ms": round((time.monotonic() - started) * 1000, 1), "reason": reason}
+
+    async def _drop(self, screen: Screen, websocket: WebSocket):
+        """Mark a screen whose socket failed as disconnected, tell the admin
+        clients, and close the socket in the background. The kiosk's own
+        reconnect loop brings it back."""
+        if screen.websocket is not websocket:
+            return
+        screen.connected = False
+        screen.client_host = None
+        screen.websocket = None
+
+        async def _close():
+            try:
+                await asyncio.wait_for(websocket.close(code=1011), SEND_TIMEOUT_S)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(_close())
+        await self.broadcast_screen_status(str(screen.id), False)
+
+    async def notify_many(
+        self, screens: Iterable[Screen], timeout: float = SEND_TIMEOUT_S
+    ) -> List[dict]:
+        """Send a reload to every given screen concurrently. One outcome
+        per screen, in order: {"id", "ok", "latency_ms"} plus "reason"
+        when it wasn't delivered ("not connected", a send error, or a
+        timeout — the latter two also drop the screen's socket)."""
+        screens = list(screens)
+        outcomes = await asyncio.gather(
+            *(self._send(s, self._reload_message(s), timeout) for s in screens)
+        )
+        sent = sum(1 for o in outcomes if o["ok"])
+        logger.info("Reload sent to %d/%d screens", sent, len(screens))
+        return list(outcomes)
+
+    async def notify_screen(self, screen: Screen):
+        logger.info("Attempting to broadcast message to screen %i", screen.id)
+        if not screen.connected:
             logger.warning("No active connections for screen %i", screen.id)
+            return
+        outcome = (await self.notify_many([screen]))[0]
+        if not outcome["ok"]:
+            raise ConnectionError(outcome["reason"])
+
+    async def push_gradient(self, screen: Screen, spec: dict) -> bool:
+        """Send a live gradient spec to a screen. screen.js forwards it to
+        the open gradient page, which re-renders in place (no reload).
+        Returns False if the screen isn't reachable or its screen.js
+        predates pushes: that one treats every frame as a reload, so it's
+        left to the gradient page's fallback poll until it reloads."""
+        websocket = screen.websocket
+        caps = websocket.query_params.get("caps", "") if websocket is not None else ""
+        if "gradient" not in caps.split(","):
+            return False
+        outcome = await self._send(screen, {"type": "gradient", "spec": spec})
+        return outcome["ok"]
 
     async def send_screen_status(
         self, websocket: WebSocket, screen_id: str, connected: bool, client_host: Optional[str] = None
@@ -122,14 +200,17 @@ class ConnectionManager:
             "client_host": client_host,
         }
 
-        # Use a list to avoid "dictionary changed size during iteration" errors
+        # Snapshot the list to avoid "changed size during iteration" errors;
+        # send to all admins at once so one stuck tab can't stall the rest.
+        clients = list(self.admin_connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(client.send_json(message), SEND_TIMEOUT_S) for client in clients),
+            return_exceptions=True,
+        )
         clients_to_remove = []
-
-        for client in self.admin_connections:
-            try:
-                await client.send_json(message)
-            except Exception as e:
-                logger.error("Error sending to admin client: %s", str(e))
+        for client, result in zip(clients, results):
+            if isinstance(result, BaseException):
+                logger.error("Error sending to admin client: %s", str(result) or result.__class__.__name__)
                 clients_to_remove.append(client)
 
         # Remove disconnected clients
@@ -139,8 +220,6 @@ class ConnectionManager:
 
     def broadcast_screen_status_sync(self, screen_id: str, connected: bool):
         """Non-async version to be called from disconnect method"""
-        import asyncio
-
         # Create event loop or use existing one
         try:
             loop = asyncio.get_event_loop()
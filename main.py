@@ -5,24 +5,38 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from routes import router
-from mcps.audio.server import server as audio_mcp_server
-from mcps.displays.server import server as displays_mcp_server
-from mcps.lighting.server import server as lighting_mcp_server
-from mcps.music.server import server as music_mcp_server
-from mcps.screens.server import server as screens_mcp_server
-from mcps.vlc.server import server as vlc_mcp_server
+from static_assets import static_assets
+from templating import precompile
+from mcps.mount import mount_all as mount_mcp_servers
+from news import news_manager
+from models.media import media_library
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Scan the media folders and start the watcher now rather than on the
+    # first admin listing: on a station only kiosks call in, and the
+    # slideshow pages would otherwise read a never-refreshed index.
+    media_library.ensure_running()
+    yield
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 # Mount a static folder (optional)
 app.mount("/static", StaticFiles(directory="static"), name="static")
-
-templates = Jinja2Templates(directory="templates")
+# Fingerprint + precompress JS/CSS/images once; templates link them through
+# static_url() as /assets/<digest>/... (routes/asset_routes.py).
+static_assets.build()
+# Compile every template now (or load it from the bytecode cache) rather
+# than on the first kiosk's request.
+precompile()
 
 # add routes from routes.py
 app.include_router(router)
@@ -30,14 +44,16 @@ app.include_router(router)
 # MCP servers — in-process, mounted under /mcp/<domain>.
 # Each one wraps the corresponding domain's Python module APIs and is
 # usable by any MCP client (Claude Code, our own agents in later phases).
-app.mount("/mcp/lighting", lighting_mcp_server.sse_app())
-app.mount("/mcp/screens", screens_mcp_server.sse_app())
-app.mount("/mcp/displays", displays_mcp_server.sse_app())
-app.mount("/mcp/audio", audio_mcp_server.sse_app())
-app.mount("/mcp/music", music_mcp_server.sse_app())
-app.mount("/mcp/vlc", vlc_mcp_server.sse_app())
+# Each is imported and built on its first request (mcps/mount.py).
+mount_mcp_servers(app)
+
+# Load the news store in the background while uvicorn starts serving;
+# screens don't need it (news/manager.py).
+news_manager.preload()
 
 if __name__ == "__main__":
+    # Development: pick up template edits without a restart.
+    os.environ.setdefault("TEMPLATES_AUTO_RELOAD", "1")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -5,12 +5,17 @@ External MCP clients (Claude Code, Anthropic SDK) connect to
 http://<host>:8000/mcp/lighting/sse over the SSE transport. The
 in-admin chat agent (Phase 2 onward) will attach to the same server.
 
-Tools wrap the existing HueClient directly — no HTTP round-trip back
-through /api/modules/hue/* — so latency stays at one bridge hop.
+Tools wrap the module's pooled AsyncHueClient directly — no HTTP
+round-trip back through /api/modules/hue/* — so latency stays at one
+bridge hop, and a slow bridge only stalls the tool call that's waiting
+on it (never the shared event loop). The list_* reads come from the
+module's shared state mirror and light / group writes are queued on its
+command scheduler, same as the HTTP routes.
 """
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 from mcp.server.fastmcp import FastMCP
@@ -18,7 +23,7 @@ from mcp.server.transport_security import TransportSecuritySettings
 
 from mcps.lighting.startup_test import run_startup_test as _run_startup_test
 from modules import registry
-from modules.hue.client import HueClient
+from modules.hue.client import AsyncHueClient
 
 
 # The MCP server lives behind the LAN-only studiopi firewall and is
@@ -36,15 +41,15 @@ server = FastMCP("lighting", transport_security=_TRANSPORT)
 # --------------------------------------------------------------------------
 
 
-def _client() -> HueClient:
-    """Resolve the live HueClient from the module registry. Raises a
+async def _client() -> AsyncHueClient:
+    """Resolve the live AsyncHueClient from the module registry. Raises a
     RuntimeError with an operator-facing message if the bridge isn't paired
     or the module isn't loaded; FastMCP turns this into a tool error result
     the calling agent can read and react to."""
     module = registry.get("hue")
     if module is None:
         raise RuntimeError("Hue module not registered in this server")
-    client = getattr(module, "client", None)
+    client = await module.get_async_client()
     if client is None:
         raise RuntimeError(
             "Hue bridge not paired — run `python3 scripts/hue_pair.py` on studiopi"
@@ -52,6 +57,23 @@ def _client() -> HueClient:
     return client
 
 
+async def _scheduler():
+    """The module's command scheduler, once the bridge is known to be
+    paired (same errors as `_client`)."""
+    await _client()
+    return registry.get("hue").scheduler
+
+
+async def _mirrored(part: str) -> dict:
+    """lights / groups / scenes from the shared mirror snapshot; falls back
+    to a direct bridge read (and its error) if the mirror never filled."""
+    client = await _client()
+    snap = await registry.get("hue").mirror.snapshot()
+    if not snap.fetched_at:
+        return await getattr(client, f"get_{part}")()
+    return getattr(snap, part)
+
+
 def _pct_to_bri(pct: int) -> int:
     """Brightness percent (0–100) → Hue bri byte (1–254). 0% maps to bri=1
     + on=False; values above 0 keep the lamp on."""
@@ -124,18 +146,18 @@ def _build_state(
 
 
 @server.tool()
-def list_lights() -> dict:
+async def list_lights() -> dict:
     """List every Hue light with its current state.
 
     Returns the raw Hue v1 lights map keyed by light id, e.g.
     ``{"1": {"name": "Maker Light", "state": {"on": true, "bri": 254, ...}, ...}}``.
     Use the light id (the dict key, a string) for set_light calls.
     """
-    return _client().get_lights()
+    return await _mirrored("lights")
 
 
 @server.tool()
-def list_groups() -> dict:
+async def list_groups() -> dict:
     """List Hue groups (rooms / zones) and their members.
 
     Returns the raw Hue v1 groups map. Each group has ``name``, ``lights``
@@ -144,25 +166,26 @@ def list_groups() -> dict:
     The Studio room is typically id "81" (Studio) and the Maker room
     is a separate id — check by name to be sure.
     """
-    return _client().get_groups()
+    return await _mirrored("groups")
 
 
 @server.tool()
-def list_scenes() -> dict:
+async def list_scenes() -> dict:
     """List Hue Bridge-defined scenes (the ones the user set up in the
     Hue app). Returns the raw scenes map keyed by scene id. Use the
     scene id with recall_scene to activate it."""
-    return _client().get_scenes()
+    return await _mirrored("scenes")
 
 
 @server.tool()
-def get_bridge_status() -> dict:
+async def get_bridge_status() -> dict:
     """Return the Hue Bridge config + reachability.
 
     Includes bridge name, software version, and ip — does NOT include
     the API username (semi-sensitive). Useful for diagnostics when
     tools start failing."""
-    cfg = _client().get_config()
+    client = await _client()
+    cfg = await client.get_config()
     # Strip whitelist (contains usernames) just in case.
     if isinstance(cfg, dict):
         cfg = {k: v for k, v in cfg.items() if k != "whitelist"}
@@ -175,7 +198,7 @@ def get_bridge_status() -> dict:
 
 
 @server.tool()
-def set_light(
+async def set_light(
     light_id: str,
     on: bool | None = None,
     brightness_pct: int | None = None,
@@ -198,11 +221,11 @@ def set_light(
     state = _build_state(on, brightness_pct, color_hex, kelvin)
     if not state:
         return {"error": "no state parameters provided"}
-    return _client().set_light(light_id, state)
+    return await (await _scheduler()).set_light(light_id, state)
 
 
 @server.tool()
-def set_group(
+async def set_group(
     group_id: str,
     on: bool | None = None,
     brightness_pct: int | None = None,
@@ -220,11 +243,11 @@ def set_group(
     state = _build_state(on, brightness_pct, color_hex, kelvin)
     if not state:
         return {"error": "no state parameters provided"}
-    return _client().set_group(group_id, state)
+    return await (await _scheduler()).set_group(group_id, state)
 
 
 @server.tool()
-def set_zone_lights(
+async def set_zone_lights(
     zone: str,
     on: bool | None = None,
     brightness_pct: int | None = None,
@@ -259,34 +282,38 @@ def set_zone_lights(
     state = _build_state(on, brightness_pct, color_hex, kelvin)
     if not state:
         return {"error": "no state parameters provided"}
-    client = _client()
-    results = {str(lid): client.set_light(str(lid), state) for lid in light_ids}
+    # Queued together, so lights sharing one bridge group go out as a
+    # single group action and the rest are paced to the bridge's budget.
+    scheduler = await _scheduler()
+    ids = [str(lid) for lid in light_ids]
+    replies = await asyncio.gather(*(scheduler.set_light(lid, state) for lid in ids))
+    results = dict(zip(ids, replies))
     return {"ok": True, "zone": zin, "name": z.get("name"),
             "lights": light_ids, "results": results}
 
 
 @server.tool()
-def recall_scene(scene_id: str) -> dict:
+async def recall_scene(scene_id: str) -> dict:
     """Activate a Hue scene by id. Scene ids come from list_scenes.
 
     The Hue Bridge applies the scene's per-light state to every light
     in the scene — typically faster and more reliable than fanning out
     per-light writes."""
-    return _client().recall_scene(scene_id)
+    return await (await _scheduler()).recall_scene(scene_id)
 
 
 @server.tool()
-def all_on() -> dict:
+async def all_on() -> dict:
     """Turn on every light known to the bridge (group 0). Convenience
     alias for set_group("0", on=True)."""
-    return _client().all_on()
+    return await (await _scheduler()).set_group("0", {"on": True})
 
 
 @server.tool()
-def all_off() -> dict:
+async def all_off() -> dict:
     """Turn off every light known to the bridge (group 0). Convenience
     alias for set_group("0", on=False)."""
-    return _client().all_off()
+    return await (await _scheduler()).set_group("0", {"on": False})
 
 
 # --------------------------------------------------------------------------
@@ -311,4 +338,6 @@ async def run_startup_test() -> dict:
     can render colors + dim correctly. Safe to re-run; the only state it
     leaves behind is the final settle. Returns a summary of what ran.
     """
-    return await _run_startup_test(_client())
+    scheduler = await _scheduler()
+    return await _run_startup_test(await _client(), scheduler,
+                                   registry.get("hue").entertainment)
@@ -0,0 +1,52 @@
+"""Mount the in-process MCP servers under /mcp/<domain> without importing
+them at startup.
+
+main.py used to import all six servers up front. That pulls in the `mcp`
+SDK, plus `requests`/`urllib3`, the HEOS/Spotify clients and the audio
+backends, and it was about a third of the import time. The server is
+restarted on every deploy (pi-update.sh), so that time was spent with
+every screen blank. The MCPs are only used when an agent or Claude Code
+connects, so each one is now a placeholder ASGI app. The first request to
+/mcp/<domain>/... imports the server module (in a worker thread, so the
+loop keeps serving screens) and builds its SSE app; later requests go
+straight to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+
+# Domain -> module whose `server` is the FastMCP instance.
+DOMAINS = ("lighting", "screens", "displays", "audio", "music", "vlc")
+
+
+class LazyMCPApp:
+    """ASGI app that builds `mcps.<domain>.server`'s SSE app on first use."""
+
+    def __init__(self, domain: str) -> None:
+        self.domain = domain
+        self._app = None
+        self._lock: asyncio.Lock | None = None
+
+    async def _build(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._app is None:
+                module = await asyncio.to_thread(
+                    importlib.import_module, f"mcps.{self.domain}.server"
+                )
+                self._app = module.server.sse_app()
+                print(f"[mcp] /mcp/{self.domain} ready")
+        return self._app
+
+    async def __call__(self, scope, receive, send) -> None:
+        app = self._app or await self._build()
+        await app(scope, receive, send)
+
+
+def mount_all(app) -> None:
+    """Mount every domain at /mcp/<domain> (SSE endpoint /mcp/<domain>/sse)."""
+    for domain in DOMAINS:
+        app.mount(f"/mcp/{domain}", LazyMCPApp(domain))
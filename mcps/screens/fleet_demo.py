@@ -90,15 +90,11 @@ async def _apply_mode_to_targets(
     # per-screen.
     screen_manager.save_screens()
 
-    for screen in targets:
-        if not screen.connected:
-            skipped.append({"id": screen.id, "reason": "not connected"})
-            continue
-        try:
-            await connection_manager.notify_screen(screen=screen)
-            notified.append(screen.id)
-        except Exception as e:  # noqa: BLE001
-            skipped.append({"id": screen.id, "reason": str(e)})
+    for o in await connection_manager.notify_many(targets):
+        if o["ok"]:
+            notified.append(o["id"])
+        else:
+            skipped.append({"id": o["id"], "reason": o["reason"]})
 
     return {"notified": notified, "skipped": skipped}
 
@@ -10,13 +10,13 @@ in-process pattern as the Lighting MCP, one less hop, no HTTP roundtrip.
 
 from __future__ import annotations
 
-import os
 from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
 from connections import connection_manager
+from models.media import media_library
 from models.scenes import scene_manager
 from modules import registry
 from modules.base import DisplayModule
@@ -32,12 +32,6 @@ _TRANSPORT = TransportSecuritySettings(enable_dns_rebinding_protection=False)
 server = FastMCP("screens", transport_security=_TRANSPORT)
 
 
-# Where the upload routes already stash media. Kept in sync with
-# routes/api_routes.py (PICTURE_FOLDER / VIDEO_FOLDER / PDF_FOLDER).
-PICTURE_FOLDER = "static/pictures"
-VIDEO_FOLDER = "static/videos"
-PDF_FOLDER = "static/pdfs"
-
 # Type-specific value field on the Screen model.
 _CONTENT_VALUE_FIELD = {
     "text": "text",
@@ -72,23 +66,6 @@ def _find_screen(screen_id: int):
     return next((s for s in screen_manager.screens if s.id == screen_id), None)
 
 
-def _list_dir(path: str, exts: tuple[str, ...]) -> list[str]:
-    if not os.path.isdir(path):
-        return []
-    return sorted(
-        f for f in os.listdir(path)
-        if f.lower().endswith(exts) and os.path.isfile(os.path.join(path, f))
-    )
-
-
-def _list_subfolders(path: str) -> list[str]:
-    if not os.path.isdir(path):
-        return []
-    return sorted(
-        f for f in os.listdir(path) if os.path.isdir(os.path.join(path, f))
-    )
-
-
 # --------------------------------------------------------------------------
 # Tools — read
 # --------------------------------------------------------------------------
@@ -136,7 +113,7 @@ def list_content_types() -> dict:
 
 
 @server.tool()
-def list_media() -> dict:
+async def list_media() -> dict:
     """List every piece of media available on disk for the screens.
 
     Returns a dict with four keys: ``pictures`` (flat list of files in
@@ -146,14 +123,50 @@ def list_media() -> dict:
     Use these values for the ``content_value`` argument of
     `set_screen_content`.
     """
+    media_library.ensure_running()
     return {
-        "pictures": _list_dir(PICTURE_FOLDER, (".png", ".jpg", ".jpeg", ".gif")),
-        "videos": _list_dir(VIDEO_FOLDER, (".mp4", ".webm", ".mov", ".m4v")),
-        "pdfs": _list_dir(PDF_FOLDER, (".pdf",)),
-        "slideshows": _list_subfolders(PICTURE_FOLDER),
+        "pictures": media_library.names("picture"),
+        "videos": media_library.names("video"),
+        "pdfs": media_library.names("pdf"),
+        "slideshows": media_library.slideshows(),
     }
 
 
+@server.tool()
+async def search_media(
+    kind: Optional[str] = None,
+    folder: Optional[str] = None,
+    query: Optional[str] = None,
+    orientation: Optional[str] = None,
+    sort: str = "name",
+    descending: bool = False,
+    offset: int = 0,
+    limit: int = 50,
+) -> dict:
+    """Search the media library with metadata, filters and pagination.
+
+    - ``kind``: ``picture``, ``video`` or ``pdf`` (omit for all).
+    - ``folder``: picture folder, ``Root`` for top-level files.
+    - ``query``: case-insensitive substring of the path.
+    - ``orientation``: ``horizontal``, ``vertical`` or ``square`` — match
+      it to the zone's orientation when picking content for a screen.
+    - ``sort``: ``name``, ``mtime`` or ``size``; ``descending`` flips it.
+    - ``offset`` / ``limit``: pagination (limit capped at 200).
+
+    Returns ``total`` plus ``items``, each with ``kind``, ``path`` (the
+    value to pass to `set_screen_content`, except pictures, which need the
+    folder prefix: ``Root/<file>`` for top-level ones), ``folder``,
+    ``name``, ``size``, ``mtime``, ``width``, ``height``, ``duration``
+    (videos), ``pages`` (PDFs), ``sha256`` and ``orientation``. Metadata
+    is probed in the background, so a just-added file may show nulls.
+    """
+    media_library.ensure_running()
+    return media_library.query(
+        kind=kind, folder=folder, search=query, orientation=orientation,
+        sort=sort, descending=descending, offset=offset, limit=max(1, min(limit, 200)),
+    )
+
+
 # --------------------------------------------------------------------------
 # Tools — write
 # --------------------------------------------------------------------------
@@ -247,17 +260,9 @@ async def reload_all_screens() -> dict:
     """Bounce every connected screen — broadcasts a reload over each
     live WebSocket so all stations pick up their current content
     fresh. Disconnected screens are listed under ``skipped``."""
-    notified: list[int] = []
-    skipped: list[dict] = []
-    for screen in screen_manager.screens:
-        if not screen.connected:
-            skipped.append({"id": screen.id, "reason": "not connected"})
-            continue
-        try:
-            await connection_manager.notify_screen(screen=screen)
-            notified.append(screen.id)
-        except Exception as e:  # noqa: BLE001
-            skipped.append({"id": screen.id, "reason": str(e)})
+    outcomes = await connection_manager.notify_many(screen_manager.screens)
+    notified = [o["id"] for o in outcomes if o["ok"]]
+    skipped = [{"id": o["id"], "reason": o["reason"]} for o in outcomes if not o["ok"]]
     return {
         "notified": notified,
         "skipped": skipped,
@@ -288,14 +293,14 @@ async def apply_brand(brand_id: str) -> dict:
 
 
 @server.tool()
-def save_brand(brand_id: str) -> dict:
+async def save_brand(brand_id: str) -> dict:
     """Save the CURRENT studio state as a brand profile (brand_id 'ikea' or
     'accenture'). Captures each zone's current light colour AND screen content
     and persists them, so live tweaks (e.g. after changing zone lights) become
     the brand default. Use after the operator says "save this as the IKEA
     profile" / "update the Accenture profile"."""
     from models.brands import save_brand_profile
-    return save_brand_profile(brand_id)
+    return await save_brand_profile(brand_id)
 
 
 @server.tool()
@@ -8,6 +8,7 @@ zones' gradient screens then mimic those colours automatically.
 
 from __future__ import annotations
 
+import asyncio
 import colorsys
 import json
 from pathlib import Path
@@ -109,29 +110,65 @@ def get_brand(brand_id: str) -> dict | None:
     return load_brands().get((brand_id or "").strip().lower())
 
 
-def apply_zone_lights(lights_map: dict) -> dict:
+# Brand changes crossfade over this long (streamed; skipped without an
+# Entertainment group) before the final state is committed over REST.
+BRAND_FADE_S = 1.5
+
+
+async def _fade_to(mod, targets: dict[str, str]) -> None:
+    """Stream a crossfade from the lights' current colours to `targets`
+    ({light_id: "#hex"}). Purely cosmetic — the caller still commits the
+    end state through the scheduler, so any failure here is ignored."""
+    from models.studio_map import light_to_hex
+    from modules.hue.entertainment import hex_to_rgb
+
+    if not targets:
+        return
+    try:
+        lights = (await mod.mirror.snapshot()).lights
+        start = {}
+        for lid in targets:
+            hexc = light_to_hex((lights.get(lid) or {}).get("state", {}))
+            if hexc:
+                start[lid] = hex_to_rgb(hexc)
+        end = {lid: hex_to_rgb(hexc) for lid, hexc in targets.items()}
+        await mod.entertainment.crossfade(start, end, BRAND_FADE_S)
+    except Exception as e:
+        print(f"[brands] crossfade skipped: {e}")
+
+
+async def apply_zone_lights(lights_map: dict) -> dict:
     """Set each zone's mapped Hue lights to a saved per-zone colour."""
     from modules import registry
     from models.studio_map import load_map
 
     mod = registry.get("hue")
-    client = getattr(mod, "client", None) if mod else None
+    client = await mod.get_async_client() if mod else None
     if client is None:
         return {"ok": False, "error": "hue unavailable"}
     zmap = load_map().get("popup", {})
     applied: dict = {}
+    targets: dict[str, str] = {}
     for zone, hexc in (lights_map or {}).items():
         z = zmap.get(zone)
         if not isinstance(z, dict) or not hexc:
             continue
-        hh, ss = hex_to_hue_sat(hexc)
         for lid in (z.get("light_ids") or []):
-            client.set_light(str(lid), {"on": True, "bri": 254, "hue": hh, "sat": ss})
+            targets[str(lid)] = hexc
         applied[zone] = hexc
+    await _fade_to(mod, targets)
+    writes = []
+    for lid, hexc in targets.items():
+        hh, ss = hex_to_hue_sat(hexc)
+        writes.append(mod.scheduler.set_light(
+            lid, {"on": True, "bri": 254, "hue": hh, "sat": ss}))
+    # All zones queued at once: the scheduler paces them to the bridge and
+    # folds same-colour lights into group actions.
+    await asyncio.gather(*writes)
     return {"ok": True, "zone_lights": applied}
 
 
-def save_brand_profile(brand_id: str) -> dict:
+async def save_brand_profile(brand_id: str) -> dict:
     """Capture the CURRENT studio state (per-zone light colour + per-zone screen
     content) and persist it as this brand's profile, so live tweaks become the
     brand default. Stored in data/brand_profiles.json (merged over the seed)."""
@@ -143,7 +180,7 @@ def save_brand_profile(brand_id: str) -> dict:
     from screens import screen_manager
 
     zmap = load_map().get("popup", {})
-    lights_all = _all_lights()
+    lights_all = await _all_lights()
     by_id = {s.id: s for s in screen_manager.screens}
     lights: dict = {}
     content: dict = {}
@@ -167,18 +204,26 @@ def save_brand_profile(brand_id: str) -> dict:
     return {"ok": True, "brand": bid, "lights": lights, "content": content}
 
 
-def apply_lighting(brand: dict) -> dict:
+async def apply_lighting(brand: dict) -> dict:
     """Drive the real Hue lights to the brand palette. Best-effort."""
     from modules import registry
 
     mod = registry.get("hue")
-    client = getattr(mod, "client", None) if mod else None
+    client = await mod.get_async_client() if mod else None
     if client is None:
         return {"ok": False, "error": "hue unavailable"}
+    groups = mod.mirror.current.groups
+    targets: dict[str, str] = {}
+    for gid, hexc in ((_STUDIO_GROUP, brand["primary"]), (_MAKER_GROUP, brand["secondary"])):
+        for lid in (groups.get(gid) or {}).get("lights") or []:
+            targets[str(lid)] = hexc
+    await _fade_to(mod, targets)
     ph, ps = hex_to_hue_sat(brand["primary"])
     sh, ss = hex_to_hue_sat(brand["secondary"])
-    client.set_group(_STUDIO_GROUP, {"on": True, "bri": 254, "hue": ph, "sat": ps})
-    client.set_group(_MAKER_GROUP, {"on": True, "bri": 220, "hue": sh, "sat": ss})
+    await asyncio.gather(
+        mod.scheduler.set_group(_STUDIO_GROUP, {"on": True, "bri": 254, "hue": ph, "sat": ps}),
+        mod.scheduler.set_group(_MAKER_GROUP, {"on": True, "bri": 220, "hue": sh, "sat": ss}),
+    )
     return {"ok": True, "studio": brand["primary"], "maker": brand["secondary"]}
 
 
@@ -194,9 +239,9 @@ async def apply_brand_full(brand_id: str) -> dict:
     # If a saved profile captured per-zone light colours, restore those;
     # otherwise use the seed's primary/secondary group palette.
     if brand.get("lights"):
-        lighting = apply_zone_lights(brand["lights"])
+        lighting = await apply_zone_lights(brand["lights"])
     else:
-        lighting = apply_lighting(brand)
+        lighting = await apply_lighting(brand)
 
     from connections import connection_manager
     from screens import screen_manager
@@ -232,11 +277,10 @@ async def apply_brand_full(brand_id: str) -> dict:
     if gradient_screens or picture_screens:
         # Persist FIRST, then tell screens to reload — otherwise a reload can
         # race ahead of the save and re-show stale content (seen on screen F).
-        screen_manager.save_screens()
-        for sid in (picture_screens + gradient_screens):
-            s = by_id.get(sid)
-            if s is not None and s.connected:
-                await connection_manager.notify_screen(screen=s)
+        await screen_manager.flush()
+        await connection_manager.notify_many(
+            by_id[sid] for sid in (picture_screens + gradient_screens) if sid in by_id
+        )
 
     # Play the brand video on the VLC screen (sourced from the Pi backup
     # media library). Best-effort — VLC may be down/unreachable.
@@ -0,0 +1,201 @@
+"""Bookkeeping shared by the media derived from uploads: picture variants
+(models/pictures.py), video renditions (models/videos.py) and PDF page
+images (models/pdfs.py).
+
+Each of those modules only knows how to render its kind. What they have
+in common lives here, in one `Derivatives` per kind:
+
+  * where a source's manifest is (static/derived/<kind>/<rel>.json), and
+    whether it's current. The manifest records a fingerprint of the
+    source's size and mtime, so a replaced upload is re-derived;
+  * a background queue with the sources that are pending, and the ones
+    that failed in this process (not retried on every page load);
+  * the backfill behind `python -m models.<kind>`.
+
+A render function is either a plain function, run in the process pool,
+or a coroutine function (ffmpeg subprocesses), awaited on the loop.
+Pictures and PDFs share one pool, so together they never take more than
+POOL_WORKERS cores.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+DERIVED_ROOT = Path("static/derived")
+# The Pi has 4 cores; leave two for the server and the browser.
+POOL_WORKERS = 2
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+    return _pool
+
+
+def fingerprint(source: Path) -> str:
+    st = source.stat()
+    return hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:10]
+
+
+class Derivatives:
+    """Manifests, queue and backfill for one kind of derived media.
+
+    `render(rel)` builds everything for one source, writes the manifest
+    (`write_manifest`) and returns it, or returns None if the source can't
+    be used. `available()` says whether its tool (Pillow, ffmpeg, PyMuPDF)
+    is installed; `requires` names it in the backfill's output."""
+
+    def __init__(
+        self,
+        kind: str,
+        source_folder: Path,
+        extensions: tuple[str, ...],
+        render: Callable,
+        available: Callable[[], bool],
+        requires: str,
+        workers: int = POOL_WORKERS,
+    ) -> None:
+        self.kind = kind
+        self.source_folder = source_folder
+        self.derived_folder = DERIVED_ROOT / kind
+        self.extensions = extensions
+        self.render = render
+        self.available = available
+        self.requires = requires
+        self.workers = workers
+        self.pending: set[str] = set()
+        self.failed: set[str] = set()
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    # --- manifests ----------------------------------------------------------
+
+    def paths(self, rel: str) -> tuple[Path, Path]:
+        """(source, manifest) for a path relative to the source folder."""
+        return self.source_folder / rel, self.derived_folder / (rel + ".json")
+
+    def read_manifest(self, rel: str) -> dict | None:
+        """The manifest for a source, or None if there's none or it was
+        made from an earlier version of the file."""
+        source, manifest_path = self.paths(rel)
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("source") == fingerprint(source):
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def write_manifest(self, rel: str, manifest: dict) -> None:
+        _, manifest_path = self.paths(rel)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, manifest_path)
+
+    # --- rendering ----------------------------------------------------------
+
+    async def run(self, rel: str) -> dict | None:
+        """Render one source now (pool or coroutine). Never raises."""
+        if not self.available():
+            return None
+        self.pending.add(rel)
+        manifest = None
+        try:
+            if inspect.iscoroutinefunction(self.render):
+                manifest = await self.render(rel)
+            else:
+                manifest = await asyncio.get_running_loop().run_in_executor(
+                    get_pool(), self.render, rel
+                )
+        except asyncio.TimeoutError:
+            print(f"[{self.kind}] rendering {rel} timed out")
+        except Exception as e:
+            print(f"[{self.kind}] rendering {rel} failed: {e}")
+        finally:
+            self.pending.discard(rel)
+        if manifest is None:
+            self.failed.add(rel)
+        else:
+            self.failed.discard(rel)
+        return manifest
+
+    async def _worker(self) -> None:
+        while True:
+            rel = await self._queue.get()
+            try:
+                # Queued twice, or done by a direct run() meanwhile.
+                if self.read_manifest(rel) is None:
+                    await self.run(rel)
+            finally:
+                self.pending.discard(rel)
+                self._queue.task_done()
+
+    def enqueue(self, rel: str) -> bool:
+        """Queue a source for rendering (needs a running loop). Returns
+        False if it's already queued, the tool is missing, or it isn't
+        this kind of file."""
+        rel = rel.lstrip("/")
+        if rel in self.pending or not self.available() or not rel.lower().endswith(self.extensions):
+            return False
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks[:] = [t for t in self._tasks if not t.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker()))
+        self.failed.discard(rel)
+        self.pending.add(rel)
+        self._queue.put_nowait(rel)
+        return True
+
+    def current(self, rel: str) -> dict | None:
+        """The up-to-date manifest for a source, or None, in which case one
+        is queued in the background (unless it failed before)."""
+        manifest = self.read_manifest(rel)
+        if manifest is None and rel not in self.failed:
+            try:
+                self.enqueue(rel)
+            except RuntimeError:
+                pass  # no loop (script): nothing to queue on
+        return manifest
+
+    def status(self) -> dict:
+        return {"queued": sorted(self.pending), "failed": sorted(self.failed)}
+
+    # --- backfill -----------------------------------------------------------
+
+    def backfill(self) -> None:
+        """Render every source under the source folder that has no
+        up-to-date manifest."""
+        if not self.available():
+            print(f"[{self.kind}] {self.requires} not found; nothing to do")
+            return
+        todo = []
+        for root, _dirs, files in os.walk(self.source_folder):
+            for file in files:
+                if file.lower().endswith(self.extensions) and not file.startswith("."):
+                    rel = os.path.relpath(os.path.join(root, file), self.source_folder)
+                    rel = rel.replace(os.sep, "/")
+                    if self.read_manifest(rel) is None:
+                        todo.append(rel)
+        print(f"[{self.kind}] rendering {len(todo)} file(s)")
+        if inspect.iscoroutinefunction(self.render):
+            results = (asyncio.run(self.render(rel)) for rel in todo)
+            for rel, manifest in zip(todo, results):
+                print(f"  {rel}: {'ok' if manifest else 'failed'}")
+        else:
+            with ProcessPoolExecutor(max_workers=POOL_WORKERS) as pool:
+                for rel, manifest in zip(todo, pool.map(self.render, todo)):
+                    print(f"  {rel}: {'ok' if manifest else 'skipped'}")
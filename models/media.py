@@ -0,0 +1,314 @@
+"""Media library index — what's in static/pictures, static/videos and
+static/pdfs, with per-file metadata, without touching the disk per request.
+
+`/api/pictures` used to walk the whole pictures tree on every call, the
+other listing routes, `/admin/legacy`, the slideshow page and the screens
+MCP each listed directories again. Now one in-memory index answers all of
+them. It's built at startup (main.py's lifespan hook) and then kept fresh:
+by a `watchfiles` watcher when that's installed (uvicorn[standard]), otherwise
+by a stat-only rescan every POLL_INTERVAL_S. Routes that write media
+call `rescan()` so their own change is visible immediately.
+
+A rescan only stats. The expensive metadata is probed in the background
+and cached across restarts in data/media_index.json, keyed on size + mtime
+so a replaced file is re-probed. That metadata is picture dimensions
+(Pillow header read), video dimensions and duration (ffprobe), PDF page
+count and the SHA-256 (reused from the upload hash index when it's
+current).
+
+Entries are dicts: kind, path (relative to the kind's folder, as used in
+screen content values), folder ("Root" for top level), name, size, mtime,
+width, height, duration, pages, sha256, orientation ("horizontal" /
+"vertical" / "square", matching the zone map).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+try:
+    import watchfiles
+    WATCHFILES_AVAILABLE = True
+except ImportError:
+    WATCHFILES_AVAILABLE = False
+    print("Warning: watchfiles not installed. The media index falls back to periodic rescans.")
+
+INDEX_FILE = Path("data/media_index.json")
+POLL_INTERVAL_S = 10.0
+
+FOLDERS = {
+    "picture": "static/pictures",
+    "video": "static/videos",
+    "pdf": "static/pdfs",
+}
+EXTENSIONS = {
+    "picture": (".png", ".jpg", ".jpeg", ".gif"),
+    "video": (".mp4", ".webm", ".mov", ".m4v"),
+    "pdf": (".pdf",),
+}
+SORT_KEYS = ("name", "mtime", "size")
+
+_PAGE_RE = re.compile(rb"/Type\s*/Page(?!s)")
+
+
+def _orientation(width, height) -> str | None:
+    if not width or not height:
+        return None
+    if width == height:
+        return "square"
+    return "horizontal" if width > height else "vertical"
+
+
+# --- metadata probes (worker thread) -----------------------------------------
+
+def _probe_picture(path: str) -> dict:
+    from PIL import Image
+
+    with Image.open(path) as img:
+        width, height = img.size
+        # EXIF orientations 5-8 are rotated 90°: the screen sees them swapped.
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+    return {"width": width, "height": height}
+
+
+def _probe_video(path: str) -> dict:
+    if shutil.which("ffprobe") is None:
+        return {}
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=width,height:format=duration", "-of", "json", path],
+        capture_output=True, text=True, timeout=30,
+    )
+    info = json.loads(out.stdout or "{}")
+    stream = (info.get("streams") or [{}])[0]
+    duration = info.get("format", {}).get("duration")
+    return {
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "duration": round(float(duration), 2) if duration else None,
+    }
+
+
+def _probe_pdf(path: str) -> dict:
+    # Counting page objects is good enough for a listing and needs no PDF
+    # library; compressed object streams can hide them, hence "or None".
+    with open(path, "rb") as f:
+        return {"pages": len(_PAGE_RE.findall(f.read())) or None}
+
+
+_PROBES = {"picture": _probe_picture, "video": _probe_video, "pdf": _probe_pdf}
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaLibrary:
+    def __init__(self) -> None:
+        # "<kind>:<path>" -> entry. Replaced wholesale by each scan, so
+        # readers never see a half-built index.
+        self._entries: dict[str, dict] | None = None
+        # Picture folders (relative, "Root" for the top), including empty ones.
+        self._picture_folders: list[str] = []
+        self._scan_lock = threading.Lock()
+        self._cache: dict[str, dict] = self._load_cache()
+        self._task: asyncio.Task | None = None
+        self._enrich_task: asyncio.Task | None = None
+
+    # --- persistence ---------------------------------------------------
+
+    def _load_cache(self) -> dict:
+        try:
+            return json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self) -> None:
+        entries = self._entries or {}
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = INDEX_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp, INDEX_FILE)
+        self._cache = entries
+
+    # --- scanning --------------------------------------------------------
+
+    def _scan(self) -> bool:
+        """Stat every media file and rebuild the index, carrying metadata
+        over for files whose size and mtime haven't changed. Returns True
+        if anything changed."""
+        with self._scan_lock:
+            previous = self._entries if self._entries is not None else self._cache
+            entries: dict[str, dict] = {}
+            picture_folders: list[str] = []
+            for kind, root in FOLDERS.items():
+                for dirpath, dirnames, filenames in os.walk(root):
+                    dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                    folder = os.path.relpath(dirpath, root).replace(os.sep, "/")
+                    folder = "Root" if folder == "." else folder
+                    if kind == "picture":
+                        picture_folders.append(folder)
+                    for name in filenames:
+                        if name.startswith(".") or not name.lower().endswith(EXTENSIONS[kind]):
+                            continue
+                        try:
+                            st = os.stat(os.path.join(dirpath, name))
+                        except OSError:
+                            continue  # deleted mid-scan
+                        path = name if folder == "Root" else f"{folder}/{name}"
+                        key = f"{kind}:{path}"
+                        old = previous.get(key)
+                        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                            entries[key] = old
+                            continue
+                        entries[key] = {
+                            "kind": kind, "path": path, "folder": folder, "name": name,
+                            "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                            "width": None, "height": None, "duration": None,
+                            "pages": None, "sha256": None, "orientation": None,
+                            "probed": False,
+                        }
+            changed = self._entries is None or entries != self._entries
+            self._entries = entries
+            self._picture_folders = picture_folders
+            return changed
+
+    def _ensure_scanned(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._scan()
+        return self._entries
+
+    def _enrich(self) -> None:
+        """Probe metadata + hash for every entry that hasn't been probed.
+        Slow (hashing GB videos), so only ever in a worker thread."""
+        from uploads import known_hash
+
+        probed = 0
+        for key, entry in list((self._entries or {}).items()):
+            if entry["probed"]:
+                continue
+            full = os.path.join(FOLDERS[entry["kind"]], entry["path"])
+            meta = dict(entry, probed=True)
+            try:
+                meta.update(_PROBES[entry["kind"]](full))
+            except Exception as e:
+                print(f"[media] probing {full} failed: {e}")
+            try:
+                meta["sha256"] = known_hash(full) or _hash_file(full)
+            except OSError:
+                continue  # gone; the next scan drops it
+            meta["orientation"] = _orientation(meta["width"], meta["height"])
+            entries = self._entries
+            # Only if the scan hasn't replaced it meanwhile.
+            if entries is not None and entries.get(key) is entry:
+                entries[key] = meta
+                probed += 1
+        if probed:
+            print(f"[media] probed {probed} file(s)")
+            self._save_cache()
+
+    # --- background ------------------------------------------------------
+
+    def ensure_running(self) -> None:
+        """Start the watcher (or poller). Idempotent; needs a running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    def _schedule_enrich(self) -> None:
+        if self._enrich_task is None or self._enrich_task.done():
+            self._enrich_task = asyncio.get_running_loop().create_task(
+                asyncio.to_thread(self._enrich)
+            )
+
+    async def _watch(self) -> None:
+        for root in FOLDERS.values():
+            os.makedirs(root, exist_ok=True)
+        await asyncio.to_thread(self._scan)
+        self._schedule_enrich()
+        if WATCHFILES_AVAILABLE:
+            try:
+                async for _changes in watchfiles.awatch(*FOLDERS.values()):
+                    await self.rescan()
+                return
+            except Exception as e:
+                print(f"[media] watcher failed ({e}); falling back to polling")
+        while True:
+            await asyncio.sleep(POLL_INTERVAL_S)
+            await self.rescan()
+
+    async def rescan(self) -> None:
+        """Re-stat now (e.g. right after an upload) and probe what's new."""
+        if await asyncio.to_thread(self._scan):
+            self._schedule_enrich()
+
+    # --- queries ---------------------------------------------------------
+
+    @staticmethod
+    def _public(entry: dict) -> dict:
+        out = {k: v for k, v in entry.items() if k not in ("mtime_ns", "probed")}
+        out["mtime"] = entry["mtime_ns"] / 1e9
+        return out
+
+    def query(
+        self,
+        kind: str | None = None,
+        folder: str | None = None,
+        search: str | None = None,
+        orientation: str | None = None,
+        sort: str = "name",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> dict:
+        """Filtered, sorted, paginated entries: {"total", "items"}. `search`
+        is a case-insensitive substring of the path."""
+        items = self._ensure_scanned().values()
+        if kind:
+            items = [e for e in items if e["kind"] == kind]
+        if folder:
+            items = [e for e in items if e["folder"] == folder]
+        if search:
+            needle = search.lower()
+            items = [e for e in items if needle in e["path"].lower()]
+        if orientation:
+            items = [e for e in items if e["orientation"] == orientation]
+        key = {"name": lambda e: e["path"].lower(), "mtime": lambda e: e["mtime_ns"],
+               "size": lambda e: e["size"]}[sort if sort in SORT_KEYS else "name"]
+        items = sorted(items, key=key, reverse=descending)
+        page = items[max(offset, 0):] if limit is None else items[max(offset, 0):max(offset, 0) + limit]
+        return {"total": len(items), "items": [self._public(e) for e in page]}
+
+    def names(self, kind: str, folder: str = "Root") -> list[str]:
+        """Sorted file names of one kind directly in one folder."""
+        return sorted(
+            e["name"] for e in self._ensure_scanned().values()
+            if e["kind"] == kind and e["folder"] == folder
+        )
+
+    def picture_folders(self) -> dict[str, list[str]]:
+        """{folder: [file, ...]} for every picture folder, empty ones too
+        ("Root" is the top level)."""
+        self._ensure_scanned()
+        return {folder: self.names("picture", folder) for folder in self._picture_folders}
+
+    def slideshows(self) -> list[str]:
+        """Top-level picture subfolders (each is a slideshow)."""
+        self._ensure_scanned()
+        return sorted(f for f in self._picture_folders if f != "Root" and "/" not in f)
+
+
+# Singleton instance imported by route handlers and the screens MCP.
+media_library = MediaLibrary()
@@ -0,0 +1,121 @@
+"""PDF decks rasterised to page images at screen resolution.
+
+The PDF screen used to load the raw deck into pdf.js and render every page
+in the kiosk's browser. On the Pi stations a heavy deck (full-bleed photos,
+embedded fonts) takes seconds per page, so slides arrived late and the
+fade was choppy. Now each upload is rasterised once, in a process pool,
+with PyMuPDF. Every page is rendered to fit each screen class's box (the
+zone map's orientations) and saved as WebP. The PDF route then pages
+through the images like a slideshow (templates/content/pdf_pages.html).
+
+Pages live under static/derived/pdfs/<name>/<fingerprint>/<variant>/,
+with a `<name>.json` manifest. The fingerprint is taken from the source's
+size and mtime, so a replaced deck is re-rasterised into a fresh
+directory and the old one is removed. `pages_for()` is what the route
+calls: the page list for a screen, or None while there isn't one yet (it
+queues one and the route falls back to pdf.js). Rendering shares the
+process pool with pictures (models/derived.py), so the two together stay
+within the Pi's budget.
+
+Needs PyMuPDF; without it every deck is shown with pdf.js as before.
+Backfill existing decks with `python -m models.pdfs`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import shutil
+from pathlib import Path
+
+from models.derived import Derivatives, fingerprint
+
+# Only the pool workers import PyMuPDF: it costs ~100 ms, which server
+# startup doesn't need to pay. Here it's enough to know it's installed.
+PYMUPDF_AVAILABLE = importlib.util.find_spec("pymupdf") is not None
+if not PYMUPDF_AVAILABLE:
+    print("Warning: PyMuPDF not installed. PDFs are rendered in the browser with pdf.js.")
+
+PDF_FOLDER = Path("static/pdfs")
+
+# Box per screen class (pages fit inside, letterboxed). Screens the zone
+# map doesn't place get the horizontal set.
+VARIANTS: dict[str, tuple[int, int]] = {
+    "horizontal": (1920, 1080),
+    "vertical": (1080, 1920),
+}
+WEBP_QUALITY = 88
+# Decks bigger than this are left to pdf.js rather than filling the disk.
+MAX_PAGES = 300
+
+
+# --- rasterising (runs in the process pool) ---------------------------------
+
+def rasterise(rel: str) -> dict | None:
+    """Render every page of one deck for every screen class and write the
+    manifest. Returns the manifest, or None if the deck can't be read."""
+    import pymupdf
+    from PIL import Image
+
+    source, _ = derivatives.paths(rel)
+    try:
+        source_fingerprint = fingerprint(source)
+        doc = pymupdf.open(source)
+    except Exception:
+        return None
+    base = derivatives.derived_folder / rel
+    with doc:
+        if doc.page_count == 0 or doc.page_count > MAX_PAGES:
+            return None
+        variants = {}
+        for name, (width, height) in VARIANTS.items():
+            folder = base / source_fingerprint / name
+            folder.mkdir(parents=True, exist_ok=True)
+            files = []
+            for number, page in enumerate(doc, start=1):
+                zoom = min(width / page.rect.width, height / page.rect.height)
+                pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                file = f"page-{number:03d}.webp"
+                img.save(folder / file, "WEBP", quality=WEBP_QUALITY, method=4)
+                files.append(file)
+            variants[name] = {
+                "folder": (Path(rel).name + "/" + source_fingerprint + "/" + name),
+                "files": files,
+            }
+        manifest = {"source": source_fingerprint, "pages": doc.page_count, "variants": variants}
+    derivatives.write_manifest(rel, manifest)
+    # Pages of the replaced deck.
+    for old in base.iterdir():
+        if old.name != source_fingerprint:
+            shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+derivatives = Derivatives(
+    "pdfs", PDF_FOLDER, (".pdf",), rasterise,
+    available=lambda: PYMUPDF_AVAILABLE, requires="PyMuPDF",
+)
+DERIVED_FOLDER = derivatives.derived_folder
+# Rasterise a deck now / in the background (see Derivatives.run, .enqueue).
+rasterise_async = derivatives.run
+enqueue = derivatives.enqueue
+
+
+# --- serving ----------------------------------------------------------------
+
+def pages_for(rel: str, orientation: str | None) -> list[str] | None:
+    """URLs of the page images a screen should show, in order, or None
+    while there's no up-to-date rasterisation (one is queued in the
+    background unless PyMuPDF is missing or the deck failed before)."""
+    rel = rel.lstrip("/")
+    manifest = derivatives.current(rel)
+    if manifest is None:
+        return None
+    variant = manifest["variants"][orientation if orientation in VARIANTS else "horizontal"]
+    parent = Path(rel).parent.as_posix()
+    prefix = f"/{DERIVED_FOLDER.as_posix()}/" + ("" if parent == "." else parent + "/")
+    return [f"{prefix}{variant['folder']}/{file}" for file in variant["files"]]
+
+
+if __name__ == "__main__":
+    derivatives.backfill()
@@ -0,0 +1,183 @@
+"""Screen-sized derivatives of uploaded pictures.
+
+Pictures and slideshows used to be served straight from static/pictures/,
+so an 8–20 MB phone photo was decoded in full by a kiosk Pi on every
+slide. Now each upload is resized once, in a process pool so it doesn't
+block the event loop or hold the GIL. It's resized to one bounding box per
+display orientation (the zone map's `orientation`), and a BlurHash is
+computed so a screen can paint a blurred placeholder while the image
+loads.
+
+Derivatives live under static/derived/pictures/, mirroring the source
+path: `<name>.<variant>.webp` plus a `<name>.json` manifest. They're kept
+out of static/pictures/ so the picture listings never show them. The
+manifest, queue and process pool are shared with videos and PDFs
+(models/derived.py).
+`variant_for()` is what the content routes call: the derivative for a
+screen's orientation, or the original while none exists yet (in which
+case it queues one).
+
+Needs Pillow; without it every picture is served as the original.
+Backfill existing pictures with `python -m models.pictures`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+from pathlib import Path
+
+from models.derived import Derivatives, fingerprint
+
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+PICTURE_FOLDER = Path("static/pictures")
+# GIFs are served as-is (usually animated).
+DERIVABLE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Bounding box per screen orientation (fit inside, never upscaled). Screens
+# the zone map doesn't place get "any", which covers both.
+VARIANTS: dict[str, tuple[int, int]] = {
+    "horizontal": (1920, 1080),
+    "vertical": (1080, 1920),
+    "any": (1920, 1920),
+}
+WEBP_QUALITY = 82
+
+
+# --- BlurHash -------------------------------------------------------------
+# Encoder for https://blurha.sh (static/javascript/blurhash.js decodes).
+
+_B83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _encode83(value: int, length: int) -> str:
+    return "".join(_B83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _to_linear(v: int) -> float:
+    v = v / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(v: float) -> int:
+    v = max(0.0, min(1.0, v))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(img, components: tuple[int, int] = (4, 3)) -> str:
+    """BlurHash of a PIL image (any size; it's sampled at 32 px)."""
+    cx, cy = components
+    small = img.convert("RGB")
+    small.thumbnail((32, 32))
+    w, h = small.size
+    px = [tuple(_to_linear(c) for c in p) for p in small.getdata()]
+    factors = []
+    for j in range(cy):
+        for i in range(cx):
+            norm = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(h):
+                by = math.cos(math.pi * j * y / h)
+                row = px[y * w:(y + 1) * w]
+                for x, (pr, pg, pb) in enumerate(row):
+                    basis = norm * math.cos(math.pi * i * x / w) * by
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (w * h)
+            factors.append((r * scale, g * scale, b * scale))
+    dc, ac = factors[0], factors[1:]
+    out = _encode83((cx - 1) + (cy - 1) * 9, 1)
+    if ac:
+        quant = max(0, min(82, int(max(abs(c) for f in ac for c in f) * 166 - 0.5)))
+        max_ac = (quant + 1) / 166
+        out += _encode83(quant, 1)
+    else:
+        max_ac = 1.0
+        out += _encode83(0, 1)
+    out += _encode83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+    for f in ac:
+        q = [max(0, min(18, int(math.copysign(abs(c / max_ac) ** 0.5, c) * 9 + 9.5))) for c in f]
+        out += _encode83(q[0] * 19 * 19 + q[1] * 19 + q[2], 2)
+    return out
+
+
+# --- derivation (runs in the process pool) --------------------------------
+
+def derive(rel: str) -> dict | None:
+    """Build every variant + the BlurHash for one picture and write its
+    manifest. Returns the manifest, or None if the picture can't be read."""
+    from PIL import Image, ImageOps
+
+    source, manifest_path = derivatives.paths(rel)
+    try:
+        source_fingerprint = fingerprint(source)
+        img = Image.open(source)
+    except OSError:
+        return None
+    with img:
+        # JPEG: let libjpeg decode at reduced scale — most of the win on
+        # 20 MB phone photos.
+        big = max(max(size) for size in VARIANTS.values())
+        img.draft("RGB", (big, big))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        variants = {}
+        for name, size in VARIANTS.items():
+            variant = img.copy()
+            variant.thumbnail(size, Image.LANCZOS)
+            out = manifest_path.with_name(f"{source.name}.{name}.webp")
+            tmp = out.with_suffix(".tmp")
+            variant.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(tmp, out)
+            variants[name] = {"file": out.name, "width": variant.width, "height": variant.height}
+        manifest = {
+            "source": source_fingerprint,
+            "width": img.width,
+            "height": img.height,
+            "blurhash": blurhash(img),
+            "variants": variants,
+        }
+    derivatives.write_manifest(rel, manifest)
+    return manifest
+
+
+derivatives = Derivatives(
+    "pictures", PICTURE_FOLDER, DERIVABLE_EXTENSIONS, derive,
+    available=lambda: PIL_AVAILABLE, requires="Pillow",
+)
+DERIVED_FOLDER = derivatives.derived_folder
+# Derive one picture in the shared process pool now. Never raises.
+derive_async = derivatives.run
+
+
+# --- serving ----------------------------------------------------------------
+
+def variant_for(rel: str, orientation: str | None) -> dict:
+    """What a screen should load for a picture: {"src", "blurhash", "width",
+    "height"} for the derivative matching the screen's orientation, or just
+    {"src"} (the original) while there's no up-to-date derivative — one is
+    queued in the background."""
+    rel = rel.lstrip("/")
+    manifest = derivatives.current(rel)
+    if manifest is None:
+        return {"src": f"/{PICTURE_FOLDER.as_posix()}/{rel}"}
+    name = orientation if orientation in VARIANTS else "any"
+    variant = manifest["variants"][name]
+    folder = (DERIVED_FOLDER / rel).parent.as_posix()
+    return {
+        "src": f"/{folder}/{variant['file']}",
+        "blurhash": manifest["blurhash"],
+        "width": variant["width"],
+        "height": variant["height"],
+    }
+
+
+if __name__ == "__main__":
+    derivatives.backfill()
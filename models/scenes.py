@@ -113,9 +113,12 @@ class SceneManager:
         # 1. Recall Hue scene if specified
         if scene.hue_scene_id:
             hue_module = registry.get("hue")
-            if hue_module is not None and getattr(hue_module, "client", None) is not None:
+            client = await hue_module.get_async_client() if hue_module is not None else None
+            if client is not None:
+                # Through the scheduler, so it lands in order with any
+                # light / group writes already queued.
                 try:
-                    result["hue"] = hue_module.client.recall_scene(scene.hue_scene_id)
+                    result["hue"] = await hue_module.scheduler.recall_scene(scene.hue_scene_id)
                 except Exception as e:  # noqa: BLE001
                     result["hue"] = {"error": str(e)}
             else:
@@ -160,18 +163,20 @@ class SceneManager:
             )
 
         if result["screens_updated"]:
-            screen_manager.save_screens()
-
-        # 3. Broadcast reload to every connected screen
-        for screen in screen_manager.screens:
-            if screen.connected:
-                try:
-                    await connection_manager.notify_screen(screen=screen)
-                    result["reloaded"].append(screen.id)
-                except Exception as e:  # noqa: BLE001
-                    result["screens_failed"].append(
-                        {"zone": None, "screen_id": screen.id, "reason": str(e)}
-                    )
+            # On disk before the reload goes out.
+            await screen_manager.flush()
+
+        # 3. Broadcast reload to every connected screen, concurrently
+        outcomes = await connection_manager.notify_many(
+            s for s in screen_manager.screens if s.connected
+        )
+        for o in outcomes:
+            if o["ok"]:
+                result["reloaded"].append(o["id"])
+            else:
+                result["screens_failed"].append(
+                    {"zone": None, "screen_id": o["id"], "reason": o["reason"]}
+                )
 
         return result
 
@@ -15,12 +15,30 @@ from pathlib import Path
 MAP_FILE = Path("data/studio_zone_map.json")
 
 
+# load_map() cache, keyed by the file's mtime (None = missing / unreadable).
+_map_cache: dict = {}
+_map_mtime: int | None = None
+
+
 def load_map() -> dict:
+    """The zone map, re-read only when the file's mtime changes — the
+    gradient pusher and the floor-plan poll both hit this on every light
+    change. Treat the result as read-only; it's shared."""
+    global _map_cache, _map_mtime
     try:
-        with open(MAP_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return {}
+        mtime: int | None = MAP_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime is None:
+        _map_cache, _map_mtime = {}, None
+    elif mtime != _map_mtime:
+        try:
+            with open(MAP_FILE, "r", encoding="utf-8") as f:
+                _map_cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            _map_cache = {}
+        _map_mtime = mtime
+    return _map_cache
 
 
 def zone_for_screen(screen_id: int, plan: str = "popup") -> tuple[str | None, dict | None]:
@@ -78,25 +96,24 @@ def light_to_hex(state: dict) -> str | None:
     return "#ffefd9"
 
 
-def _all_lights() -> dict:
-    """Fetch every Hue light's state once ({} if unavailable)."""
+async def _all_lights() -> dict:
+    """Every Hue light's state from the shared mirror snapshot ({} if
+    unpaired or never reached). No bridge call of its own — the mirror's
+    one feed serves all pollers; see modules/hue/mirror.py."""
     from modules import registry
 
     mod = registry.get("hue")
-    client = getattr(mod, "client", None) if mod else None
-    if client is None:
+    if mod is None:
         return {}
-    lights = client.get_lights()
-    return lights if isinstance(lights, dict) and "error" not in lights else {}
+    return (await mod.mirror.snapshot()).lights
 
 
-def zone_light_hexes(zone: dict | None, lights: dict | None = None) -> list[str]:
+def zone_light_hexes(zone: dict | None, lights: dict) -> list[str]:
     """Current colours of the zone's mapped lights (skips off/unknown).
-    Pass a preloaded `lights` dict to avoid a bridge call per zone."""
+    `lights` is one preloaded `_all_lights()` dict, shared across zones so
+    there's a single snapshot read per request rather than one per zone."""
     if not zone:
         return []
-    if lights is None:
-        lights = _all_lights()
     out: list[str] = []
     for lid in (zone.get("light_ids") or []):
         light = lights.get(str(lid)) or lights.get(lid)
@@ -108,14 +125,14 @@ def zone_light_hexes(zone: dict | None, lights: dict | None = None) -> list[str]
     return out
 
 
-def studio_state(plan: str = "popup") -> dict:
+async def studio_state(plan: str = "popup") -> dict:
     """All zones enriched with live light colours + real screen state, in one
-    pass (single bridge fetch). The new /admin/studio UI polls this to mirror
+    pass (single mirror snapshot). The new /admin/studio UI polls this to mirror
     and drive the real room."""
     from screens import screen_manager
 
     zones_map = load_map().get(plan, {})
-    lights = _all_lights()
+    lights = await _all_lights()
     by_id = {s.id: s for s in screen_manager.screens}
     zones: dict = {}
     for key, z in zones_map.items():
@@ -136,24 +153,9 @@ def studio_state(plan: str = "popup") -> dict:
     return {"plan": plan, "zones": zones}
 
 
-def screen_gradient_spec(screen_id: int, plan: str = "popup") -> dict:
-    """Everything a gradient screen needs: colours, animation, intensity.
-
-    The per-screen spec is stored on the Screen's `text` field as
-    "colorspec|animation|intensity":
-      - colorspec "mimic" (or empty)  -> track the zone's live light colours
-      - colorspec "off"                -> no colours (idle/black)
-      - colorspec "#hex,#hex,..."      -> explicit gradient stops (set from the
-                                          Screens gradient menu)
-      - animation: static | animated | trippy   (default animated)
-      - intensity: 0-100                          (default 100)
-    """
-    from screens import screen_manager
-
-    key, zone = zone_for_screen(screen_id, plan)
-    s = next((x for x in screen_manager.screens if x.id == screen_id), None)
-    raw = (s.text if (s and s.type == "gradient") else "") or ""
-
+def parse_gradient_text(raw: str) -> tuple[str, str, int]:
+    """Split a gradient Screen's `text` ("colorspec|animation|intensity")
+    into its parts, defaulting to ("mimic", "animated", 100)."""
     colorspec, animation, intensity = "mimic", "animated", 100
     if raw:
         parts = raw.split("|")
@@ -165,9 +167,22 @@ def screen_gradient_spec(screen_id: int, plan: str = "popup") -> dict:
                 intensity = max(0, min(100, int(float(parts[2]))))
             except ValueError:
                 pass
+    return colorspec, animation, intensity
+
 
+def gradient_text(screen) -> str:
+    """The spec text of a gradient screen ("" for anything else)."""
+    return (screen.text if (screen and screen.type == "gradient") else "") or ""
+
+
+def build_gradient_spec(screen_id: int, raw: str, key: str | None,
+                        zone: dict | None, lights: dict) -> dict:
+    """The spec for one screen from already-loaded parts. `lights` is only
+    read for "mimic" screens. Shared by the HTTP routes and the WebSocket
+    pusher (modules/gradient/push.py) so both send identical payloads."""
+    colorspec, animation, intensity = parse_gradient_text(raw)
     if colorspec in ("mimic", ""):
-        colors = zone_light_hexes(zone)
+        colors = zone_light_hexes(zone, lights) if zone else []
     elif colorspec == "off":
         colors = []
     else:
@@ -182,3 +197,25 @@ def screen_gradient_spec(screen_id: int, plan: str = "popup") -> dict:
         "animation": animation if animation in ("static", "animated", "trippy") else "animated",
         "intensity": intensity,
     }
+
+
+async def screen_gradient_spec(screen_id: int, plan: str = "popup") -> dict:
+    """Everything a gradient screen needs: colours, animation, intensity.
+
+    The per-screen spec is stored on the Screen's `text` field as
+    "colorspec|animation|intensity":
+      - colorspec "mimic" (or empty)  -> track the zone's live light colours
+      - colorspec "off"                -> no colours (idle/black)
+      - colorspec "#hex,#hex,..."      -> explicit gradient stops (set from the
+                                          Screens gradient menu)
+      - animation: static | animated | trippy   (default animated)
+      - intensity: 0-100                          (default 100)
+    """
+    from screens import screen_manager
+
+    key, zone = zone_for_screen(screen_id, plan)
+    s = next((x for x in screen_manager.screens if x.id == screen_id), None)
+    raw = gradient_text(s)
+    mimic = parse_gradient_text(raw)[0] in ("mimic", "")
+    lights = await _all_lights() if (mimic and zone) else {}
+    return build_gradient_spec(screen_id, raw, key, zone, lights)
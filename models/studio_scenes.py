@@ -9,6 +9,8 @@ scene is special-cased to the Accenture brand look (purple) per the
 
 from __future__ import annotations
 
+import asyncio
+
 # Preset id -> representative colour (from the prototype's LIGHT_PRESETS).
 LIGHT_PRESETS: dict[str, str] = {
     "warm": "#FF9B3E",
@@ -59,24 +61,28 @@ async def apply_scene_full(scene_id: str) -> dict:
     from models.studio_map import load_map
 
     mod = registry.get("hue")
-    client = getattr(mod, "client", None) if mod else None
+    client = await mod.get_async_client() if mod else None
     if client is None:
         return {"ok": False, "error": "hue unavailable"}
 
     zmap = load_map().get("popup", {})
     applied: dict[str, str] = {}
+    writes = []
     for zone, preset in scene.items():
         z = zmap.get(zone)
         if not isinstance(z, dict):
             continue
         for lid in (z.get("light_ids") or []):
             if preset == "off":
-                client.set_light(str(lid), {"on": False})
+                writes.append(mod.scheduler.set_light(str(lid), {"on": False}))
             else:
                 color = LIGHT_PRESETS.get(preset)
                 if not color:
                     continue
                 h, s = hex_to_hue_sat(color)
-                client.set_light(str(lid), {"on": True, "bri": 254, "hue": h, "sat": s})
+                writes.append(mod.scheduler.set_light(
+                    str(lid), {"on": True, "bri": 254, "hue": h, "sat": s}))
         applied[zone] = preset
+    # Queued together so shared-state lights fold into group actions.
+    await asyncio.gather(*writes)
     return {"ok": True, "scene": sid, "applied": applied}
@@ -0,0 +1,169 @@
+"""Kiosk-friendly H.264 renditions of uploaded videos.
+
+Brand videos arrive as whatever the agency exported: HEVC or ProRes
+`.mov`s at 40+ Mbit/s, sometimes 4K/60. A kiosk Pi can't decode that
+smoothly, and the browser needs the moov atom before it can start
+playing. So each upload is transcoded once, by ffmpeg subprocesses fed
+from a queue, into one H.264 rendition per screen class. Every rendition
+is 8-bit 4:2:0 High profile, capped at 30 fps and rate-limited, with the
+moov atom moved to the front (`+faststart`). Audio is dropped because the
+player is muted.
+
+The screen classes are the zone map's orientations. A rendition is
+cropped to exactly the box the screen shows it in (the player uses
+`object-fit: cover`), so the Pi never decodes pixels that end up off
+screen. Screens the zone map doesn't place get the horizontal one.
+
+Renditions live under static/derived/videos/ as
+`<name>.<rendition>.<fingerprint>.mp4`, with a `<name>.json` manifest.
+The fingerprint is taken from the source's size and mtime, so a rendition
+URL never changes content and can be cached as immutable
+(`/media/videos/...` in routes/content_routes.py, which also answers
+Range requests). `variant_for()` picks the rendition for a screen, or
+serves the original while one is queued. The manifest, queue and backfill
+are models/derived.py's, shared with pictures and PDFs.
+
+Needs ffmpeg on PATH; without it every video is served as uploaded.
+Backfill existing videos with `python -m models.videos`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+from pathlib import Path
+
+from models.derived import Derivatives, fingerprint
+
+VIDEO_FOLDER = Path("static/videos")
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".mov", ".m4v")
+
+# Rendition box per screen class (scaled to cover, then centre-cropped).
+RENDITIONS: dict[str, tuple[int, int]] = {
+    "horizontal": (1920, 1080),
+    "vertical": (1080, 1920),
+}
+MAX_FPS = 30
+CRF = 21
+MAX_BITRATE = "8M"
+# ffmpeg is multi-threaded already; on a 4-core Pi one job at a time
+# leaves room for the server and keeps the transcode from starving it.
+TRANSCODE_WORKERS = 1
+TRANSCODE_TIMEOUT_S = 3 * 3600
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def _filter(width: int, height: int) -> str:
+    return (f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height},setsar=1")
+
+
+def _command(source: Path, out: Path, width: int, height: int) -> list[str]:
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", str(source),
+        "-map", "0:v:0", "-an", "-sn", "-dn",
+        "-vf", _filter(width, height),
+        "-fpsmax", str(MAX_FPS),
+        "-c:v", "libx264", "-preset", "medium", "-profile:v", "high", "-level", "4.1",
+        "-pix_fmt", "yuv420p", "-crf", str(CRF),
+        "-maxrate", MAX_BITRATE, "-bufsize", "16M",
+        "-movflags", "+faststart",
+        "-f", "mp4", str(out),
+    ]
+
+
+def _write_manifest(rel: str, manifest: dict) -> None:
+    _, manifest_path = derivatives.paths(rel)
+    previous = None
+    try:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    derivatives.write_manifest(rel, manifest)
+    # Renditions of the replaced upload.
+    keep = {r["file"] for r in manifest["renditions"].values()}
+    for old in (previous or {}).get("renditions", {}).values():
+        if old["file"] not in keep:
+            (manifest_path.parent / old["file"]).unlink(missing_ok=True)
+
+
+async def transcode(rel: str) -> dict | None:
+    """Produce every rendition of one video and write its manifest.
+    Returns the manifest, or None if ffmpeg failed; raises
+    asyncio.TimeoutError if it runs past TRANSCODE_TIMEOUT_S."""
+    source, manifest_path = derivatives.paths(rel)
+    try:
+        source_fingerprint = fingerprint(source)
+    except OSError:
+        return None
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    renditions = {}
+    for name, (width, height) in RENDITIONS.items():
+        out = manifest_path.with_name(f"{source.name}.{name}.{source_fingerprint}.mp4")
+        if not out.exists():
+            tmp = out.with_suffix(".part.mp4")
+            proc = await asyncio.create_subprocess_exec(
+                *_command(source, tmp, width, height),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), TRANSCODE_TIMEOUT_S)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                proc.kill()
+                await proc.wait()
+                tmp.unlink(missing_ok=True)
+                raise
+            if proc.returncode != 0:
+                tmp.unlink(missing_ok=True)
+                print(f"[videos] ffmpeg failed on {rel} ({name}): "
+                      f"{stderr.decode(errors='replace').strip()[-300:]}")
+                return None
+            os.replace(tmp, out)
+        renditions[name] = {"file": out.name, "width": width, "height": height}
+    manifest = {"source": source_fingerprint, "renditions": renditions}
+    _write_manifest(rel, manifest)
+    print(f"[videos] transcoded {rel}")
+    return manifest
+
+
+derivatives = Derivatives(
+    "videos", VIDEO_FOLDER, VIDEO_EXTENSIONS, transcode,
+    available=ffmpeg_available, requires="ffmpeg", workers=TRANSCODE_WORKERS,
+)
+DERIVED_FOLDER = derivatives.derived_folder
+# Queue a video for transcoding; False if it's already queued, ffmpeg is
+# missing, or it isn't a video.
+enqueue = derivatives.enqueue
+
+
+def status() -> dict:
+    return {"ffmpeg": ffmpeg_available(), **derivatives.status()}
+
+
+# --- serving --------------------------------------------------------------------
+
+def variant_for(rel: str, orientation: str | None) -> dict:
+    """What a screen should play: {"src", "rendition"} for the rendition
+    matching the screen's orientation, or just {"src"} (the original)
+    while there's none — one is queued in the background."""
+    rel = rel.lstrip("/")
+    manifest = derivatives.current(rel)
+    if manifest is None:
+        return {"src": f"/{VIDEO_FOLDER.as_posix()}/{rel}"}
+    name = orientation if orientation in RENDITIONS else "horizontal"
+    rendition = manifest["renditions"][name]
+    folder = Path(rel).parent.as_posix()
+    prefix = "" if folder == "." else folder + "/"
+    return {"src": f"/media/videos/{prefix}{rendition['file']}", "rendition": name}
+
+
+if __name__ == "__main__":
+    # Backfill, one video at a time.
+    derivatives.backfill()
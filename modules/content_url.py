@@ -0,0 +1,85 @@
+"""Content-URL resolution for screens, cached per screen.
+
+"Which URL should screen N show?" used to be answered from scratch on
+every page render and every WebSocket reload — re-importing the module
+package, looking up the display module, checking it's enabled, building
+the URL — and the legacy `routes.py` kept its own if/elif copy of the
+rules. Both paths now ask `content_urls.url(screen, base_url)`.
+
+An entry is keyed by a fingerprint of the screen's content fields plus
+the registry's generation counter (bumped whenever a module is
+registered, unregistered, enabled or disabled), so it's recomputed only
+when one of those actually changes. No call site has to remember to
+invalidate anything after editing a screen.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from modules.base import DisplayModule
+from modules.default import DefaultModule
+from modules.registry import registry
+
+# Screen fields a display module may read when building its URL.
+_CONTENT_FIELDS = (
+    "type", "name", "text", "url", "video", "picture", "pdf",
+    "slideshow", "news_mode", "screen_share",
+)
+
+# Fallback display module used when a screen's `type` doesn't match any
+# enabled DisplayModule.
+_DEFAULT_DISPLAY: DisplayModule = DefaultModule()
+
+
+def resolve_display_module(screen_type: str) -> DisplayModule:
+    module = registry.get(screen_type)
+    if isinstance(module, DisplayModule) and registry.is_enabled(module.id):
+        return module
+    return _DEFAULT_DISPLAY
+
+
+class ContentUrlResolver:
+    def __init__(self) -> None:
+        # screen id -> (fingerprint, module, {base_url: url})
+        self._cache: dict[int, tuple[tuple, DisplayModule, dict[str, str]]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def _entry(self, screen) -> tuple[tuple, DisplayModule, dict[str, str]]:
+        fp = (registry.generation,) + tuple(getattr(screen, f, None) for f in _CONTENT_FIELDS)
+        entry = self._cache.get(screen.id)
+        if entry is None or entry[0] != fp:
+            entry = (fp, resolve_display_module(screen.type), {})
+            self._cache[screen.id] = entry
+        return entry
+
+    def module(self, screen) -> DisplayModule:
+        """The display module that renders this screen (default if its type
+        is unknown or disabled)."""
+        return self._entry(screen)[1]
+
+    def url(self, screen, base_url: str = "/") -> str:
+        """The screen's content URL. `base_url` "/" gives the path form the
+        WebSocket reload sends; the page render passes the request's base
+        URL. External-module URLs are absolute either way."""
+        _, module, urls = self._entry(screen)
+        cached = urls.get(base_url)
+        if cached is not None:
+            self._hits += 1
+            return cached
+        self._misses += 1
+        urls[base_url] = module.get_screen_url(screen, base_url)
+        return urls[base_url]
+
+    def invalidate(self, screen_id: int | None = None) -> None:
+        if screen_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(screen_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"screens": len(self._cache), "hits": self._hits, "misses": self._misses}
+
+
+content_urls = ContentUrlResolver()
@@ -2,8 +2,9 @@
 
 The screen renders a full-screen animated gradient whose colours are derived
 from the *current* colour of the Hue lights mapped to that screen's zone
-(data/studio_zone_map.json). The renderer polls so the screen tracks the
-lights live. This is the Reinvention Studio's default visual content type.
+(data/studio_zone_map.json). Light changes are pushed to the screen over
+its WebSocket (see `push.py`) so it tracks the lights live. This is the
+Reinvention Studio's default visual content type.
 """
 
 from modules.base import DisplayModule
@@ -0,0 +1,104 @@
+"""Gradient pusher — live zone colours to gradient screens over the screen
+WebSocket.
+
+Each gradient page used to poll `/api/studio/screen/{id}/gradient` every
+few seconds, so gradient latency was the poll interval and the work grew
+with screen count. Now one task per process waits on the Hue state mirror
+(`HueMirror.changed`); on every new snapshot version it recomputes the
+colours of the zones that have "mimic" screens, diffs them against what it
+last pushed, and sends the new spec only to the connected screens in the
+zones that changed — via `ConnectionManager.push_gradient`.
+
+The task is lazy like the mirror: the gradient routes start it, and it
+exits once no connected screen shows a mimicking gradient (so the mirror
+can park too). Screens with explicit stops or "off" never need a push —
+their spec only changes through an edit, which reloads them anyway.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+PLAN = "popup"
+# How long to block on the mirror before re-checking who's subscribed.
+WAIT_S = 15.0
+
+_task: asyncio.Task | None = None
+# zone key -> colours last pushed to that zone's screens.
+_zone_colors: dict[str, list[str]] = {}
+
+
+def ensure_running() -> None:
+    """Start the pusher on the running loop if it isn't already."""
+    global _task
+    if _task is not None and not _task.done():
+        return
+    _zone_colors.clear()
+    _task = asyncio.get_running_loop().create_task(_run())
+
+
+def _subscribers() -> list:
+    """Connected screens currently showing a light-mimicking gradient."""
+    from models.studio_map import gradient_text, parse_gradient_text
+    from screens import screen_manager
+
+    return [
+        s for s in screen_manager.screens
+        if s.connected and s.type == "gradient"
+        and parse_gradient_text(gradient_text(s))[0] in ("mimic", "")
+    ]
+
+
+async def _push(lights: dict, screens: list) -> int:
+    """Send fresh specs to the subscribed screens of every zone whose
+    colours changed since the last push. Returns the number of screens
+    sent to."""
+    from connections import connection_manager
+    from models.studio_map import (
+        build_gradient_spec,
+        gradient_text,
+        load_map,
+        zone_light_hexes,
+    )
+
+    zones = load_map().get(PLAN, {})
+    by_id = {s.id: s for s in screens}
+    sends = []
+    for key, zone in zones.items():
+        if key.startswith("_") or not isinstance(zone, dict):
+            continue
+        members = [by_id[sid] for sid in (zone.get("screens") or []) if sid in by_id]
+        if not members:
+            continue
+        colors = zone_light_hexes(zone, lights)
+        if _zone_colors.get(key) == colors:
+            continue
+        _zone_colors[key] = colors
+        for s in members:
+            spec = build_gradient_spec(s.id, gradient_text(s), key, zone, lights)
+            sends.append(connection_manager.push_gradient(s, spec))
+    if sends:
+        await asyncio.gather(*sends)
+    return len(sends)
+
+
+async def _run() -> None:
+    from modules import registry
+
+    version = -1
+    while True:
+        screens = _subscribers()
+        hue = registry.get("hue")
+        if not screens or hue is None:
+            return
+        try:
+            snap = await hue.mirror.changed(version, WAIT_S)
+        except Exception as e:
+            print(f"[gradient] pusher wait failed: {e}")
+            await asyncio.sleep(WAIT_S)
+            continue
+        if snap.version == version or not snap.fetched_at:
+            continue
+        version = snap.version
+        # Re-read: screens may have switched type or dropped while we waited.
+        await _push(snap.lights, _subscribers())
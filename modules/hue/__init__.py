@@ -12,17 +12,44 @@ A ServiceModule:
 - `stop()`   → all lights off
 
 For the per-light / per-group / per-scene work, the module exposes a
-HueClient via `.client` and `modules/hue/routes.py` mounts the rich API.
+pooled `AsyncHueClient` via `await get_async_client()` — that's what every
+route, MCP tool and brand/scene path uses, so a slow bridge never blocks
+the event loop. The sync `HueClient` facade stays on `.client` for scripts
+and for the sync `start()` / `stop()` contract.
+
+Neither accessor touches the bridge or the disk on the hot path:
+- `data/hue.json` is re-read only when its mtime changes (re-pair, IP
+  self-heal, bridge-id learning).
+- Bridge liveness is a cached verdict with a TTL. When it goes stale the
+  accessor hands back the client immediately and re-probes in a
+  background task (stale-while-revalidate). Any request that dies on the
+  wire invalidates the verdict, which also kicks a re-probe — and that
+  re-probe is where the DHCP self-heal runs.
+
+Reads of light / group / scene state go through `.mirror` (see
+`mirror.py`): one shared poller / event-stream feed per process instead
+of one bridge call per reader. Every accepted write nudges it.
+
+Writes from the app go through `.scheduler` (see `scheduler.py`): paced to
+the bridge's command budget, coalesced per light, and folded into group
+actions where the lights share a state. Animations go through
+`.entertainment` (see `entertainment.py`), which streams frames over the
+bridge's Entertainment channel and falls back to the scheduler.
 """
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import Any
 
 from modules.base import ServiceModule
-from modules.hue.client import HueClient
+from modules.hue.client import AsyncHueClient, HueClient
+from modules.hue.entertainment import EntertainmentEngine
+from modules.hue.mirror import HueMirror
+from modules.hue.scheduler import HueScheduler
 from modules.hue.config import (
+    HUE_FILE,
     load as load_config,
     save as save_config,
     discover_bridges,
@@ -30,6 +57,8 @@ from modules.hue.config import (
 
 # Don't hammer the cloud discovery service while the bridge is down.
 _REDISCOVER_INTERVAL_S = 30.0
+# How long a liveness verdict is trusted before a background re-probe.
+_ALIVE_TTL_S = 15.0
 
 
 class HueModule(ServiceModule):
@@ -43,10 +72,123 @@ class HueModule(ServiceModule):
 
     def __init__(self) -> None:
         self._client: HueClient | None = None
+        self._aclient: AsyncHueClient | None = None
         self._last_rediscover = 0.0
+        # data/hue.json cache, keyed by mtime (None = file missing).
+        self._cfg: dict | None = None
+        self._cfg_mtime: int | None = None
+        self._cfg_loaded = False
+        # Liveness cache. None = never probed / invalidated by a config change.
+        self._alive: bool | None = None
+        self._alive_at = 0.0
+        self._probe_task: asyncio.Task | None = None
+        self.mirror = HueMirror(self)
+        self.scheduler = HueScheduler(self)
+        self.entertainment = EntertainmentEngine(self)
+
+    # ---- config (mtime-watched) ----
+
+    def _config(self) -> dict | None:
+        try:
+            mtime: int | None = HUE_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if not self._cfg_loaded or mtime != self._cfg_mtime:
+            self._cfg_loaded = True
+            self._cfg_mtime = mtime
+            self._cfg = load_config() if mtime is not None else None
+            # A new bridge / new credentials — the old verdict says nothing.
+            self._alive = None
+        return self._cfg
+
+    # ---- liveness cache ----
+
+    def _liveness_fresh(self) -> bool:
+        return (self._alive is not None
+                and time.monotonic() - self._alive_at < _ALIVE_TTL_S)
+
+    def _record_liveness(self, alive: bool) -> None:
+        self._alive = alive
+        self._alive_at = time.monotonic()
+
+    def _invalidate_liveness(self) -> None:
+        """Request-failure hook wired into both clients: a timeout or
+        connection error means the cached "alive" is wrong, so mark it
+        down-and-stale and re-probe (which also runs the IP self-heal)."""
+        self._alive = False
+        self._alive_at = 0.0
+        self._kick_probe()
+
+    def _kick_probe(self) -> bool:
+        """Schedule a background re-probe on the running loop. Returns False
+        when there's no loop in this thread (scripts, worker threads) — the
+        caller then probes inline, which is fine off the event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = loop.create_task(self._probe())
+        return True
+
+    async def _probe(self) -> None:
+        cfg = self._config()
+        if not cfg:
+            return
+        client = self._ensure_aclient(cfg)
+        if await client.is_alive():
+            self._record_liveness(True)
+            if not cfg.get("bridge_id"):
+                await self._learn_bridge_id_async(client, cfg)
+            return
+        # Self-heal a changed DHCP address: if the bridge isn't reachable at
+        # the stored IP, rediscover it by bridge id and patch the config.
+        # (We can't set router reservations, so the IP can move under us.)
+        # The config rewrite bumps the mtime, so the next accessor call
+        # rebuilds both clients against the new IP.
+        healed = await asyncio.to_thread(self._try_rediscover, cfg)
+        if healed is not None:
+            healed.close()
+            self._record_liveness(True)
+        else:
+            self._record_liveness(False)
+
+    def _probe_sync(self, cfg: dict) -> None:
+        if self._client.is_alive():
+            self._record_liveness(True)
+            if not cfg.get("bridge_id"):
+                self._learn_bridge_id(cfg)
+            return
+        healed = self._try_rediscover(cfg)
+        if healed is not None:
+            self._client.close()
+            self._client = healed
+            self._record_liveness(True)
+        else:
+            self._record_liveness(False)
+
+    # ---- clients ----
+
+    def _ensure_aclient(self, cfg: dict) -> AsyncHueClient:
+        # Re-create the client if config changed (e.g. re-pair / self-heal).
+        if (self._aclient is None
+                or self._aclient.bridge_ip != cfg["bridge_ip"]
+                or self._aclient.username != cfg["username"]):
+            old = self._aclient
+            self._aclient = AsyncHueClient(
+                cfg["bridge_ip"], cfg["username"],
+                on_failure=self._invalidate_liveness,
+                on_write=self.mirror.nudge,
+            )
+            if old is not None:
+                try:
+                    asyncio.get_running_loop().create_task(old.aclose())
+                except RuntimeError:
+                    pass  # no loop — its sockets went with the loop that made them
+        return self._aclient
 
     def _refresh_client(self) -> HueClient | None:
-        cfg = load_config()
+        cfg = self._config()
         if not cfg:
             self._client = None
             return None
@@ -54,21 +196,20 @@ class HueModule(ServiceModule):
         if (self._client is None
                 or self._client.bridge_ip != cfg["bridge_ip"]
                 or self._client.username != cfg["username"]):
-            self._client = HueClient(cfg["bridge_ip"], cfg["username"])
-        # Self-heal a changed DHCP address: if the bridge isn't reachable at
-        # the stored IP, rediscover it by bridge id and patch the config.
-        # (We can't set router reservations, so the IP can move under us.)
-        if not self._client.is_alive():
-            healed = self._try_rediscover(cfg)
-            if healed is not None:
-                self._client = healed
-        elif not cfg.get("bridge_id"):
-            # Opportunistically learn + persist the bridge id while reachable,
-            # so future rediscovery can match the exact bridge.
-            self._learn_bridge_id(cfg)
+            if self._client is not None:
+                self._client.close()
+            self._client = HueClient(
+                cfg["bridge_ip"], cfg["username"],
+                on_failure=self._invalidate_liveness,
+                on_write=self.mirror.nudge,
+            )
+        if not self._liveness_fresh() and not self._kick_probe():
+            self._probe_sync(cfg)
         return self._client
 
     def _learn_bridge_id(self, cfg: dict) -> None:
+        # Opportunistically learn + persist the bridge id while reachable,
+        # so future rediscovery can match the exact bridge.
         try:
             conf = self._client.get_config() if self._client else {}
             bid = conf.get("bridgeid") if isinstance(conf, dict) else None
@@ -78,6 +219,16 @@ class HueModule(ServiceModule):
         except Exception:
             pass
 
+    async def _learn_bridge_id_async(self, client: AsyncHueClient, cfg: dict) -> None:
+        try:
+            conf = await client.get_config()
+            bid = conf.get("bridgeid") if isinstance(conf, dict) else None
+            if bid:
+                save_config(cfg["bridge_ip"], cfg["username"],
+                            cfg.get("clientkey"), bridge_id=bid)
+        except Exception:
+            pass
+
     def _try_rediscover(self, cfg: dict) -> HueClient | None:
         now = time.monotonic()
         if now - self._last_rediscover < _REDISCOVER_INTERVAL_S:
@@ -99,26 +250,48 @@ class HueModule(ServiceModule):
         new_ip = chosen.get("internalipaddress")
         if not new_ip or new_ip == cfg["bridge_ip"]:
             return None
-        candidate = HueClient(new_ip, cfg["username"])
+        candidate = HueClient(new_ip, cfg["username"],
+                              on_failure=self._invalidate_liveness,
+                              on_write=self.mirror.nudge)
         if not candidate.is_alive():
+            candidate.close()
             return None
         save_config(new_ip, cfg["username"], cfg.get("clientkey"),
                     bridge_id=chosen.get("id") or cfg.get("bridge_id"))
         print(f"[hue] bridge moved {cfg['bridge_ip']} -> {new_ip}; config updated")
         return candidate
 
+    async def get_async_client(self) -> AsyncHueClient | None:
+        """The pooled AsyncHueClient, or None if unpaired. Zero bridge
+        round-trips and zero disk reads on the hot path: a stale liveness
+        verdict is refreshed in the background, not inline. The client is
+        kept across calls so its keep-alive pool actually gets reused."""
+        cfg = self._config()
+        if not cfg:
+            self._aclient = None
+            return None
+        client = self._ensure_aclient(cfg)
+        if not self._liveness_fresh():
+            self._kick_probe()
+        return client
+
     @property
     def client(self) -> HueClient | None:
         return self._refresh_client()
 
+    def _reachable(self) -> bool:
+        # Unknown (never probed yet) counts as reachable: hot paths just try,
+        # and the first wire failure flips the verdict via the hook.
+        return self._alive is not False
+
     def is_available(self) -> bool:
         c = self._refresh_client()
         if c is None:
             return False
-        return c.is_alive()
+        return self._reachable()
 
     def status(self) -> dict[str, Any]:
-        cfg = load_config()
+        cfg = self._config()
         out: dict[str, Any] = {
             "available": False,
             "paired": cfg is not None,
@@ -128,7 +301,12 @@ class HueModule(ServiceModule):
             # Intentionally NOT returning the username — semi-sensitive.
             c = self._refresh_client()
             if c is not None:
-                out["available"] = c.is_alive()
+                out["available"] = self._reachable()
+                if self._alive is not None and self._alive_at:
+                    out["liveness_age_s"] = round(time.monotonic() - self._alive_at, 1)
+            out["mirror"] = self.mirror.stats()
+            out["scheduler"] = self.scheduler.stats()
+            out["entertainment"] = self.entertainment.stats()
         return out
 
     def start(self) -> dict[str, Any]:
@@ -1,91 +1,298 @@
-"""Minimal HTTP client for the Philips Hue Bridge v1 CLIP API.
+"""HTTP clients for the Philips Hue Bridge v1 CLIP API.
 
-Uses urllib (stdlib) instead of pulling in a third-party library — keeps
-the dependency surface narrow, same pattern as `modules/external.py`.
+Two flavours over one wire format:
+
+- `AsyncHueClient` — what the app uses. One pooled keep-alive
+  `httpx.AsyncClient` per bridge, a hard per-request deadline, and never
+  blocks the event loop. A slow bridge reply only delays the coroutine
+  that asked for it, not every WebSocket / SSE stream in the process.
+- `HueClient` — sync facade with the same methods, for scripts and the
+  sync `ServiceModule` contract (`start()` / `stop()`). Also pooled.
+
+httpx is already in the tree (bundled via the anthropic SDK dependency,
+same as `mcps/vlc/vlc_client.py`), so this doesn't widen the dependency
+surface.
 
 The Hue Bridge runs CLIP v1 on plain HTTP (port 80). It also runs CLIP v2
 on HTTPS with a self-signed cert (port 443); for our admin UI we don't
-need streaming so v1 is plenty.
+need streaming so v1 is plenty. (Entertainment streaming is its own UDP
+channel — see `entertainment.py`; only its on/off switch lives here.)
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
-import urllib.error
-import urllib.request
-from typing import Any
+from typing import Any, Callable
 
+import httpx  # bundled via the anthropic SDK dependency
+
+# Default per-request deadline (connect + send + full response).
+DEFAULT_TIMEOUT = 5.0
+# Liveness probes are cheap and must fail fast.
+ALIVE_TIMEOUT = 3.0
+
+# The bridge is a small embedded box — it handles a handful of concurrent
+# connections fine but starts refusing well before browsers would. Keep
+# the pool small and the sockets warm.
+_POOL_LIMITS = httpx.Limits(
+    max_connections=4,
+    max_keepalive_connections=4,
+    keepalive_expiry=30.0,
+)
+
+
+def _parse(response: httpx.Response) -> Any:
+    """Bridge response → parsed JSON, or the usual `{"error": ...}` dict."""
+    if response.status_code >= 400:
+        return {"error": f"HTTP {response.status_code}: {response.reason_phrase}"}
+    raw = response.text
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return {"error": "non-json response", "raw": raw[:200]}
 
-class HueClient:
-    """Thin v1 CLIP API client. All methods return parsed JSON; errors are
-    returned as `{"error": "..."}` dicts (never raised), so callers can
-    treat the wire as best-effort."""
 
-    def __init__(self, bridge_ip: str, username: str, timeout: float = 5.0) -> None:
+class _HueBase:
+    """Shared config + URL building for both clients.
+
+    `on_failure` (optional) is called whenever a request dies on the wire
+    (timeout / connection error — not a bridge-level error reply). The Hue
+    module uses it to invalidate its cached liveness verdict.
+
+    `on_write` (optional) is called after every write the bridge accepted;
+    the Hue module uses it to nudge the state mirror into an early poll."""
+
+    def __init__(self, bridge_ip: str, username: str,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 on_failure: Callable[[], None] | None = None,
+                 on_write: Callable[[], None] | None = None) -> None:
         self.bridge_ip = bridge_ip
         self.username = username
         self._timeout = timeout
+        self._on_failure = on_failure
+        self._on_write = on_write
         self._base = f"http://{bridge_ip}/api/{username}"
 
+    @staticmethod
+    def _call(hook: Callable[[], None] | None) -> None:
+        if hook is not None:
+            try:
+                hook()
+            except Exception:
+                pass
+
+    def _failed(self, error: str, report: bool) -> dict:
+        if report:
+            self._call(self._on_failure)
+        return {"error": error}
+
+    def _done(self, method: str, result: Any) -> Any:
+        if method != "GET" and not (isinstance(result, dict) and "error" in result):
+            self._call(self._on_write)
+        return result
+
+    def _timeouts(self, deadline: float) -> httpx.Timeout:
+        # Connect gets a tighter bound so an unreachable bridge fails fast
+        # instead of eating the whole deadline in SYN retries.
+        return httpx.Timeout(deadline, connect=min(deadline, 2.0))
+
+    @staticmethod
+    def _body(body: Any) -> bytes | None:
+        return json.dumps(body).encode("utf-8") if body is not None else None
+
+
+class AsyncHueClient(_HueBase):
+    """Async v1 CLIP API client. All methods return parsed JSON; errors are
+    returned as `{"error": "..."}` dicts (never raised), so callers can
+    treat the wire as best-effort.
+
+    Every call accepts an optional `timeout` — a hard deadline in seconds
+    for that one request (default: the client's `timeout`)."""
+
+    def __init__(self, bridge_ip: str, username: str,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 on_failure: Callable[[], None] | None = None,
+                 on_write: Callable[[], None] | None = None) -> None:
+        super().__init__(bridge_ip, username, timeout, on_failure, on_write)
+        self._http: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _session(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them. The app
+        # has exactly one loop, but a CLI that calls asyncio.run() twice
+        # would otherwise reuse dead sockets — so rebuild on loop change.
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            self._http = httpx.AsyncClient(
+                limits=_POOL_LIMITS,
+                timeout=self._timeouts(self._timeout),
+                headers={"Content-Type": "application/json"},
+            )
+            self._loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            try:
+                await self._http.aclose()
+            except RuntimeError:
+                pass  # loop already gone — sockets die with it
+            self._http = None
+            self._loop = None
+
     # ---- low-level ----
 
-    def _request(self, method: str, path: str, body: Any = None) -> Any:
-        url = self._base + path
-        data = json.dumps(body).encode("utf-8") if body is not None else None
-        req = urllib.request.Request(url, data=data, method=method)
-        if data is not None:
-            req.add_header("Content-Type", "application/json")
-        try:
-            with urllib.request.urlopen(req, timeout=self._timeout) as r:
-                raw = r.read().decode("utf-8", errors="replace")
-        except urllib.error.HTTPError as e:
-            return {"error": f"HTTP {e.code}: {e.reason}"}
-        except (urllib.error.URLError, OSError) as e:
-            return {"error": f"network: {e}"}
+    async def _request(self, method: str, path: str, body: Any = None,
+                       timeout: float | None = None) -> Any:
+        return await self._send(method, self._base + path, body, timeout)
+
+    async def _send(self, method: str, url: str, body: Any,
+                    timeout: float | None, report: bool = True) -> Any:
+        deadline = timeout if timeout is not None else self._timeout
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            return {"error": "non-json response", "raw": raw[:200]}
+            async with asyncio.timeout(deadline):
+                r = await self._session().request(
+                    method, url, content=self._body(body),
+                    timeout=self._timeouts(deadline),
+                )
+        except TimeoutError:
+            return self._failed(f"timeout: no bridge reply within {deadline:g}s", report)
+        except httpx.HTTPError as e:
+            return self._failed(f"network: {e.__class__.__name__}: {e}", report)
+        except OSError as e:
+            return self._failed(f"network: {e}", report)
+        return self._done(method, _parse(r))
 
     # ---- read ----
 
-    def get_lights(self) -> dict:
-        return self._request("GET", "/lights")
+    async def get_lights(self, timeout: float | None = None) -> dict:
+        return await self._request("GET", "/lights", timeout=timeout)
 
-    def get_groups(self) -> dict:
-        return self._request("GET", "/groups")
+    async def get_groups(self, timeout: float | None = None) -> dict:
+        return await self._request("GET", "/groups", timeout=timeout)
 
-    def get_scenes(self) -> dict:
-        return self._request("GET", "/scenes")
+    async def get_scenes(self, timeout: float | None = None) -> dict:
+        return await self._request("GET", "/scenes", timeout=timeout)
 
-    def get_config(self) -> dict:
-        return self._request("GET", "/config")
+    async def get_config(self, timeout: float | None = None) -> dict:
+        return await self._request("GET", "/config", timeout=timeout)
 
     # ---- write ----
 
-    def set_light(self, light_id: str, state: dict) -> Any:
-        return self._request("PUT", f"/lights/{light_id}/state", state)
+    async def set_light(self, light_id: str, state: dict,
+                        timeout: float | None = None) -> Any:
+        return await self._request("PUT", f"/lights/{light_id}/state", state, timeout)
 
-    def set_group(self, group_id: str, action: dict) -> Any:
-        return self._request("PUT", f"/groups/{group_id}/action", action)
+    async def set_group(self, group_id: str, action: dict,
+                        timeout: float | None = None) -> Any:
+        return await self._request("PUT", f"/groups/{group_id}/action", action, timeout)
 
-    def recall_scene(self, scene_id: str) -> Any:
+    async def set_stream(self, group_id: str, active: bool,
+                         timeout: float | None = None) -> Any:
+        """Open / close an Entertainment group's streaming session (the
+        bridge only accepts the DTLS handshake while it's active)."""
+        return await self._request("PUT", f"/groups/{group_id}",
+                                   {"stream": {"active": active}}, timeout)
+
+    async def recall_scene(self, scene_id: str, timeout: float | None = None) -> Any:
         # group 0 = all lights; "scene" key triggers a recall.
-        return self.set_group("0", {"scene": scene_id})
+        return await self.set_group("0", {"scene": scene_id}, timeout)
 
-    def all_on(self) -> Any:
-        return self.set_group("0", {"on": True})
+    async def all_on(self, timeout: float | None = None) -> Any:
+        return await self.set_group("0", {"on": True}, timeout)
 
-    def all_off(self) -> Any:
-        return self.set_group("0", {"on": False})
+    async def all_off(self, timeout: float | None = None) -> Any:
+        return await self.set_group("0", {"on": False}, timeout)
 
     # ---- liveness ----
 
-    def is_alive(self) -> bool:
+    async def is_alive(self) -> bool:
         """Cheap health check that doesn't require valid auth."""
         url = f"http://{self.bridge_ip}/api/0/config"
+        result = await self._send("GET", url, None, ALIVE_TIMEOUT, report=False)
+        return not (isinstance(result, dict) and "error" in result)
+
+
+class HueClient(_HueBase):
+    """Sync facade over the same API — for scripts and sync call sites.
+    Same best-effort contract as `AsyncHueClient`: errors come back as
+    `{"error": "..."}` dicts, never raised. Don't call this from a
+    coroutine; use `AsyncHueClient` there."""
+
+    def __init__(self, bridge_ip: str, username: str,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 on_failure: Callable[[], None] | None = None,
+                 on_write: Callable[[], None] | None = None) -> None:
+        super().__init__(bridge_ip, username, timeout, on_failure, on_write)
+        self._http = httpx.Client(
+            limits=_POOL_LIMITS,
+            timeout=self._timeouts(timeout),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def close(self) -> None:
+        self._http.close()
+
+    # ---- low-level ----
+
+    def _request(self, method: str, path: str, body: Any = None,
+                 timeout: float | None = None) -> Any:
+        return self._send(method, self._base + path, body, timeout)
+
+    def _send(self, method: str, url: str, body: Any,
+              timeout: float | None, report: bool = True) -> Any:
+        deadline = timeout if timeout is not None else self._timeout
         try:
-            with urllib.request.urlopen(url, timeout=3) as r:
-                return getattr(r, "status", 200) < 400
-        except Exception:
-            return False
+            r = self._http.request(
+                method, url, content=self._body(body),
+                timeout=self._timeouts(deadline),
+            )
+        except httpx.TimeoutException:
+            return self._failed(f"timeout: no bridge reply within {deadline:g}s", report)
+        except httpx.HTTPError as e:
+            return self._failed(f"network: {e.__class__.__name__}: {e}", report)
+        except OSError as e:
+            return self._failed(f"network: {e}", report)
+        return self._done(method, _parse(r))
+
+    # ---- read ----
+
+    def get_lights(self, timeout: float | None = None) -> dict:
+        return self._request("GET", "/lights", timeout=timeout)
+
+    def get_groups(self, timeout: float | None = None) -> dict:
+        return self._request("GET", "/groups", timeout=timeout)
+
+    def get_scenes(self, timeout: float | None = None) -> dict:
+        return self._request("GET", "/scenes", timeout=timeout)
+
+    def get_config(self, timeout: float | None = None) -> dict:
+        return self._request("GET", "/config", timeout=timeout)
+
+    # ---- write ----
+
+    def set_light(self, light_id: str, state: dict,
+                  timeout: float | None = None) -> Any:
+        return self._request("PUT", f"/lights/{light_id}/state", state, timeout)
+
+    def set_group(self, group_id: str, action: dict,
+                  timeout: float | None = None) -> Any:
+        return self._request("PUT", f"/groups/{group_id}/action", action, timeout)
+
+    def recall_scene(self, scene_id: str, timeout: float | None = None) -> Any:
+        return self.set_group("0", {"scene": scene_id}, timeout)
+
+    def all_on(self, timeout: float | None = None) -> Any:
+        return self.set_group("0", {"on": True}, timeout)
+
+    def all_off(self, timeout: float | None = None) -> Any:
+        return self.set_group("0", {"on": False}, timeout)
+
+    # ---- liveness ----
+
+    def is_alive(self) -> bool:
+        """Cheap health check that doesn't require valid auth."""
+        url = f"http://{self.bridge_ip}/api/0/config"
+        result = self._send("GET", url, None, ALIVE_TIMEOUT, report=False)
+        return not (isinstance(result, dict) and "error" in result)
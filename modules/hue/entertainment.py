@@ -0,0 +1,323 @@
+"""Hue Entertainment streaming — frame-timed light animation at 25–50 Hz.
+
+REST writes top out around 10 light commands/s, so a 13-light animation
+driven over `/lights/<id>/state` gets one frame every ~1.3 s no matter
+how it's paced. The bridge's Entertainment channel takes a whole frame
+(every light's colour) per UDP datagram, tens of times a second:
+
+1. `PUT /groups/<entertainment group>` `{"stream": {"active": true}}`
+2. DTLS 1.2 handshake to `<bridge>:2100`, PSK auth — identity = the
+   username, key = the `clientkey` issued at pairing (scripts/hue_pair.py
+   already asks for one).
+3. One `HueStream` v1 message per frame (chunked at 10 lights).
+
+`EntertainmentEngine.play(frames, seconds)` renders a frame generator —
+`frames(t) -> {light_id: (r, g, b)}`, t in seconds since start, channels
+0.0–1.0 — on a fixed clock. A frame that misses its slot is dropped, not
+queued, so the animation keeps real time. When streaming isn't possible
+(no clientkey, no Entertainment group covering the lights, DTLS library
+missing, handshake refused) it falls back to sampling the same generator
+through the REST command scheduler as fast as the bridge budget allows.
+
+DTLS needs `python-mbedtls` (`pip install python-mbedtls` on the Pi); the
+standard library has no DTLS. Without it everything still works — just
+at REST speed.
+
+Offline: set `HUE_STREAM_TARGET=host:port` to send plain-UDP HueStream
+frames there instead of the bridge, and run the receiver in
+`fakebridge.py` (`python -m modules.hue.fakebridge`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from modules.hue import HueModule
+
+RGB = tuple[float, float, float]
+FrameGenerator = Callable[[float], dict[str, RGB]]
+
+STREAM_PORT = 2100
+DEFAULT_HZ = 50.0
+MIN_HZ, MAX_HZ = 25.0, 50.0
+# HueStream v1 carries at most 10 lights per message.
+LIGHTS_PER_MESSAGE = 10
+HANDSHAKE_TIMEOUT_S = 3.0
+PSK_CIPHER = "TLS-PSK-WITH-AES-128-GCM-SHA256"
+
+
+# ---- wire format ----
+
+def encode_frame(colors: dict[int, RGB], seq: int = 0) -> list[bytes]:
+    """HueStream v1 messages (RGB colour space) for one frame."""
+    header = b"HueStream" + bytes((0x01, 0x00, seq & 0xFF, 0x00, 0x00, 0x00, 0x00))
+    items = sorted(colors.items())
+    out = []
+    for i in range(0, len(items), LIGHTS_PER_MESSAGE):
+        body = bytearray(header)
+        for light_id, rgb in items[i:i + LIGHTS_PER_MESSAGE]:
+            body += b"\x00" + int(light_id).to_bytes(2, "big")
+            for c in rgb:
+                body += int(max(0.0, min(1.0, c)) * 0xFFFF).to_bytes(2, "big")
+        out.append(bytes(body))
+    return out
+
+
+def rgb_to_state(rgb: RGB) -> dict:
+    """sRGB (0–1) → v1 REST state (xy + bri), for the fallback path.
+    Same Wide Gamut D65 formula as the Lighting MCP's `_hex_to_xy`."""
+    peak = max(rgb)
+    if peak <= 0.004:
+        return {"on": False}
+
+    def _decode(c: float) -> float:
+        return ((c + 0.055) / 1.055) ** 2.4 if c > 0.04045 else c / 12.92
+
+    r, g, b = (_decode(max(0.0, min(1.0, c))) for c in rgb)
+    X = r * 0.664511 + g * 0.154324 + b * 0.162028
+    Y = r * 0.283881 + g * 0.668433 + b * 0.047685
+    Z = r * 0.000088 + g * 0.072310 + b * 0.986039
+    total = X + Y + Z
+    return {
+        "on": True,
+        "bri": max(1, min(254, round(peak * 254))),
+        "xy": [round(X / total, 4), round(Y / total, 4)],
+    }
+
+
+def hex_to_rgb(hexstr: str) -> RGB:
+    h = hexstr.strip().lstrip("#")
+    return tuple(int(h[i:i + 2], 16) / 255.0 for i in (0, 2, 4))  # type: ignore[return-value]
+
+
+def crossfade(start: dict[str, RGB], end: dict[str, RGB], seconds: float) -> FrameGenerator:
+    """Linear fade per light from `start` to `end` (missing start = black)."""
+    def frame(t: float) -> dict[str, RGB]:
+        k = min(1.0, t / seconds) if seconds > 0 else 1.0
+        return {
+            lid: tuple(a + (b - a) * k for a, b in zip(start.get(lid, (0.0, 0.0, 0.0)), rgb))
+            for lid, rgb in end.items()
+        }
+    return frame
+
+
+# ---- transports ----
+
+class UdpTransport:
+    """Plain UDP — only for the offline fake bridge; the real bridge drops
+    anything that isn't DTLS."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.connect((host, port))
+
+    def send(self, data: bytes) -> None:
+        self._sock.send(data)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class DtlsTransport:
+    """DTLS 1.2 PSK client over python-mbedtls. Blocking — connect it with
+    `asyncio.to_thread`; datagram sends don't block in practice."""
+
+    def __init__(self, host: str, identity: str, psk: bytes,
+                 port: int = STREAM_PORT) -> None:
+        from mbedtls import tls  # optional; ImportError → REST fallback
+
+        conf = tls.DTLSConfiguration(
+            pre_shared_key=(identity, psk),
+            ciphers=(PSK_CIPHER,),
+            validate_certificates=False,
+        )
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.settimeout(HANDSHAKE_TIMEOUT_S)
+        self._sock = tls.ClientContext(conf).wrap_socket(sock, server_hostname=None)
+        self._sock.connect((host, port))
+        deadline = time.monotonic() + HANDSHAKE_TIMEOUT_S
+        while True:
+            try:
+                self._sock.do_handshake()
+                break
+            except (tls.WantReadError, tls.WantWriteError):
+                if time.monotonic() > deadline:
+                    raise TimeoutError("DTLS handshake timed out")
+
+    def send(self, data: bytes) -> None:
+        self._sock.send(data)
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+# ---- frame clock ----
+
+async def run_frames(send: Callable[[dict[str, RGB]], None], frames: FrameGenerator,
+                     seconds: float, hz: float) -> dict[str, Any]:
+    """Call `send(frames(t))` on a fixed `hz` clock for `seconds`. Late
+    slots are skipped (counted in `dropped`) rather than bunched up."""
+    hz = max(MIN_HZ, min(MAX_HZ, hz))
+    period = 1.0 / hz
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    sent = dropped = 0
+    slot = 0
+    while True:
+        t = slot * period
+        if t > seconds + 1e-9:
+            break
+        delay = start + t - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -period:
+            # More than a whole slot behind — skip to the current one.
+            behind = int(-delay / period)
+            slot += behind
+            dropped += behind
+            continue
+        send(frames(min(t, seconds)))
+        sent += 1
+        slot += 1
+    return {"frames": sent, "dropped": dropped, "hz": hz,
+            "elapsed_s": round(loop.time() - start, 2)}
+
+
+# ---- engine ----
+
+class EntertainmentEngine:
+    def __init__(self, module: HueModule) -> None:
+        self._module = module
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self._seq = 0
+        self._last: dict[str, Any] = {"mode": None}
+
+    def stats(self) -> dict[str, Any]:
+        return dict(self._last)
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def play(self, frames: FrameGenerator, seconds: float,
+                   hz: float = DEFAULT_HZ, fallback: bool = True) -> dict[str, Any]:
+        """Render `frames` for `seconds`. One animation at a time; a second
+        caller waits its turn. With `fallback=False` nothing is sent when
+        streaming is unavailable (for purely cosmetic effects like a fade
+        the caller follows with a REST write anyway)."""
+        async with self._get_lock():
+            light_ids = list(frames(0.0))
+            try:
+                result = await self._stream(frames, seconds, hz, light_ids)
+            except Exception as e:
+                result = {"mode": "rest", "stream_error": f"{e.__class__.__name__}: {e}"}
+            if result.get("mode") != "stream":
+                if fallback:
+                    result.update(await self._rest(frames, seconds))
+                else:
+                    result["mode"] = "skipped"
+            self._last = result
+            return result
+
+    async def crossfade(self, start: dict[str, RGB], end: dict[str, RGB],
+                        seconds: float) -> dict[str, Any]:
+        """Stream a fade; no REST fallback (a REST fade would just be a
+        slower jump — callers commit the end state themselves)."""
+        return await self.play(crossfade(start, end, seconds), seconds, fallback=False)
+
+    # ---- streaming ----
+
+    async def _area(self, light_ids: list[str]) -> str | None:
+        """The Entertainment group covering most of `light_ids`."""
+        snap = await self._module.mirror.snapshot()
+        wanted = set(light_ids)
+        best, best_n = None, 0
+        for gid, g in snap.groups.items():
+            if not isinstance(g, dict) or g.get("type") != "Entertainment":
+                continue
+            n = len(wanted & {str(lid) for lid in g.get("lights") or []})
+            if n > best_n:
+                best, best_n = str(gid), n
+        return best
+
+    async def _stream(self, frames: FrameGenerator, seconds: float, hz: float,
+                      light_ids: list[str]) -> dict[str, Any]:
+        target = os.environ.get("HUE_STREAM_TARGET")
+        if target:
+            host, _, port = target.rpartition(":")
+            transport: Any = UdpTransport(host, int(port))
+            return await self._render(transport, frames, seconds, hz, None, light_ids)
+
+        cfg = self._module._config()
+        client = await self._module.get_async_client()
+        if client is None or not cfg or not cfg.get("clientkey"):
+            return {"mode": "rest", "stream_error": "no clientkey — re-pair to enable streaming"}
+        group_id = await self._area(light_ids)
+        if group_id is None:
+            return {"mode": "rest", "stream_error": "no Entertainment group covers these lights"}
+        members = {str(lid) for lid in self._module.mirror.current.groups[group_id].get("lights") or []}
+        reply = await client.set_stream(group_id, True)
+        if isinstance(reply, dict) and "error" in reply:
+            return {"mode": "rest", "stream_error": str(reply["error"])}
+        try:
+            transport = await asyncio.to_thread(
+                DtlsTransport, cfg["bridge_ip"], cfg["username"],
+                bytes.fromhex(cfg["clientkey"]),
+            )
+        except BaseException:
+            await client.set_stream(group_id, False)
+            raise
+        return await self._render(transport, frames, seconds, hz, group_id,
+                                  [lid for lid in light_ids if lid in members])
+
+    async def _render(self, transport: Any, frames: FrameGenerator, seconds: float,
+                      hz: float, group_id: str | None, light_ids: list[str]) -> dict[str, Any]:
+        keep = set(light_ids)
+
+        def send(colors: dict[str, RGB]) -> None:
+            self._seq += 1
+            payload = {int(lid): rgb for lid, rgb in colors.items() if lid in keep}
+            for msg in encode_frame(payload, self._seq):
+                transport.send(msg)
+
+        try:
+            stats = await run_frames(send, frames, seconds, hz)
+        finally:
+            transport.close()
+            if group_id is not None:
+                client = await self._module.get_async_client()
+                if client is not None:
+                    await client.set_stream(group_id, False)
+        return {"mode": "stream", "group_id": group_id, "lights": len(keep), **stats}
+
+    # ---- REST fallback ----
+
+    async def _rest(self, frames: FrameGenerator, seconds: float) -> dict[str, Any]:
+        """Sample `frames` as fast as the scheduler drains them. Each frame
+        is awaited before the next, so the wall clock picks which `t` gets
+        shown — slow, but on time."""
+        scheduler = self._module.scheduler
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sent = 0
+        while True:
+            t = min(loop.time() - start, seconds)
+            colors = frames(t)
+            await asyncio.gather(*(scheduler.set_light(lid, rgb_to_state(rgb))
+                                   for lid, rgb in colors.items()))
+            sent += 1
+            if t >= seconds:
+                break
+        return {"mode": "rest", "frames": sent,
+                "elapsed_s": round(loop.time() - start, 2)}
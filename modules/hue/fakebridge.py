@@ -0,0 +1,136 @@
+"""Fake Hue Entertainment receiver — exercise the streaming engine offline.
+
+Listens for plain-UDP `HueStream` v1 messages (what the engine sends when
+`HUE_STREAM_TARGET` is set), decodes them and keeps per-frame arrival
+times so frame rate and jitter can be checked without a bridge.
+
+    python -m modules.hue.fakebridge            # self-check: 2 s rainbow
+    python -m modules.hue.fakebridge --listen   # receive on :2100 and print
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import colorsys
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from modules.hue.entertainment import (
+    STREAM_PORT,
+    UdpTransport,
+    encode_frame,
+    run_frames,
+)
+
+HEADER = b"HueStream"
+
+
+def parse_message(data: bytes) -> dict | None:
+    """One HueStream v1 message → {"seq", "colorspace", "lights": {id: (r,g,b)}}
+    with channels as 0.0–1.0. None if it isn't one."""
+    if not data.startswith(HEADER) or len(data) < 16 or data[9] != 0x01:
+        return None
+    lights = {}
+    for off in range(16, len(data) - 8, 9):
+        light_id = int.from_bytes(data[off + 1:off + 3], "big")
+        rgb = tuple(int.from_bytes(data[off + 3 + 2 * i:off + 5 + 2 * i], "big") / 0xFFFF
+                    for i in range(3))
+        lights[light_id] = rgb
+    return {"seq": data[11], "colorspace": data[14], "lights": lights}
+
+
+@dataclass
+class FakeBridge(asyncio.DatagramProtocol):
+    """Collects decoded messages; messages sharing a sequence number are
+    one frame."""
+
+    messages: list[tuple[float, dict]] = field(default_factory=list)
+    rejected: int = 0
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        msg = parse_message(data)
+        if msg is None:
+            self.rejected += 1
+        else:
+            self.messages.append((time.monotonic(), msg))
+
+    def frames(self) -> list[tuple[float, dict]]:
+        out: list[tuple[float, dict]] = []
+        for at, msg in self.messages:
+            if out and out[-1][1]["seq"] == msg["seq"]:
+                out[-1][1]["lights"].update(msg["lights"])
+            else:
+                out.append((at, {"seq": msg["seq"], "lights": dict(msg["lights"])}))
+        return out
+
+    def report(self) -> dict:
+        frames = self.frames()
+        gaps = [b[0] - a[0] for a, b in zip(frames, frames[1:])]
+        return {
+            "frames": len(frames),
+            "rejected": self.rejected,
+            "lights": len(frames[-1][1]["lights"]) if frames else 0,
+            "mean_hz": round(1 / statistics.mean(gaps), 1) if gaps else None,
+            "jitter_ms": round(statistics.pstdev(gaps) * 1000, 2) if len(gaps) > 1 else None,
+        }
+
+
+async def start(host: str = "127.0.0.1", port: int = 0) -> tuple[asyncio.DatagramTransport, FakeBridge]:
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(FakeBridge, local_addr=(host, port))
+
+
+async def _self_check(lights: int, seconds: float, hz: float) -> None:
+    transport, bridge = await start()
+    port = transport.get_extra_info("sockname")[1]
+    udp = UdpTransport("127.0.0.1", port)
+
+    def rainbow(t: float) -> dict:
+        return {str(i + 1): colorsys.hsv_to_rgb((i / lights + t / seconds) % 1.0, 1.0, 1.0)
+                for i in range(lights)}
+
+    seq = 0
+
+    def send(colors: dict) -> None:
+        nonlocal seq
+        seq += 1
+        for msg in encode_frame({int(k): v for k, v in colors.items()}, seq):
+            udp.send(msg)
+
+    sent = await run_frames(send, rainbow, seconds, hz)
+    await asyncio.sleep(0.1)
+    udp.close()
+    transport.close()
+    print("sent:    ", sent)
+    print("received:", bridge.report())
+
+
+async def _listen(port: int) -> None:
+    transport, bridge = await start("0.0.0.0", port)
+    print(f"[fakebridge] listening on udp/{port} — Ctrl-C to stop")
+    try:
+        while True:
+            await asyncio.sleep(2)
+            print("[fakebridge]", bridge.report())
+    finally:
+        transport.close()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--listen", action="store_true", help="receive on --port and print stats")
+    p.add_argument("--port", type=int, default=STREAM_PORT)
+    p.add_argument("--lights", type=int, default=13)
+    p.add_argument("--seconds", type=float, default=2.0)
+    p.add_argument("--hz", type=float, default=50.0)
+    args = p.parse_args()
+    if args.listen:
+        asyncio.run(_listen(args.port))
+    else:
+        asyncio.run(_self_check(args.lights, args.seconds, args.hz))
+
+
+if __name__ == "__main__":
+    main()
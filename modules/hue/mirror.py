@@ -0,0 +1,413 @@
+"""Hue state mirror — one shared, versioned copy of the bridge's lights,
+groups and scenes.
+
+Before this, every reader fetched `GET /lights` itself: each
+`/api/studio/state` poll from the floor plan, each gradient screen's spec
+poll, every brand save. Eight gradient screens plus the admin UI were
+enough to get the bridge rate-limiting us. Now there is exactly one feed
+per process:
+
+- a poller that refreshes lights + groups every `POLL_INTERVAL_S`
+  (scenes every `SCENES_EVERY_N_POLLS` polls — they're big and rarely
+  change), and
+- the CLIP v2 event stream (`https://<bridge>/eventstream/clip/v2`) when
+  the bridge has one. Events patch light / group state in place as it
+  changes; while the stream is up the poller drops to a slow reconcile
+  so a missed event can't linger.
+
+Readers `await mirror.snapshot()` (or `await mirror.changed(version, t)`
+to block until something moves) and get an immutable `HueSnapshot`
+whose `version` only bumps when content actually changes. Staleness is
+bounded: a snapshot older than `MAX_STALENESS_S` is never handed out
+silently — the reader waits (at most `REFRESH_TIMEOUT_S`) on the one
+shared in-flight refresh, and if the bridge is down it gets the last
+good snapshot. `stats()` reports the snapshot age so a stuck feed shows
+up in `/api/modules` and `/api/modules/hue/mirror`.
+
+The feed is lazy: the first reader starts it and it parks itself after
+`IDLE_STOP_S` without readers, so an unpaired or unused install never
+touches the bridge.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+import httpx  # bundled via the anthropic SDK dependency
+
+if TYPE_CHECKING:
+    from modules.hue import HueModule
+
+POLL_INTERVAL_S = 2.0
+SCENES_EVERY_N_POLLS = 15
+# Poll cadence while the event stream is delivering changes.
+RECONCILE_INTERVAL_S = 30.0
+# Oldest snapshot a reader is handed without first trying to refresh it.
+MAX_STALENESS_S = 10.0
+# How long a reader waits on a refresh before settling for the old snapshot.
+REFRESH_TIMEOUT_S = 4.0
+# Park the feed when nobody has read the mirror for this long.
+IDLE_STOP_S = 120.0
+# Writes usually come in bursts (zone by zone); poll once after the burst.
+NUDGE_DEBOUNCE_S = 0.3
+# The bridge doesn't send keep-alives on an idle stream; reconnect after
+# this much silence so a half-dead TCP session can't hide.
+STREAM_READ_TIMEOUT_S = 120.0
+STREAM_BACKOFF_S = 5.0
+# Bridges without CLIP v2 (old firmware) answer 404 — don't keep asking.
+STREAM_RETRY_S = 300.0
+
+
+@dataclass(frozen=True)
+class HueSnapshot:
+    """Bridge state as of `fetched_at` (time.monotonic(); 0 = never).
+    Treat the dicts as read-only — they're shared by every reader."""
+
+    version: int = 0
+    fetched_at: float = 0.0
+    lights: dict = field(default_factory=dict)
+    groups: dict = field(default_factory=dict)
+    scenes: dict = field(default_factory=dict)
+    source: str = "empty"  # "poll" | "eventstream" | "empty"
+
+    def age(self) -> float | None:
+        if not self.fetched_at:
+            return None
+        return time.monotonic() - self.fetched_at
+
+
+def _is_error(result: Any) -> bool:
+    return not isinstance(result, dict) or "error" in result
+
+
+def _patch_state(state: dict, res: dict) -> None:
+    """Fold a CLIP v2 light / grouped_light update into a v1 state dict."""
+    on = res.get("on")
+    if isinstance(on, dict) and "on" in on:
+        state["on"] = bool(on["on"])
+    dim = res.get("dimming")
+    if isinstance(dim, dict) and dim.get("brightness") is not None:
+        # v2 brightness is 0–100 %, v1 bri is 1–254.
+        state["bri"] = max(1, min(254, round(float(dim["brightness"]) * 2.54)))
+    color = res.get("color")
+    if isinstance(color, dict) and isinstance(color.get("xy"), dict):
+        xy = color["xy"]
+        state["xy"] = [xy.get("x", 0.0), xy.get("y", 0.0)]
+        state["colormode"] = "xy"
+    ct = res.get("color_temperature")
+    if isinstance(ct, dict) and ct.get("mirek") is not None:
+        state["ct"] = ct["mirek"]
+        state["colormode"] = "ct"
+
+
+def _v1_id(res: dict, prefix: str) -> str | None:
+    ref = res.get("id_v1") or ""
+    return ref[len(prefix):] if ref.startswith(prefix) else None
+
+
+class HueMirror:
+    def __init__(self, module: HueModule) -> None:
+        self._module = module
+        self._snap = HueSnapshot()
+        self._bridge: tuple[str, str] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._poller: asyncio.Task | None = None
+        self._stream: asyncio.Task | None = None
+        self._refresh: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._changed: asyncio.Event | None = None
+        self._last_read = 0.0
+        self._scenes_poll = -SCENES_EVERY_N_POLLS
+        self._stream_state = "off"  # off | connecting | connected | down | unavailable
+        self._stream_retry_at = 0.0
+        self._counters = {
+            "polls": 0,
+            "poll_errors": 0,
+            "events": 0,
+            "inline_refreshes": 0,
+            "stale_served": 0,
+        }
+
+    # ---- read ----
+
+    @property
+    def current(self) -> HueSnapshot:
+        """Latest snapshot, no I/O and no freshness guarantee."""
+        return self._snap
+
+    async def snapshot(self) -> HueSnapshot:
+        """The shared snapshot, refreshed first if it's past the staleness
+        bound. Starts the feed on first use."""
+        self._last_read = time.monotonic()
+        client = await self._module.get_async_client()
+        if client is None:
+            return self._snap
+        self._bind(client.bridge_ip, client.username)
+        self._ensure_running()
+        if not self._fresh():
+            self._counters["inline_refreshes"] += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(self._shared_refresh()),
+                                       REFRESH_TIMEOUT_S)
+            except Exception:
+                pass  # timed out or failed — fall back to what we have
+            if not self._fresh():
+                self._counters["stale_served"] += 1
+        return self._snap
+
+    async def changed(self, version: int, timeout: float) -> HueSnapshot:
+        """Wait (at most `timeout`) for a snapshot whose version differs
+        from `version`, then return the current one. Counts as a read, so
+        a subscriber looping on this keeps the feed from parking."""
+        snap = await self.snapshot()
+        if snap.version != version:
+            return snap
+        if self._changed is None:
+            # Unpaired — nothing will ever publish; just pace the caller.
+            await asyncio.sleep(timeout)
+            return self._snap
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            pass
+        return self._snap
+
+    def nudge(self) -> None:
+        """Write hook: poll soon instead of waiting out the interval. Safe
+        from any thread (the sync client runs in worker threads). With the
+        event stream up the change arrives by itself, so it's a no-op."""
+        if self._stream_state == "connected":
+            return
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        snap = self._snap
+        age = snap.age()
+        return {
+            "version": snap.version,
+            "age_s": round(age, 1) if age is not None else None,
+            "source": snap.source,
+            "max_staleness_s": MAX_STALENESS_S,
+            "running": self._poller is not None and not self._poller.done(),
+            "stream": self._stream_state,
+            **self._counters,
+        }
+
+    # ---- feed lifecycle ----
+
+    def _fresh(self) -> bool:
+        if not self._snap.fetched_at:
+            return False
+        if self._stream_state == "connected":
+            return True
+        return self._snap.age() <= MAX_STALENESS_S
+
+    def _bind(self, bridge_ip: str, username: str) -> None:
+        """Re-pair / IP self-heal → the old state belongs to another bridge
+        (or another address of it); drop it and reconnect the stream."""
+        key = (bridge_ip, username)
+        if self._bridge == key:
+            return
+        self._bridge = key
+        self._snap = HueSnapshot(version=self._snap.version + 1)
+        self._scenes_poll = self._counters["polls"] - SCENES_EVERY_N_POLLS
+        self._stop_stream()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and events belong to the loop that made them.
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._changed = asyncio.Event()
+            self._poller = self._stream = self._refresh = None
+            self._stream_state = "off"
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._run_poller())
+
+    def _park(self) -> None:
+        self._stop_stream()
+        self._poller = None
+
+    def _stop_stream(self) -> None:
+        if self._stream is not None and not self._stream.done():
+            self._stream.cancel()
+        self._stream = None
+        self._stream_state = "off"
+        self._stream_retry_at = 0.0
+
+    async def _run_poller(self) -> None:
+        while True:
+            if time.monotonic() - self._last_read > IDLE_STOP_S:
+                self._park()
+                return
+            self._wake.clear()
+            try:
+                await self._shared_refresh()
+            except Exception as e:
+                print(f"[hue] mirror poll failed: {e}")
+            self._maybe_start_stream()
+            interval = (RECONCILE_INTERVAL_S if self._stream_state == "connected"
+                        else POLL_INTERVAL_S)
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+                await asyncio.sleep(NUDGE_DEBOUNCE_S)
+            except TimeoutError:
+                pass
+
+    # ---- polling ----
+
+    def _shared_refresh(self) -> asyncio.Task:
+        # Single-flight: the poller and any number of waiting readers all
+        # ride the same bridge round-trip.
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(self._poll())
+        return self._refresh
+
+    async def _poll(self) -> bool:
+        client = await self._module.get_async_client()
+        if client is None:
+            return False
+        self._bind(client.bridge_ip, client.username)
+        polls = self._counters["polls"]
+        want_scenes = (not self._snap.scenes
+                       or polls - self._scenes_poll >= SCENES_EVERY_N_POLLS)
+        reqs = [client.get_lights(timeout=REFRESH_TIMEOUT_S),
+                client.get_groups(timeout=REFRESH_TIMEOUT_S)]
+        if want_scenes:
+            reqs.append(client.get_scenes(timeout=REFRESH_TIMEOUT_S))
+        results = await asyncio.gather(*reqs)
+        self._counters["polls"] += 1
+        if any(_is_error(r) for r in results):
+            self._counters["poll_errors"] += 1
+            return False
+        parts = {"lights": results[0], "groups": results[1]}
+        if want_scenes:
+            parts["scenes"] = results[2]
+            self._scenes_poll = polls
+        self._publish(parts, "poll")
+        return True
+
+    def _publish(self, parts: dict, source: str) -> None:
+        snap = self._snap
+        changed = any(parts[k] != getattr(snap, k) for k in parts)
+        self._snap = replace(
+            snap, **parts,
+            version=snap.version + 1 if changed else snap.version,
+            fetched_at=time.monotonic(),
+            source=source,
+        )
+        if changed and self._changed is not None:
+            # Wake everyone in changed(), then arm a fresh event for the
+            # next round.
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    # ---- CLIP v2 event stream ----
+
+    def _maybe_start_stream(self) -> None:
+        if self._bridge is None or not self._snap.fetched_at:
+            return
+        if self._stream is not None and not self._stream.done():
+            return
+        if (self._stream_state == "unavailable"
+                and time.monotonic() < self._stream_retry_at):
+            return
+        self._stream = asyncio.get_running_loop().create_task(
+            self._run_stream(*self._bridge)
+        )
+
+    async def _run_stream(self, bridge_ip: str, username: str) -> None:
+        url = f"https://{bridge_ip}/eventstream/clip/v2"
+        headers = {"hue-application-key": username, "Accept": "text/event-stream"}
+        # The bridge's cert is signed by Signify's own CA, not a public one.
+        # LAN-only, same trust model as the plain-HTTP v1 API we already use.
+        async with httpx.AsyncClient(
+            verify=False,
+            timeout=httpx.Timeout(STREAM_READ_TIMEOUT_S, connect=2.0),
+        ) as http:
+            while True:
+                self._stream_state = "connecting"
+                try:
+                    async with http.stream("GET", url, headers=headers) as r:
+                        if r.status_code in (403, 404):
+                            self._stream_state = "unavailable"
+                            self._stream_retry_at = time.monotonic() + STREAM_RETRY_S
+                            return
+                        if r.status_code < 400:
+                            self._stream_state = "connected"
+                            async for line in r.aiter_lines():
+                                if line.startswith("data:"):
+                                    self._apply_events(line[5:].strip())
+                except (httpx.HTTPError, OSError):
+                    pass
+                # Anything that happened while we were away was missed —
+                # go back to fast polling (which also reconciles) until
+                # the stream is back.
+                self._stream_state = "down"
+                if self._wake is not None:
+                    self._wake.set()
+                await asyncio.sleep(STREAM_BACKOFF_S)
+
+    def _apply_events(self, payload: str) -> None:
+        try:
+            events = json.loads(payload)
+        except json.JSONDecodeError:
+            return
+        lights: dict | None = None
+        groups: dict | None = None
+        resync = False
+        for ev in events if isinstance(events, list) else []:
+            if not isinstance(ev, dict):
+                continue
+            for res in ev.get("data") or []:
+                if not isinstance(res, dict):
+                    continue
+                self._counters["events"] += 1
+                if ev.get("type") != "update" or res.get("type") == "scene":
+                    # Added / deleted resources and scene edits change the
+                    # shape of things — let a full poll pick them up.
+                    resync = True
+                    continue
+                if res.get("type") == "light":
+                    lid = _v1_id(res, "/lights/")
+                    cur = self._snap.lights.get(lid) if lid else None
+                    if not isinstance(cur, dict):
+                        continue
+                    lights = lights if lights is not None else dict(self._snap.lights)
+                    state = dict(cur.get("state") or {})
+                    _patch_state(state, res)
+                    lights[lid] = {**cur, "state": state}
+                elif res.get("type") == "grouped_light":
+                    gid = _v1_id(res, "/groups/")
+                    cur = self._snap.groups.get(gid) if gid else None
+                    if not isinstance(cur, dict):
+                        continue
+                    groups = groups if groups is not None else dict(self._snap.groups)
+                    action = dict(cur.get("action") or {})
+                    _patch_state(action, res)
+                    gstate = dict(cur.get("state") or {})
+                    if "on" in action:
+                        gstate["any_on"] = action["on"]
+                    groups[gid] = {**cur, "action": action, "state": gstate}
+        parts: dict = {}
+        if lights is not None:
+            parts["lights"] = lights
+        if groups is not None:
+            parts["groups"] = groups
+        if parts:
+            self._publish(parts, "eventstream")
+        if resync:
+            self._scenes_poll = self._counters["polls"] - SCENES_EVERY_N_POLLS
+            if self._wake is not None:
+                self._wake.set()
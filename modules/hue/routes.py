@@ -2,6 +2,10 @@
 
 Lives at /api/modules/hue/* so it cohabitates with the rest of the
 module registry endpoints. The Lights admin tab consumes these.
+
+The lights / groups / scenes reads are served from the module's shared
+state mirror, so admin tabs polling them cost the bridge nothing extra.
+Light / group / scene writes are queued on the module's command scheduler.
 """
 
 from __future__ import annotations
@@ -14,11 +18,16 @@ from modules import registry
 router = APIRouter()
 
 
-def _client():
+def _module():
     module = registry.get("hue")
     if module is None:
         raise HTTPException(status_code=503, detail="Hue module not registered")
-    client = getattr(module, "client", None)
+    return module
+
+
+async def _client():
+    module = _module()
+    client = await module.get_async_client()
     if client is None:
         raise HTTPException(
             status_code=503,
@@ -27,49 +36,72 @@ def _client():
     return client
 
 
+async def _mirrored(part: str):
+    client = await _client()
+    snap = await _module().mirror.snapshot()
+    if not snap.fetched_at:
+        # Never reached the bridge — ask it directly so the caller sees
+        # the real error instead of an empty map.
+        return await getattr(client, f"get_{part}")()
+    return getattr(snap, part)
+
+
 @router.get("/api/modules/hue/lights", response_class=JSONResponse)
 async def get_lights():
-    return _client().get_lights()
+    return await _mirrored("lights")
 
 
 @router.get("/api/modules/hue/groups", response_class=JSONResponse)
 async def get_groups():
-    return _client().get_groups()
+    return await _mirrored("groups")
 
 
 @router.get("/api/modules/hue/scenes", response_class=JSONResponse)
 async def get_scenes():
-    return _client().get_scenes()
+    return await _mirrored("scenes")
+
+
+@router.get("/api/modules/hue/mirror", response_class=JSONResponse)
+async def get_mirror():
+    """State-mirror health: snapshot version, age (s), feed source, stream
+    state and poll / event counters."""
+    return _module().mirror.stats()
 
 
 @router.get("/api/modules/hue/config", response_class=JSONResponse)
 async def get_config():
-    return _client().get_config()
+    client = await _client()
+    return await client.get_config()
 
 
 @router.put("/api/modules/hue/lights/{light_id}", response_class=JSONResponse)
 async def set_light(light_id: str, state: dict = Body(...)):
-    return _client().set_light(light_id, state)
+    await _client()
+    return await _module().scheduler.set_light(light_id, state)
 
 
 @router.put("/api/modules/hue/groups/{group_id}", response_class=JSONResponse)
 async def set_group(group_id: str, action: dict = Body(...)):
-    return _client().set_group(group_id, action)
+    await _client()
+    return await _module().scheduler.set_group(group_id, action)
 
 
 @router.post("/api/modules/hue/scenes/{scene_id}/recall", response_class=JSONResponse)
 async def recall_scene(scene_id: str):
-    return _client().recall_scene(scene_id)
+    await _client()
+    return await _module().scheduler.recall_scene(scene_id)
 
 
 @router.post("/api/modules/hue/all/on", response_class=JSONResponse)
 async def all_on():
-    return _client().all_on()
+    await _client()
+    return await _module().scheduler.set_group("0", {"on": True})
 
 
 @router.post("/api/modules/hue/all/off", response_class=JSONResponse)
 async def all_off():
-    return _client().all_off()
+    await _client()
+    return await _module().scheduler.set_group("0", {"on": False})
 
 
 # ---------------------------------------------------------------------
@@ -80,4 +112,5 @@ async def all_off():
 @router.post("/api/modules/hue/run_startup_test", response_class=JSONResponse)
 async def run_startup_test():
     from mcps.lighting.startup_test import run_startup_test as _run
-    return await _run(_client())
+    client = await _client()
+    return await _run(client, _module().scheduler, _module().entertainment)
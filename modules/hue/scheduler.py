@@ -0,0 +1,237 @@
+"""Hue command scheduler — every bridge write goes through one paced queue.
+
+The bridge accepts roughly 10 light commands/s and 1 group command/s;
+anything faster gets queued on the bridge, dropped, or answered with
+error 901 ("internal error"). Before this, brand changes, studio scenes,
+`set_zone_lights` and the startup rainbow each fired one `set_light` PUT
+per light in series, so a 13-spot change took seconds and sometimes lost
+commands. Now callers submit writes here and get a Future per command:
+
+- **Rate-aware.** Two token buckets match the bridge's budget: one for
+  light writes, one for group writes. The dispatcher never exceeds them.
+- **Coalescing.** A write to a light (or group) that already has one
+  waiting merges into it — later keys win, and a new colour replaces the
+  old colour mode instead of mixing xy with hue/sat. The merged command
+  keeps its place in the queue. It only merges when nothing queued since
+  can touch the same light (a group write after a light write, anything
+  after a group write); otherwise the write is queued as a new command,
+  so the end state is the one the callers asked for, in their order.
+  Every merged caller's Future resolves with the same result.
+- **Group folding.** When a run of queued light writes share one state
+  and together cover every light of a bridge group (from the state
+  mirror's group map), they go out as a single group action — if the
+  group bucket has a token; otherwise they go out one by one as usual.
+
+Writes are sent one at a time, in queue order, so two writes to the same
+light can never overtake each other on the wire.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from modules.hue import HueModule
+
+LIGHT_RATE_PER_S = 10.0
+LIGHT_BURST = 10
+GROUP_RATE_PER_S = 1.0
+GROUP_BURST = 1
+
+# Keys that select a colour mode; a write setting one replaces the others.
+_COLOR_KEYS = ("xy", "hue", "sat", "ct")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+        self._at = now
+
+    def ready(self) -> bool:
+        self._refill()
+        return self._tokens >= 1.0
+
+    async def take(self) -> None:
+        self._refill()
+        while self._tokens < 1.0:
+            await asyncio.sleep((1.0 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1.0
+
+
+def _merge(old: dict, new: dict) -> dict:
+    merged = dict(old)
+    if any(k in new for k in _COLOR_KEYS):
+        for k in _COLOR_KEYS:
+            merged.pop(k, None)
+        merged.pop("colormode", None)
+    merged.update(new)
+    return merged
+
+
+class _Command:
+    __slots__ = ("kind", "target", "body", "futures")
+
+    def __init__(self, kind: str, target: str, body: dict) -> None:
+        self.kind = kind  # "light" | "group"
+        self.target = target
+        self.body = body
+        self.futures: list[asyncio.Future] = []
+
+
+class HueScheduler:
+    def __init__(self, module: HueModule) -> None:
+        self._module = module
+        # Pending commands in send order.
+        self._queue: list[_Command] = []
+        self._lights = _TokenBucket(LIGHT_RATE_PER_S, LIGHT_BURST)
+        self._groups = _TokenBucket(GROUP_RATE_PER_S, GROUP_BURST)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker: asyncio.Task | None = None
+        self._counters = {
+            "submitted": 0,
+            "coalesced": 0,
+            "folded": 0,
+            "sent_light": 0,
+            "sent_group": 0,
+        }
+
+    # ---- submit ----
+
+    def set_light(self, light_id: str, state: dict) -> asyncio.Future:
+        """Queue a light state write. The Future resolves with the bridge
+        reply (or an `{"error": ...}` dict — never raises)."""
+        return self._submit("light", str(light_id), state)
+
+    def set_group(self, group_id: str, action: dict) -> asyncio.Future:
+        """Queue a group action (same contract as `set_light`)."""
+        return self._submit("group", str(group_id), action)
+
+    def recall_scene(self, scene_id: str) -> asyncio.Future:
+        return self.set_group("0", {"scene": scene_id})
+
+    def stats(self) -> dict[str, Any]:
+        return {"queued": len(self._queue), **self._counters}
+
+    def _submit(self, kind: str, target: str, body: dict) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures and the worker belong to the loop that made them.
+            self._loop = loop
+            self._queue.clear()
+            self._worker = None
+        self._counters["submitted"] += 1
+        fut = loop.create_future()
+        cmd = self._coalescable(kind, target, body)
+        if cmd is not None:
+            self._counters["coalesced"] += 1
+            cmd.body = _merge(cmd.body, body)
+        else:
+            cmd = _Command(kind, target, dict(body))
+            self._queue.append(cmd)
+        cmd.futures.append(fut)
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return fut
+
+    def _coalescable(self, kind: str, target: str, body: dict) -> _Command | None:
+        """The queued command a new write to `target` can merge into in
+        place: the last one for the same target, as long as nothing queued
+        after it overlaps — a group write behind a light write, or any write
+        behind a group write (groups can contain any light). A scene recall
+        isn't a state patch, so it never merges either way."""
+        if "scene" in body:
+            return None
+        for cmd in reversed(self._queue):
+            if cmd.kind == kind and cmd.target == target:
+                return None if "scene" in cmd.body else cmd
+            if kind == "group" or cmd.kind == "group":
+                return None
+        return None
+
+    # ---- dispatch ----
+
+    async def _run(self) -> None:
+        while self._queue:
+            head = self._queue[0]
+            if head.kind == "group":
+                self._queue.pop(0)
+                await self._groups.take()
+                await self._send(head, [head])
+                continue
+            run = self._light_run()
+            fold = self._fold(run) if self._groups.ready() else None
+            if fold is not None:
+                group_id, members = fold
+                self._queue = [cmd for cmd in self._queue if cmd not in members]
+                self._counters["folded"] += len(members)
+                await self._groups.take()
+                await self._send(_Command("group", group_id, members[0].body), members)
+                continue
+            self._queue.pop(0)
+            await self._lights.take()
+            await self._send(head, [head])
+
+    def _light_run(self) -> list[_Command]:
+        """Leading light writes up to the first queued group write — the
+        stretch that can be reordered / folded without changing the end
+        state."""
+        run = []
+        for cmd in self._queue:
+            if cmd.kind != "light":
+                break
+            run.append(cmd)
+        return run
+
+    def _fold(self, run: list[_Command]) -> tuple[str, list[_Command]] | None:
+        """Largest bridge group whose lights all have the same queued state
+        in `run` (at least two of them). Groups come from the mirror's last
+        snapshot; no snapshot means no folding."""
+        if len(run) < 2:
+            return None
+        by_light = {cmd.target: cmd for cmd in run}
+        snap = self._module.mirror.current
+        groups = [(gid, g.get("lights") or []) for gid, g in snap.groups.items()
+                  if isinstance(g, dict)]
+        # Group 0 is the bridge's implicit "all lights" group.
+        groups.append(("0", list(snap.lights)))
+        best: tuple[str, list[_Command]] | None = None
+        for gid, lights in groups:
+            members = [str(lid) for lid in lights]
+            if len(members) < 2 or (best and len(members) <= len(best[1])):
+                continue
+            cmds = [by_light.get(lid) for lid in members]
+            if any(c is None for c in cmds):
+                continue
+            if all(c.body == cmds[0].body for c in cmds):
+                best = (str(gid), cmds)
+        return best
+
+    async def _send(self, cmd: _Command, owners: list[_Command]) -> None:
+        try:
+            client = await self._module.get_async_client()
+            if client is None:
+                result: Any = {"error": "hue unavailable"}
+            elif cmd.kind == "group":
+                self._counters["sent_group"] += 1
+                result = await client.set_group(cmd.target, cmd.body)
+            else:
+                self._counters["sent_light"] += 1
+                result = await client.set_light(cmd.target, cmd.body)
+        except Exception as e:
+            # The clients report errors as dicts; this is a bug guard so a
+            # caller's Future can never hang.
+            result = {"error": f"scheduler: {e.__class__.__name__}: {e}"}
+        for owner in owners:
+            for fut in owner.futures:
+                if not fut.done():
+                    fut.set_result(result)
@@ -13,4 +13,6 @@ class PdfModule(DisplayModule):
         return True
 
     def get_screen_url(self, screen, base_url: str) -> str:
-        return base_url + "pdf/" + (screen.pdf or "")
+        # ?screen= lets the route pick the page images rendered for this
+        # screen's orientation (models/pdfs.py).
+        return base_url + "pdf/" + (screen.pdf or "") + f"?screen={screen.id}"
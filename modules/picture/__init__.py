@@ -13,4 +13,7 @@ class PictureModule(DisplayModule):
         return True
 
     def get_screen_url(self, screen, base_url: str) -> str:
-        return base_url + "picture/" + ((screen.picture or "").replace("/", "%2F"))
+        # ?screen= lets the route pick the derivative for this screen's
+        # orientation (models/pictures.py).
+        return (base_url + "picture/" + ((screen.picture or "").replace("/", "%2F"))
+                + f"?screen={screen.id}")
@@ -24,6 +24,10 @@ class ModuleRegistry:
         self._enabled: dict[str, bool] = {}
         # Entries: [{"id": "robot-panel", "manifest_url": "http://..."}]
         self._external: list[dict] = []
+        # Bumped on every registration / enabled-state change, so caches
+        # keyed on "which module serves this" (modules/content_url.py)
+        # know when to recompute.
+        self.generation = 0
         self._load()
 
     # --- registration ---------------------------------------------------
@@ -39,10 +43,12 @@ class ModuleRegistry:
         # Default new modules to enabled. Persistence kicks in only when the
         # admin toggles it explicitly.
         self._enabled.setdefault(module.id, True)
+        self.generation += 1
         print(f"[modules] registered: {module.id} ({', '.join(module.type)})")
 
     def unregister(self, module_id: str) -> None:
-        self._modules.pop(module_id, None)
+        if self._modules.pop(module_id, None) is not None:
+            self.generation += 1
 
     # --- lookup ---------------------------------------------------------
 
@@ -59,10 +65,12 @@ class ModuleRegistry:
 
     def enable(self, module_id: str) -> None:
         self._enabled[module_id] = True
+        self.generation += 1
         self._save()
 
     def disable(self, module_id: str) -> None:
         self._enabled[module_id] = False
+        self.generation += 1
         self._save()
 
     # --- external modules ----------------------------------------------
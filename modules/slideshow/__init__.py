@@ -13,4 +13,4 @@ class SlideshowModule(DisplayModule):
         return True
 
     def get_screen_url(self, screen, base_url: str) -> str:
-        return base_url + "slideshow/" + (screen.slideshow or "")
+        return base_url + "slideshow/" + (screen.slideshow or "") + f"?screen={screen.id}"
@@ -13,4 +13,6 @@ class VideoModule(DisplayModule):
         return True
 
     def get_screen_url(self, screen, base_url: str) -> str:
-        return base_url + "video/" + (screen.video or "")
+        # ?screen= lets the route pick the rendition for this screen's
+        # orientation (models/videos.py).
+        return base_url + "video/" + (screen.video or "") + f"?screen={screen.id}"
@@ -1,8 +1,10 @@
+import asyncio
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
 from .models import NewsSource, NewsArticle
 from .manager import news_manager
+from .images import cache_article_images
 
 try:
     import feedparser
@@ -90,48 +92,130 @@ def extract_image_from_entry(entry) -> Optional[str]:
     return None
 
 
+# At most this many feeds download at once.
+FETCH_CONCURRENCY = 4
+FETCH_TIMEOUT_S = 20.0
+# How often the background scheduler looks for sources that are due.
+SCHEDULER_TICK_S = 60.0
+MAX_ENTRIES_PER_FEED = 20  # Limit to 20 most recent
+
+_client: Optional["httpx.AsyncClient"] = None
+_fetch_lock: Optional[asyncio.Lock] = None
+# The loop _client and _fetch_lock belong to. The server has one, but
+# fetch_all_sources_sync() starts a fresh loop on every call.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+def _entries_to_articles(source: NewsSource, feed) -> List[NewsArticle]:
+    articles = []
+    for entry in feed.entries[:MAX_ENTRIES_PER_FEED]:
+        title = entry.get('title', 'No title')
+        link = entry.get('link', '')
+
+        if not link:
+            continue
+
+        summary = clean_html(entry.get('summary', entry.get('description', '')))
+        published = parse_date(entry.get('published', entry.get('updated', '')))
+        image_url = extract_image_from_entry(entry)
+
+        article = NewsArticle(
+            source_id=source.id,
+            source_name=source.name,
+            title=title,
+            summary=summary,
+            image_url=image_url,
+            article_url=link,
+            published_date=published,
+        )
+        articles.append(article)
+    return articles
+
+
+def parse_feed(source: NewsSource, content) -> List[NewsArticle]:
+    """Parse a downloaded feed body (or, given a URL, fetch and parse it).
+    Blocking — the async pipeline runs it in a worker thread."""
+    try:
+        return _entries_to_articles(source, feedparser.parse(content))
+    except Exception as e:
+        print(f"Error parsing RSS feed {source.name}: {e}")
+        return []
+
+
 def fetch_rss_feed(source: NewsSource) -> List[NewsArticle]:
-    """Fetch articles from an RSS feed"""
+    """Fetch articles from an RSS feed (blocking, unconditional)"""
     if not FEEDPARSER_AVAILABLE:
         print(f"Cannot fetch {source.name}: feedparser not installed")
         return []
-
-    articles = []
+    return parse_feed(source, source.url)
+
+
+def _bind_loop() -> None:
+    """Forget the client and lock if they were made on another loop (their
+    connections and waiters can't be used from this one)."""
+    global _client, _fetch_lock, _loop
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _client = None
+        _fetch_lock = None
+        _loop = loop
+
+
+async def _close_client() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+def _get_client() -> "httpx.AsyncClient":
+    global _client
+    _bind_loop()
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=FETCH_TIMEOUT_S,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=FETCH_CONCURRENCY),
+            headers={"User-Agent": "screen-mgr news fetcher"},
+        )
+    return _client
+
+
+async def _fetch_rss_conditional(source: NewsSource) -> List[NewsArticle]:
+    """Download a feed with the source's stored validators. A 304 costs one
+    round-trip and no parsing; a 200 updates the validators and is parsed
+    in a worker thread."""
+    headers = {}
+    if source.etag:
+        headers["If-None-Match"] = source.etag
+    if source.last_modified:
+        headers["If-Modified-Since"] = source.last_modified
     try:
-        feed = feedparser.parse(source.url)
-
-        for entry in feed.entries[:20]:  # Limit to 20 most recent
-            title = entry.get('title', 'No title')
-            link = entry.get('link', '')
-
-            if not link:
-                continue
-
-            summary = clean_html(entry.get('summary', entry.get('description', '')))
-            published = parse_date(entry.get('published', entry.get('updated', '')))
-            image_url = extract_image_from_entry(entry)
-
-            article = NewsArticle(
-                source_id=source.id,
-                source_name=source.name,
-                title=title,
-                summary=summary,
-                image_url=image_url,
-                article_url=link,
-                published_date=published,
-            )
-            articles.append(article)
-
-    except Exception as e:
+        response = await _get_client().get(source.url, headers=headers)
+    except httpx.HTTPError as e:
         print(f"Error fetching RSS feed {source.name}: {e}")
-
-    return articles
+        return []
+    if response.status_code == 304:
+        print(f"{source.name}: not modified")
+        return []
+    if response.status_code != 200:
+        print(f"Error fetching RSS feed {source.name}: HTTP {response.status_code}")
+        return []
+    source.etag = response.headers.get("etag")
+    source.last_modified = response.headers.get("last-modified")
+    return await asyncio.to_thread(parse_feed, source, response.content)
 
 
 async def fetch_source(source: NewsSource) -> List[NewsArticle]:
     """Fetch articles from a source based on its type"""
     if source.type == "rss":
-        return fetch_rss_feed(source)
+        if not FEEDPARSER_AVAILABLE:
+            print(f"Cannot fetch {source.name}: feedparser not installed")
+            return []
+        if HTTPX_AVAILABLE:
+            return await _fetch_rss_conditional(source)
+        return await asyncio.to_thread(fetch_rss_feed, source)
     elif source.type == "api":
         # API fetching could be implemented here
         print(f"API fetching not yet implemented for {source.name}")
@@ -142,30 +226,87 @@ async def fetch_source(source: NewsSource) -> List[NewsArticle]:
     return []
 
 
+def is_due(source: NewsSource, now: Optional[datetime] = None) -> bool:
+    """Whether `fetch_interval_hours` has passed since the last fetch."""
+    if source.last_fetched is None:
+        return True
+    now = now or datetime.now(source.last_fetched.tzinfo)
+    return now - source.last_fetched >= timedelta(hours=source.fetch_interval_hours)
+
+
+async def fetch_sources(sources: List[NewsSource]) -> int:
+    """Fetch the given sources concurrently (at most FETCH_CONCURRENCY at a
+    time, highest priority first) and store their new articles. Returns the
+    number of new articles."""
+    global _fetch_lock
+    _bind_loop()
+    if _fetch_lock is None:
+        _fetch_lock = asyncio.Lock()
+    sources = sorted(sources, key=lambda s: s.priority, reverse=True)
+    gate = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def _one(source: NewsSource) -> List[NewsArticle]:
+        async with gate:
+            print(f"Fetching from {source.name}...")
+            articles = await fetch_source(source)
+            source.last_fetched = datetime.now()
+            return articles
+
+    # One pass at a time: a manual refresh while the scheduler is mid-pass
+    # waits for it rather than downloading the same feeds twice.
+    async with _fetch_lock:
+        results = await asyncio.gather(*(_one(s) for s in sources))
+        # One deduplicated insert + one save for the whole pass.
+        counts = news_manager.bulk_add_articles([a for articles in results for a in articles])
+        total_new = counts["inserted"]
+        # last_fetched + validators for the whole pass in one save
+        if sources:
+            news_manager.save_sources()
+        # Pull the new articles' images onto the hub (stored copies only).
+        if total_new:
+            stored = [news_manager.get_article_by_url(a.article_url) for articles in results for a in articles]
+            await cache_article_images(a for a in stored if a is not None)
+
+    print(f"Fetched {total_new} new articles")
+    return total_new
+
+
 async def fetch_all_sources() -> int:
-    """Fetch articles from all enabled sources"""
-    sources = news_manager.get_sources(enabled_only=True)
-    total_new = 0
+    """Fetch articles from all enabled sources, due or not"""
+    return await fetch_sources(news_manager.get_sources(enabled_only=True))
 
-    for source in sources:
-        print(f"Fetching from {source.name}...")
-        articles = await fetch_source(source)
 
-        for article in articles:
-            existing = next((a for a in news_manager.articles if a.article_url == article.article_url), None)
-            if not existing:
-                news_manager.add_article(article)
-                total_new += 1
+async def fetch_due_sources() -> int:
+    """Fetch only the enabled sources whose interval has elapsed"""
+    return await fetch_sources([s for s in news_manager.get_sources(enabled_only=True) if is_due(s)])
 
-        # Update last_fetched
-        source.last_fetched = datetime.now()
-        news_manager.save_sources()
 
-    print(f"Fetched {total_new} new articles")
-    return total_new
+async def _scheduler_loop():
+    while True:
+        try:
+            await fetch_due_sources()
+        except Exception as e:
+            print(f"News scheduler pass failed: {e}")
+        await asyncio.sleep(SCHEDULER_TICK_S)
+
+
+def ensure_scheduler_running() -> None:
+    """Start the background fetch scheduler on the running loop if it isn't
+    already. The news admin and display routes call this, so feeds stay
+    fresh while anything news-related is in use."""
+    global _scheduler_task
+    if _scheduler_task is not None and not _scheduler_task.done():
+        return
+    _scheduler_task = asyncio.get_running_loop().create_task(_scheduler_loop())
 
 
 def fetch_all_sources_sync() -> int:
-    """Synchronous wrapper for fetch_all_sources"""
-    import asyncio
-    return asyncio.run(fetch_all_sources())
+    """Synchronous wrapper for fetch_all_sources. Runs on a loop of its own,
+    so the HTTP client is closed with it."""
+    async def _run() -> int:
+        try:
+            return await fetch_all_sources()
+        finally:
+            await _close_client()
+
+    return asyncio.run(_run())
@@ -0,0 +1,202 @@
+"""News image cache: article images served from the hub, not the publisher.
+
+The news templates used to hotlink `image_url`, so every kiosk refetched
+full-size hero images over the studio uplink on each rotation and a slow
+CDN made slides pop in late. Now images are downloaded once at ingest,
+stored by the SHA-256 of their bytes (identical images from different URLs
+share one entry) and resized per display mode. The resized variants are
+WebP, or JPEG when Pillow has no WebP support. `/news/img/{digest}/{mode}`
+serves them with immutable cache headers, since a digest's content never
+changes. The article records the digest in `image_id`, and
+`NewsArticle.display_image_url(mode)` points at the local variant.
+
+Resizing needs Pillow. Without it the original bytes are still cached and
+served locally, just not resized.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from .manager import DATA_DIR, news_manager
+from .models import NewsArticle
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+    WEBP_AVAILABLE = features.check("webp")
+except ImportError:
+    PIL_AVAILABLE = False
+    WEBP_AVAILABLE = False
+    print("Warning: Pillow not installed. News images are cached but not resized.")
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+IMAGE_DIR = os.path.join(DATA_DIR, "news_images")
+
+# Bounding box per display mode (fit inside, never upscaled).
+MODE_SIZES: Dict[str, Tuple[int, int]] = {
+    "portrait": (1080, 1350),
+    "landscape": (1920, 1080),
+    "presentation": (1920, 1080),
+}
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+DOWNLOAD_CONCURRENCY = 4
+DOWNLOAD_TIMEOUT_S = 20.0
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+# Leading bytes -> media type, for serving an un-resized original. Raster
+# formats only: an SVG served from the hub's own origin could run script.
+_MAGIC = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),  # checked for "WEBP" at offset 8 below
+)
+
+# Image URLs that failed this process, so a broken one isn't retried on
+# every fetch pass.
+_failed: set = set()
+
+
+def _entry_dir(digest: str) -> str:
+    return os.path.join(IMAGE_DIR, digest[:2], digest)
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _sniff(data: bytes) -> Optional[str]:
+    head = data[:16]
+    for magic, media_type in _MAGIC:
+        if head.startswith(magic):
+            if magic == b"RIFF" and head[8:12] != b"WEBP":
+                return None
+            return media_type
+    return None
+
+
+def _make_variants(entry: str, data: bytes):
+    import io
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        for mode, size in MODE_SIZES.items():
+            variant = img.copy()
+            variant.thumbnail(size, Image.LANCZOS)
+            out = io.BytesIO()
+            if WEBP_AVAILABLE:
+                variant.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+                name = f"{mode}.webp"
+            else:
+                variant.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                name = f"{mode}.jpg"
+            _write_atomic(os.path.join(entry, name), out.getvalue())
+
+
+def store_image(data: bytes) -> Optional[str]:
+    """Store image bytes and their variants; return the digest, or None if
+    the bytes aren't an image. Blocking (hashing + resizing) — run it in a
+    worker thread."""
+    if _sniff(data) is None:
+        return None
+    digest = hashlib.sha256(data).hexdigest()
+    entry = _entry_dir(digest)
+    original = os.path.join(entry, "original")
+    if os.path.exists(original):
+        return digest
+    os.makedirs(entry, exist_ok=True)
+    if PIL_AVAILABLE:
+        try:
+            _make_variants(entry, data)
+        except Exception as e:
+            # Undecodable by Pillow: the original is still served.
+            print(f"News image {digest[:12]}: no variants ({e})")
+    # Written last: its presence marks the entry complete.
+    _write_atomic(original, data)
+    return digest
+
+
+def variant_path(digest: str, mode: str) -> Optional[Tuple[str, str]]:
+    """(path, media type) of the best stored file for a digest and mode, or
+    None if there's nothing (or the arguments aren't a valid pair)."""
+    if not _DIGEST_RE.match(digest) or mode not in MODE_SIZES:
+        return None
+    entry = _entry_dir(digest)
+    for name, media_type in ((f"{mode}.webp", "image/webp"), (f"{mode}.jpg", "image/jpeg")):
+        path = os.path.join(entry, name)
+        if os.path.exists(path):
+            return path, media_type
+    original = os.path.join(entry, "original")
+    try:
+        with open(original, "rb") as f:
+            media_type = _sniff(f.read(16))
+    except OSError:
+        return None
+    return original, media_type or "application/octet-stream"
+
+
+async def _download(client, url: str) -> Optional[bytes]:
+    async with client.stream("GET", url) as response:
+        if response.status_code != 200:
+            return None
+        if int(response.headers.get("content-length") or 0) > MAX_IMAGE_BYTES:
+            return None
+        chunks, size = [], 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > MAX_IMAGE_BYTES:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+async def cache_article_images(articles: Iterable[NewsArticle]) -> int:
+    """Download, store and link the images of articles that have an
+    `image_url` but no `image_id` yet. Returns how many were linked."""
+    if not HTTPX_AVAILABLE:
+        return 0
+    todo = [a for a in articles if a.image_url and not a.image_id and a.image_url not in _failed]
+    if not todo:
+        return 0
+    gate = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+    async def _one(client, article: NewsArticle) -> Optional[str]:
+        async with gate:
+            # Anything, not just httpx.HTTPError: a feed can carry a URL
+            # httpx rejects (InvalidURL) or a garbage Content-Length, and
+            # one bad image mustn't cost the batch its save.
+            try:
+                data = await _download(client, article.image_url)
+                digest = await asyncio.to_thread(store_image, data) if data else None
+            except Exception as e:
+                print(f"News image download failed ({article.image_url}): {e}")
+                digest = None
+        if digest is None:
+            _failed.add(article.image_url)
+        return digest
+
+    async with httpx.AsyncClient(
+        timeout=DOWNLOAD_TIMEOUT_S,
+        follow_redirects=True,
+        headers={"User-Agent": "screen-mgr news fetcher"},
+    ) as client:
+        digests = await asyncio.gather(*(_one(client, a) for a in todo))
+    # One save for the whole batch.
+    return news_manager.update_articles(
+        {a.id: {"image_id": d} for a, d in zip(todo, digests) if d}
+    )
@@ -1,7 +1,9 @@
+import bisect
 import json
 import os
+import threading
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import ValidationError
 from .models import NewsSource, NewsArticle, NewsPlaylist, ArticleStatus
 
@@ -11,11 +13,35 @@ ARTICLES_FILE = os.path.join(DATA_DIR, "news_articles.json")
 PLAYLISTS_FILE = os.path.join(DATA_DIR, "news_playlists.json")
 
 
+def _value(v):
+    # Enum members hash by name, not value: normalise before using as a key.
+    return getattr(v, "value", v)
+
+
+def _sort_key(article: NewsArticle) -> float:
+    # Newest first; bisect keeps lists ascending, so negate.
+    return -(article.published_date or article.fetched_date).timestamp()
+
+
 class NewsManager:
     def __init__(self):
         self.sources: List[NewsSource] = []
         self.articles: List[NewsArticle] = []
+        # id -> article and article_url -> article over self.articles. Every
+        # mutation below keeps them in step; _reindex() rebuilds them.
+        self._by_id: Dict[str, NewsArticle] = {}
+        self._by_url: Dict[str, NewsArticle] = {}
+        # Materialised listings, newest first, keyed (status, category) with
+        # None as "any": (None, None), (status, None), (None, category) and
+        # (status, category). Maintained with bisect on every mutation, so a
+        # listing is a slice. Articles handed out must be changed through
+        # update_article, which moves them between views.
+        self._views: Dict[Tuple[Optional[str], Optional[str]], List[NewsArticle]] = {}
         self.playlists: List[NewsPlaylist] = []
+        # Bumped on any article or playlist change; display caches (playlist
+        # resolution here, rendered pages upstream) key on it.
+        self.version = 0
+        self._playlist_cache: Dict[str, Tuple[int, Tuple[NewsArticle, ...]]] = {}
         self._ensure_data_dir()
         self.load_all()
 
@@ -51,6 +77,42 @@ class NewsManager:
         except (ValidationError, json.JSONDecodeError) as e:
             print(f"Error loading news articles: {e}")
             self.articles = []
+        self._reindex()
+
+    def _reindex(self):
+        self._by_id = {a.id: a for a in self.articles}
+        self._by_url = {}
+        self._views = {}
+        for a in self.articles:
+            # First one wins, as with the old linear duplicate check.
+            self._by_url.setdefault(a.article_url, a)
+            for vk in self._view_keys(a):
+                self._views.setdefault(vk, []).append(a)
+        for view in self._views.values():
+            view.sort(key=_sort_key)
+
+    @staticmethod
+    def _view_keys(article: NewsArticle):
+        status = _value(article.status)
+        category = getattr(article, 'category', 'General')
+        return ((None, None), (status, None), (None, category), (status, category))
+
+    def _view_add(self, article: NewsArticle):
+        for vk in self._view_keys(article):
+            bisect.insort_right(self._views.setdefault(vk, []), article, key=_sort_key)
+
+    def _view_remove(self, article: NewsArticle):
+        key = _sort_key(article)
+        for vk in self._view_keys(article):
+            view = self._views.get(vk, [])
+            i = bisect.bisect_left(view, key, key=_sort_key)
+            while i < len(view) and view[i] is not article:
+                i += 1
+            if i < len(view):
+                del view[i]
+
+    def _changed(self):
+        self.version += 1
 
     def load_playlists(self):
         try:
@@ -69,10 +131,12 @@ class NewsManager:
             json.dump([s.model_dump(mode="json") for s in self.sources], f, indent=2, default=str)
 
     def save_articles(self):
+        self._changed()
         with open(ARTICLES_FILE, "w", encoding="utf-8") as f:
             json.dump([a.model_dump(mode="json") for a in self.articles], f, indent=2, default=str)
 
     def save_playlists(self):
+        self._changed()
         with open(PLAYLISTS_FILE, "w", encoding="utf-8") as f:
             json.dump([p.model_dump(mode="json") for p in self.playlists], f, indent=2, default=str)
 
@@ -135,60 +199,89 @@ class NewsManager:
 
     # === Article CRUD ===
     def get_articles(self, status: Optional[ArticleStatus] = None, category: Optional[str] = None, content_type: Optional[str] = None, limit: int = 50) -> List[NewsArticle]:
-        articles = self.articles
-        if status:
-            articles = [a for a in articles if a.status == status]
-        if category:
-            articles = [a for a in articles if getattr(a, 'category', 'General') == category]
+        # Already sorted by published date descending
+        view = self._views.get((_value(status) or None, category or None), [])
         if content_type:
-            articles = [a for a in articles if getattr(a, 'content_type', 'article') == content_type]
-        # Sort by published date descending
-        articles = sorted(articles, key=lambda a: a.published_date or a.fetched_date, reverse=True)
-        return articles[:limit]
+            content_type = _value(content_type)
+            matches = (a for a in view if _value(getattr(a, 'content_type', 'article')) == content_type)
+            return [a for _, a in zip(range(limit), matches)]
+        return view[:limit]
 
     def get_approved_articles(self, category: Optional[str] = None, limit: int = 20) -> List[NewsArticle]:
         """Get approved and featured articles for display"""
-        approved = [a for a in self.articles if a.status in (ArticleStatus.APPROVED, ArticleStatus.FEATURED)]
-        if category:
-            approved = [a for a in approved if getattr(a, 'category', 'General') == category]
         # Featured first, then by date
-        approved = sorted(approved, key=lambda a: (a.status != ArticleStatus.FEATURED, -(a.published_date or a.fetched_date).timestamp()))
-        return approved[:limit]
+        featured = self._views.get((ArticleStatus.FEATURED.value, category or None), [])[:limit]
+        approved = self._views.get((ArticleStatus.APPROVED.value, category or None), [])
+        return featured + approved[:limit - len(featured)]
 
     def get_categories(self) -> List[str]:
         """Get all unique categories from articles"""
-        categories = set()
-        for article in self.articles:
-            cat = getattr(article, 'category', 'General')
-            if cat:
-                categories.add(cat)
-        return sorted(list(categories))
+        return sorted(cat for (status, cat), view in self._views.items() if status is None and cat and view)
 
     def get_article(self, article_id: str) -> Optional[NewsArticle]:
-        return next((a for a in self.articles if a.id == article_id), None)
+        return self._by_id.get(article_id)
+
+    def get_article_by_url(self, article_url: str) -> Optional[NewsArticle]:
+        return self._by_url.get(article_url)
+
+    def _insert_article(self, article: NewsArticle) -> bool:
+        """Index and append unless the URL is already known. No save."""
+        if article.article_url in self._by_url:
+            return False
+        self.articles.append(article)
+        self._by_id[article.id] = article
+        self._by_url[article.article_url] = article
+        self._view_add(article)
+        return True
 
     def add_article(self, article: NewsArticle) -> NewsArticle:
         # Check for duplicate by URL
-        existing = next((a for a in self.articles if a.article_url == article.article_url), None)
-        if existing:
-            return existing
-        self.articles.append(article)
+        if not self._insert_article(article):
+            return self._by_url[article.article_url]
         self.save_articles()
         return article
 
+    def _apply_updates(self, article: NewsArticle, updates: dict):
+        """Set fields and keep the indexes and views in step. No save."""
+        old_url = article.article_url
+        self._view_remove(article)
+        for key, value in updates.items():
+            if hasattr(article, key):
+                setattr(article, key, value)
+        self._view_add(article)
+        if article.article_url != old_url:
+            if self._by_url.get(old_url) is article:
+                del self._by_url[old_url]
+            self._by_url.setdefault(article.article_url, article)
+
     def update_article(self, article_id: str, updates: dict) -> Optional[NewsArticle]:
         article = self.get_article(article_id)
         if article:
-            for key, value in updates.items():
-                if hasattr(article, key):
-                    setattr(article, key, value)
+            self._apply_updates(article, updates)
             self.save_articles()
         return article
 
+    def update_articles(self, updates: Dict[str, dict]) -> int:
+        """Apply {article_id: updates} as one batch with a single save.
+        Returns how many of the articles exist."""
+        found = 0
+        for article_id, changes in updates.items():
+            article = self.get_article(article_id)
+            if article:
+                self._apply_updates(article, changes)
+                found += 1
+        if found:
+            self.save_articles()
+        return found
+
     def delete_article(self, article_id: str) -> bool:
         article = self.get_article(article_id)
         if article:
             self.articles.remove(article)
+            self._view_remove(article)
+            del self._by_id[article_id]
+            if self._by_url.get(article.article_url) is article:
+                del self._by_url[article.article_url]
             self.save_articles()
             return True
         return False
@@ -202,9 +295,13 @@ class NewsManager:
     def feature_article(self, article_id: str) -> Optional[NewsArticle]:
         return self.update_article(article_id, {"status": ArticleStatus.FEATURED})
 
-    def bulk_add_articles(self, articles: List[NewsArticle]):
-        for article in articles:
-            self.add_article(article)
+    def bulk_add_articles(self, articles: List[NewsArticle]) -> Dict[str, int]:
+        """Add every article whose URL isn't stored yet (including duplicates
+        within the batch) and save once. Returns inserted/skipped counts."""
+        inserted = sum(1 for article in articles if self._insert_article(article))
+        if inserted:
+            self.save_articles()
+        return {"inserted": inserted, "skipped": len(articles) - inserted}
 
     # === Playlist CRUD ===
     def get_playlists(self, active_only: bool = False) -> List[NewsPlaylist]:
@@ -223,17 +320,23 @@ class NewsManager:
             return sorted(active, key=lambda p: (p.year, p.week_number), reverse=True)[0]
         return None
 
-    def get_playlist_articles(self, playlist_id: str) -> List[NewsArticle]:
-        """Get articles in a playlist, in order"""
+    def get_playlist_articles(self, playlist_id: str) -> Tuple[NewsArticle, ...]:
+        """Get articles in a playlist, in order. Resolved once per
+        `version`; later calls return the cached tuple."""
+        cached = self._playlist_cache.get(playlist_id)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
         playlist = self.get_playlist(playlist_id)
         if not playlist:
-            return []
+            return ()
         articles = []
         for aid in playlist.article_ids:
             article = self.get_article(aid)
             if article:
                 articles.append(article)
-        return articles
+        resolved = tuple(articles)
+        self._playlist_cache[playlist_id] = (self.version, resolved)
+        return resolved
 
     def create_playlist(self, name: str, week_number: int, year: int) -> NewsPlaylist:
         playlist = NewsPlaylist(name=name, week_number=week_number, year=year)
@@ -296,8 +399,46 @@ class NewsManager:
         """Remove articles older than specified days"""
         cutoff = datetime.now() - timedelta(days=days_old)
         self.articles = [a for a in self.articles if (a.fetched_date or datetime.now()) > cutoff]
+        self._reindex()
         self.save_articles()
 
 
+def _create_manager() -> NewsManager:
+    # NEWS_STORE=sqlite switches to the SQLite backend (news/sqlite_store.py);
+    # the JSON files stay the default.
+    if os.environ.get("NEWS_STORE", "json").strip().lower() == "sqlite":
+        from .sqlite_store import SqliteNewsManager
+        return SqliteNewsManager()
+    return NewsManager()
+
+
+class _LazyManager:
+    """Stands in for the manager until something uses it.
+
+    Building it parses every article in data/news_articles.json (or opens
+    and maybe migrates the SQLite store). That used to happen on
+    `import news`, so every restart kept the screens blank for the time it
+    took. Now the first attribute access builds it. main.py calls
+    `preload()` to build it in a background thread while uvicorn starts,
+    so it is usually ready before the first news page is requested."""
+
+    def __init__(self):
+        self._manager: Optional[NewsManager] = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> NewsManager:
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = _create_manager()
+        return self._manager
+
+    def preload(self):
+        threading.Thread(target=self._get, name="news-preload", daemon=True).start()
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+
 # Singleton instance
-news_manager = NewsManager()
+news_manager = _LazyManager()
@@ -50,6 +50,10 @@ class NewsSource(BaseModel):
     fetch_interval_hours: int = Field(default=24)
     last_fetched: Optional[datetime] = Field(default=None)
     priority: int = Field(default=5, ge=1, le=10)
+    # Validators from the last 200 response, sent back as
+    # If-None-Match / If-Modified-Since so an unchanged feed is a 304.
+    etag: Optional[str] = Field(default=None)
+    last_modified: Optional[str] = Field(default=None)
 
     class Config:
         use_enum_values = True
@@ -70,10 +74,19 @@ class NewsArticle(BaseModel):
     expires_date: Optional[datetime] = Field(default=None)
     status: ArticleStatus = Field(default=ArticleStatus.PENDING)
     display_duration_seconds: int = Field(default=15)
+    # Digest of the locally cached copy of image_url (news/images.py).
+    image_id: Optional[str] = Field(default=None)
 
     class Config:
         use_enum_values = True
 
+    def display_image_url(self, mode: str = "landscape") -> Optional[str]:
+        """The hub-served variant of the image for a display mode, falling
+        back to the publisher's URL until it's cached."""
+        if self.image_id:
+            return f"/news/img/{self.image_id}/{mode}"
+        return self.image_url
+
 
 class NewsPlaylist(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
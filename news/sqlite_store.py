@@ -0,0 +1,360 @@
+"""SQLite backend for NewsManager (opt in with NEWS_STORE=sqlite).
+
+The JSON backend keeps every article in a list and rewrites the whole of
+data/news_articles.json on each add / edit / approve, with linear scans for
+`get_article` and the duplicate-URL check. That's fine for a few hundred
+articles and painful for thousands. Here articles live in one WAL-mode
+table indexed on id, article_url, status, category and date, so approving
+an article is a single-row UPDATE and lookups are index hits.
+
+Sources and playlists are a handful of rows each: they stay in memory
+like the JSON backend (callers mutate them and call save_sources() /
+save_playlists()), and those saves rewrite their table in one
+transaction.
+
+The first open of a fresh database imports the existing JSON files
+(they're left in place as a backup). To re-run the import by hand:
+
+    python -m news.sqlite_store [path/to/news.db]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from .manager import (
+    ARTICLES_FILE,
+    DATA_DIR,
+    PLAYLISTS_FILE,
+    SOURCES_FILE,
+    NewsManager,
+)
+from .models import ArticleStatus, NewsArticle, NewsPlaylist, NewsSource
+
+DB_FILE = os.path.join(DATA_DIR, "news.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    article_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    published_date TEXT,
+    -- published_date or fetched_date as a POSIX timestamp: the sort key
+    -- every listing uses.
+    sort_ts REAL NOT NULL,
+    fetched_ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_url ON articles (article_url);
+CREATE INDEX IF NOT EXISTS articles_status ON articles (status, sort_ts);
+CREATE INDEX IF NOT EXISTS articles_category ON articles (category, sort_ts);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published_date);
+CREATE INDEX IF NOT EXISTS articles_sort ON articles (sort_ts);
+CREATE TABLE IF NOT EXISTS sources (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+_VISIBLE = (ArticleStatus.APPROVED.value, ArticleStatus.FEATURED.value)
+
+
+def _ts(dt: Optional[datetime]) -> float:
+    # Naive datetimes are local time, as everywhere else in news/.
+    return (dt or datetime.now()).timestamp()
+
+
+def _article_row(a: NewsArticle) -> tuple:
+    return (
+        a.id,
+        a.article_url,
+        # Plain str: setattr() in update_article bypasses use_enum_values.
+        getattr(a.status, "value", a.status),
+        a.category or "General",
+        getattr(a.content_type, "value", a.content_type),
+        a.published_date.isoformat() if a.published_date else None,
+        _ts(a.published_date or a.fetched_date),
+        _ts(a.fetched_date),
+        a.model_dump_json(),
+    )
+
+
+_INSERT_ARTICLE = (
+    "INSERT OR IGNORE INTO articles (id, article_url, status, category, content_type,"
+    " published_date, sort_ts, fetched_ts, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _read_json_list(path: str, model) -> list:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [model(**item) for item in json.load(f)]
+    except FileNotFoundError:
+        return []
+    except (ValidationError, json.JSONDecodeError) as e:
+        print(f"Error reading {path} for migration: {e}")
+        return []
+
+
+def migrate_from_json(conn: sqlite3.Connection) -> dict:
+    """Import the JSON backend's files into `conn`. Rows whose id is
+    already present are skipped, so re-running is harmless. Returns the
+    number of rows imported per table."""
+    sources = _read_json_list(SOURCES_FILE, NewsSource)
+    articles = _read_json_list(ARTICLES_FILE, NewsArticle)
+    playlists = _read_json_list(PLAYLISTS_FILE, NewsPlaylist)
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO sources (id, position, data) VALUES (?, ?, ?)",
+            [(s.id, i, s.model_dump_json()) for i, s in enumerate(sources)],
+        )
+        n_sources = conn.total_changes - before
+        # The JSON backend never stored two articles with the same URL via
+        # add_article, but an edited URL could collide; keep the first.
+        seen = set()
+        rows = []
+        for a in articles:
+            if a.article_url not in seen:
+                seen.add(a.article_url)
+                rows.append(_article_row(a))
+        before = conn.total_changes
+        conn.executemany(_INSERT_ARTICLE, rows)
+        n_articles = conn.total_changes - before
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO playlists (id, position, data) VALUES (?, ?, ?)",
+            [(p.id, i, p.model_dump_json()) for i, p in enumerate(playlists)],
+        )
+        n_playlists = conn.total_changes - before
+    return {"sources": n_sources, "articles": n_articles, "playlists": n_playlists}
+
+
+def connect(path: str = DB_FILE) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    # executescript leaves us in autocommit; `with conn:` below opens
+    # transactions explicitly.
+    conn.isolation_level = ""
+    return conn
+
+
+class SqliteNewsManager(NewsManager):
+    """Same API as NewsManager; articles are queried, never held in memory."""
+
+    def __init__(self, path: str = DB_FILE):
+        self._ensure_data_dir()
+        fresh = not os.path.exists(path)
+        self._conn = connect(path)
+        # One writer at a time across threads (fetches may run off-loop).
+        self._lock = threading.RLock()
+        if fresh:
+            counts = migrate_from_json(self._conn)
+            if any(counts.values()):
+                print(f"News: imported {counts} from JSON into {path}")
+        self.sources: List[NewsSource] = []
+        self.playlists: List[NewsPlaylist] = []
+        # Listings are served by the (status|category, sort_ts) indexes; only
+        # the playlist resolution cache and its version are shared with the
+        # JSON backend.
+        self.version = 0
+        self._playlist_cache = {}
+        self.load_all()
+
+    # === Loading ===
+    def load_sources(self):
+        self.sources = self._load_table("sources", NewsSource)
+        if not self.sources:
+            self.sources = self._create_default_sources()
+            self.save_sources()
+
+    def load_articles(self):
+        pass  # nothing cached
+
+    def load_playlists(self):
+        self.playlists = self._load_table("playlists", NewsPlaylist)
+
+    def _load_table(self, table: str, model) -> list:
+        rows = self._conn.execute(f"SELECT data FROM {table} ORDER BY position").fetchall()
+        items = []
+        for (data,) in rows:
+            try:
+                items.append(model.model_validate_json(data))
+            except ValidationError as e:
+                print(f"Error loading news {table} row: {e}")
+        return items
+
+    # === Saving ===
+    def save_sources(self):
+        self._replace_table("sources", self.sources)
+
+    def save_articles(self):
+        pass  # every article change is written as it happens
+
+    def save_playlists(self):
+        self._changed()
+        self._replace_table("playlists", self.playlists)
+
+    def _replace_table(self, table: str, items: list):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {table}")
+            self._conn.executemany(
+                f"INSERT INTO {table} (id, position, data) VALUES (?, ?, ?)",
+                [(item.id, i, item.model_dump_json()) for i, item in enumerate(items)],
+            )
+
+    # === Articles ===
+    @property
+    def articles(self) -> List[NewsArticle]:
+        """Every article, for callers that still iterate the list. Prefer
+        the query methods."""
+        return self._query("SELECT data FROM articles")
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[NewsArticle]:
+        rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [NewsArticle.model_validate_json(data) for (data,) in rows]
+
+    def get_articles(self, status: Optional[ArticleStatus] = None, category: Optional[str] = None, content_type: Optional[str] = None, limit: int = 50) -> List[NewsArticle]:
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(getattr(status, "value", status))
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if content_type:
+            where.append("content_type = ?")
+            params.append(getattr(content_type, "value", content_type))
+        sql = "SELECT data FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql + " ORDER BY sort_ts DESC LIMIT ?", params + [limit])
+
+    def get_approved_articles(self, category: Optional[str] = None, limit: int = 20) -> List[NewsArticle]:
+        sql = "SELECT data FROM articles WHERE status IN (?, ?)"
+        params: list = list(_VISIBLE)
+        if category:
+            sql += " AND category = ?"
+            params.append(category)
+        # Featured first, then by date
+        sql += " ORDER BY status != ?, sort_ts DESC LIMIT ?"
+        return self._query(sql, params + [ArticleStatus.FEATURED.value, limit])
+
+    def get_categories(self) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT DISTINCT category FROM articles WHERE category != '' ORDER BY category"
+        ).fetchall()
+        return [c for (c,) in rows]
+
+    def get_article(self, article_id: str) -> Optional[NewsArticle]:
+        found = self._query("SELECT data FROM articles WHERE id = ?", (article_id,))
+        return found[0] if found else None
+
+    def get_article_by_url(self, article_url: str) -> Optional[NewsArticle]:
+        found = self._query("SELECT data FROM articles WHERE article_url = ? LIMIT 1", (article_url,))
+        return found[0] if found else None
+
+    def _has_url(self, article_url: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM articles WHERE article_url = ? LIMIT 1", (article_url,)
+        ).fetchone() is not None
+
+    def add_article(self, article: NewsArticle) -> NewsArticle:
+        with self._lock:
+            existing = self.get_article_by_url(article.article_url)
+            if existing:
+                return existing
+            with self._conn:
+                self._conn.execute(_INSERT_ARTICLE, _article_row(article))
+            self._changed()
+        return article
+
+    def _write_updates(self, article_id: str, updates: dict) -> Optional[NewsArticle]:
+        # Caller holds the lock and the transaction.
+        article = self.get_article(article_id)
+        if article:
+            for key, value in updates.items():
+                if hasattr(article, key):
+                    setattr(article, key, value)
+            row = _article_row(article)
+            self._conn.execute(
+                "UPDATE articles SET article_url = ?, status = ?, category = ?,"
+                " content_type = ?, published_date = ?, sort_ts = ?, fetched_ts = ?,"
+                " data = ? WHERE id = ?",
+                row[1:] + (article_id,),
+            )
+        return article
+
+    def update_article(self, article_id: str, updates: dict) -> Optional[NewsArticle]:
+        with self._lock, self._conn:
+            article = self._write_updates(article_id, updates)
+        if article:
+            self._changed()
+        return article
+
+    def update_articles(self, updates: Dict[str, dict]) -> int:
+        with self._lock, self._conn:
+            found = sum(1 for aid, changes in updates.items() if self._write_updates(aid, changes))
+        if found:
+            self._changed()
+        return found
+
+    def delete_article(self, article_id: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+        if cur.rowcount > 0:
+            self._changed()
+            return True
+        return False
+
+    def bulk_add_articles(self, articles: List[NewsArticle]) -> Dict[str, int]:
+        with self._lock:
+            seen = set()
+            rows = []
+            for article in articles:
+                if article.article_url in seen or self._has_url(article.article_url):
+                    continue
+                seen.add(article.article_url)
+                rows.append(_article_row(article))
+            with self._conn:
+                self._conn.executemany(_INSERT_ARTICLE, rows)
+            if rows:
+                self._changed()
+        return {"inserted": len(rows), "skipped": len(articles) - len(rows)}
+
+    def cleanup_expired_articles(self, days_old: int = 30):
+        """Remove articles older than specified days"""
+        cutoff = (datetime.now() - timedelta(days=days_old)).timestamp()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM articles WHERE fetched_ts <= ?", (cutoff,))
+        self._changed()
+
+
+def main(argv: List[str]) -> int:
+    path = argv[1] if len(argv) > 1 else DB_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = connect(path)
+    counts = migrate_from_json(conn)
+    conn.close()
+    print(f"Imported into {path}: {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -11,12 +11,13 @@ from fastapi import (
     WebSocketDisconnect,
 )
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from modules.content_url import content_urls
 from screens import screen_manager
 from connections import connection_manager
+from templating import templates
+from uploads import UploadTooLarge, save_upload
 
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter()
 
 VIDEO_FOLDER = "static/videos"
@@ -73,11 +74,11 @@ async def update_screens(
 
     print("Notifying screens of URL updates...")
     # Notify each screen with its new URL.
-    for screen in screen_manager.screens:
-        if form_data_dict["update"] == "all" or form_data_dict["update"] == (
-            "screen" + str(screen.id)
-        ):
-            await connection_manager.notify_screen(screen=screen)
+    await connection_manager.notify_many(
+        screen for screen in screen_manager.screens
+        if form_data_dict["update"] == "all"
+        or form_data_dict["update"] == ("screen" + str(screen.id))
+    )
 
     return RedirectResponse(url="/admin", status_code=303)
 
@@ -96,20 +97,7 @@ async def screen_page(request: Request, screen_id: str):
     screen = screen_manager.screens[screen_index]
     base_url = str(request.base_url)  # e.g., 'http://192.168.2.65:8000/'
 
-    if screen.type == "text":
-        from urllib.parse import quote
-
-        content_url = base_url + f"responsive/{quote(screen.text)}"
-    elif screen.type == "url":
-        content_url = screen.url
-    elif screen.type == "video":
-        content_url = base_url + f"video/{screen.video}"
-    elif screen.type == "picture":
-        content_url = base_url + f"picture/{screen.picture}"
-    elif screen.type == "pdf":
-        content_url = base_url + f"pdf/{screen.pdf}"
-    else:
-        content_url = base_url + f"default/{screen_id}"
+    content_url = content_urls.url(screen, base_url)
 
     print(f"Screen {screen_id} connected with URL: {content_url}")
     return templates.TemplateResponse(
@@ -147,7 +135,7 @@ async def responsive_text(request: Request, text: str):
 async def show_video(request: Request, video: str):
     return templates.TemplateResponse(
         "content/video.html",
-        {"request": request, "video": video},
+        {"request": request, "video": {"src": f"/static/videos/{video}"}},
     )
 
 
@@ -158,7 +146,7 @@ async def show_video(request: Request, video: str):
 async def show_picture(request: Request, picture: str):
     return templates.TemplateResponse(
         "content/picture.html",
-        {"request": request, "picture": picture},
+        {"request": request, "picture": {"src": f"/static/pictures/{picture}"}},
     )
 
 
@@ -185,7 +173,7 @@ async def websocket_endpoint(websocket: WebSocket, screen_id: str):
             # Keep the connection alive.
             await websocket.receive_text()
     except WebSocketDisconnect:
-        connection_manager.disconnect(screen_id)
+        connection_manager.disconnect(screen_id, websocket)
 
 
 # Endpoint to update a screen's URL.
@@ -206,11 +194,12 @@ async def upload_video(video_file: UploadFile = File(...)):
         return {"error": "Only MP4 files are allowed."}
 
     # Save the file to the static folder
-    file_path = os.path.join(VIDEO_FOLDER, video_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await video_file.read())
+    try:
+        stored = await save_upload(video_file, VIDEO_FOLDER, "video")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
 
-    print(f"Uploaded file saved to {file_path}")
+    print(f"Uploaded file saved to {stored['path']}")
     return RedirectResponse(url="/admin", status_code=303)
 
 
@@ -226,11 +215,12 @@ async def upload_picture(picture_file: UploadFile = File(...)):
         return {"error": "Only PNG, GIF, JPG, and JPEG files are allowed."}
 
     # Save the file to the static folder
-    file_path = os.path.join(PICTURE_FOLDER, picture_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await picture_file.read())
+    try:
+        stored = await save_upload(picture_file, PICTURE_FOLDER, "picture")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
 
-    print(f"Uploaded file saved to {file_path}")
+    print(f"Uploaded file saved to {stored['path']}")
     return RedirectResponse(url="/admin", status_code=303)
 
 
@@ -241,9 +231,10 @@ async def upload_pdf(pdf_file: UploadFile = File(...)):
         return {"error": "Only PDF files are allowed."}
 
     # Save the file to the static folder
-    file_path = os.path.join(PDF_FOLDER, pdf_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await pdf_file.read())
+    try:
+        stored = await save_upload(pdf_file, PDF_FOLDER, "pdf")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
 
-    print(f"Uploaded file saved to {file_path}")
+    print(f"Uploaded file saved to {stored['path']}")
     return RedirectResponse(url="/admin", status_code=303)
@@ -9,16 +9,17 @@ from fastapi import (
     UploadFile,
 )
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from models import pdfs, videos
+from models.media import media_library
 from modules import registry
 from modules.base import DisplayModule
 from screens import screen_manager
 from connections import connection_manager
-from utils import APP_VERSION, delete_file
+from uploads import UploadTooLarge, save_upload
+from templating import templates
+from utils import delete_file
 
 
-templates = Jinja2Templates(directory="templates")
-templates.env.globals["app_version"] = APP_VERSION
 router = APIRouter()
 
 VIDEO_FOLDER = "static/videos"
@@ -31,29 +32,14 @@ os.makedirs(PDF_FOLDER, exist_ok=True)
 
 @router.get("/admin/legacy", response_class=HTMLResponse)
 async def admin_page(request: Request):
-    picture_subfolders = [
-        f
-        for f in os.listdir(PICTURE_FOLDER)
-        if os.path.isdir(os.path.join(PICTURE_FOLDER, f))
-    ]
-
-    # Dictionary to store folders and their pictures
-    uploaded_pictures = {}
-
-    # Walk through the directory and its subfolders
-    for root, dirs, files in os.walk(PICTURE_FOLDER):
-        # Get the relative folder name
-        folder = os.path.relpath(root, PICTURE_FOLDER)
-        folder = folder if folder != "." else "Root"
-
-        # Filter image files and add them to the dictionary
-        pictures = [
-            file
-            for file in files
-            if file.lower().endswith(("png", "jpg", "jpeg", "gif"))
-        ]
-        if pictures:
-            uploaded_pictures[folder] = pictures
+    # Listings come from the media index rather than walking the disk.
+    media_library.ensure_running()
+    picture_subfolders = media_library.slideshows()
+    uploaded_pictures = {
+        folder: pictures
+        for folder, pictures in media_library.picture_folders().items()
+        if pictures
+    }
 
     display_modules = [
         m for m in registry.list()
@@ -65,9 +51,9 @@ async def admin_page(request: Request):
         {
             "request": request,
             "screens": screen_manager.screens,
-            "videos": os.listdir(VIDEO_FOLDER),
-            "pictures": os.listdir(PICTURE_FOLDER),
-            "pdfs": os.listdir(PDF_FOLDER),
+            "videos": media_library.names("video"),
+            "pictures": media_library.names("picture"),
+            "pdfs": media_library.names("pdf"),
             "picture_subfolders": picture_subfolders,
             "uploaded_pictures": uploaded_pictures,
             "display_modules": display_modules,
@@ -175,11 +161,11 @@ async def update_screens(
 
     print("Notifying screens of URL updates...")
     # Notify each screen with its new URL.
-    for screen in screen_manager.screens:
-        if form_data_dict["update"].endswith("_all") or form_data_dict["update"] == (
-            "screen" + str(screen.id)
-        ):
-            await connection_manager.notify_screen(screen=screen)
+    await connection_manager.notify_many(
+        screen for screen in screen_manager.screens
+        if form_data_dict["update"].endswith("_all")
+        or form_data_dict["update"] == ("screen" + str(screen.id))
+    )
 
     return RedirectResponse(url="/admin", status_code=303)
 
@@ -191,11 +177,14 @@ async def upload_video(video_file: UploadFile = File(...)):
         return {"error": "Only MP4 files are allowed."}
 
     # Save the file to the static folder
-    file_path = os.path.join(VIDEO_FOLDER, video_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await video_file.read())
-
-    print(f"Uploaded file saved to {file_path}")
+    try:
+        stored = await save_upload(video_file, VIDEO_FOLDER, "video")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
+
+    print(f"Uploaded file saved to {stored['path']}")
+    await media_library.rescan()
+    videos.enqueue(os.path.relpath(stored["path"], VIDEO_FOLDER))
     return RedirectResponse(url="/admin#videos", status_code=303)
 
 
@@ -225,11 +214,13 @@ async def upload_picture(
         return {"error": "Only PNG, GIF, JPG, and JPEG files are allowed."}
 
     # Save the file to the target folder
-    file_path = os.path.join(target_folder, picture_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await picture_file.read())
+    try:
+        stored = await save_upload(picture_file, target_folder, "picture")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
 
-    print(f"Uploaded file saved to {file_path}")
+    print(f"Uploaded file saved to {stored['path']}")
+    await media_library.rescan()
     return RedirectResponse(url="/admin#pictures", status_code=303)
 
 
@@ -240,11 +231,14 @@ async def upload_pdf(pdf_file: UploadFile = File(...)):
         return {"error": "Only PDF files are allowed."}
 
     # Save the file to the static folder
-    file_path = os.path.join(PDF_FOLDER, pdf_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await pdf_file.read())
-
-    print(f"Uploaded file saved to {file_path}")
+    try:
+        stored = await save_upload(pdf_file, PDF_FOLDER, "pdf")
+    except (UploadTooLarge, ValueError) as e:
+        return {"error": str(e)}
+
+    print(f"Uploaded file saved to {stored['path']}")
+    await media_library.rescan()
+    pdfs.enqueue(os.path.relpath(stored["path"], PDF_FOLDER))
     return RedirectResponse(url="/admin#pdfs", status_code=303)
 
 
@@ -255,6 +249,7 @@ async def delete_picture(picture_filename: str = Form(...)):
     file_path = os.path.join(PICTURE_FOLDER, picture_filename.replace("Root/", ""))
     print(f"Deleting picture: {file_path}")
     result = delete_file(file_path)
+    await media_library.rescan()
     if result.get("error"):
         return result
 
@@ -265,6 +260,7 @@ async def delete_picture(picture_filename: str = Form(...)):
 async def delete_pdf(pdf_filename: str = Form(...)):
     file_path = os.path.join(PDF_FOLDER, pdf_filename)
     result = delete_file(file_path)
+    await media_library.rescan()
     if result.get("error"):
         return result
 
@@ -275,6 +271,7 @@ async def delete_pdf(pdf_filename: str = Form(...)):
 async def delete_video(video_filename: str = Form(...)):
     file_path = os.path.join(VIDEO_FOLDER, video_filename)
     result = delete_file(file_path)
+    await media_library.rescan()
     if result.get("error"):
         return result
 
@@ -8,13 +8,10 @@ while the existing /admin keeps working.
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
-from utils import APP_VERSION
+from templating import templates
 
 
-templates = Jinja2Templates(directory="templates")
-templates.env.globals["app_version"] = APP_VERSION
 
 router = APIRouter()
 
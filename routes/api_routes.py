@@ -1,12 +1,16 @@
+import asyncio
 import os
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.responses import JSONResponse
 
 from connections import connection_manager
+from models import pdfs, pictures, videos
+from models.media import media_library
 from modules import registry
 from modules.base import DisplayModule
 from screens import screen_manager
+from uploads import UploadHashMismatch, UploadTooLarge, resumable_uploads, save_upload
 
 router = APIRouter()
 
@@ -20,16 +24,8 @@ PDF_FOLDER = "static/pdfs"
 # ---------------------------------------------------------------------
 @router.get("/api/pictures", response_class=JSONResponse)
 async def get_available_pictures():
-    pictures = {}
-    for root, dirs, files in os.walk(PICTURE_FOLDER):
-        folder = os.path.relpath(root, PICTURE_FOLDER)
-        folder = folder if folder != "." else "Root"
-        pictures[folder] = [
-            file
-            for file in files
-            if file.lower().endswith(("png", "jpg", "jpeg", "gif"))
-        ]
-    return {"pictures": pictures}
+    media_library.ensure_running()
+    return {"pictures": media_library.picture_folders()}
 
 
 # ---------------------------------------------------------------------
@@ -37,14 +33,8 @@ async def get_available_pictures():
 # ---------------------------------------------------------------------
 @router.get("/api/videos", response_class=JSONResponse)
 async def get_available_videos():
-    if not os.path.isdir(VIDEO_FOLDER):
-        return {"videos": []}
-    return {
-        "videos": sorted(
-            f for f in os.listdir(VIDEO_FOLDER)
-            if f.lower().endswith((".mp4", ".webm", ".mov", ".m4v"))
-        )
-    }
+    media_library.ensure_running()
+    return {"videos": media_library.names("video")}
 
 
 # ---------------------------------------------------------------------
@@ -52,13 +42,8 @@ async def get_available_videos():
 # ---------------------------------------------------------------------
 @router.get("/api/pdfs", response_class=JSONResponse)
 async def get_available_pdfs():
-    if not os.path.isdir(PDF_FOLDER):
-        return {"pdfs": []}
-    return {
-        "pdfs": sorted(
-            f for f in os.listdir(PDF_FOLDER) if f.lower().endswith(".pdf")
-        )
-    }
+    media_library.ensure_running()
+    return {"pdfs": media_library.names("pdf")}
 
 
 # ---------------------------------------------------------------------
@@ -66,14 +51,40 @@ async def get_available_pdfs():
 # ---------------------------------------------------------------------
 @router.get("/api/slideshows", response_class=JSONResponse)
 async def get_available_slideshows():
-    if not os.path.isdir(PICTURE_FOLDER):
-        return {"slideshows": []}
-    return {
-        "slideshows": sorted(
-            f for f in os.listdir(PICTURE_FOLDER)
-            if os.path.isdir(os.path.join(PICTURE_FOLDER, f))
-        )
-    }
+    media_library.ensure_running()
+    return {"slideshows": media_library.slideshows()}
+
+
+# ---------------------------------------------------------------------
+# Video transcode queue
+# ---------------------------------------------------------------------
+@router.get("/api/videos/transcode", response_class=JSONResponse)
+async def get_transcode_status():
+    return videos.status()
+
+
+# ---------------------------------------------------------------------
+# Search the media library (metadata, filters, pagination)
+# ---------------------------------------------------------------------
+@router.get("/api/media", response_class=JSONResponse)
+async def search_media(
+    kind: str | None = None,
+    folder: str | None = None,
+    q: str | None = None,
+    orientation: str | None = None,
+    sort: str = "name",
+    desc: bool = False,
+    offset: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Indexed media with size, mtime, dimensions, duration, page count,
+    sha256 and orientation. `q` matches a substring of the path."""
+    media_library.ensure_running()
+    result = media_library.query(
+        kind=kind, folder=folder, search=q, orientation=orientation,
+        sort=sort, descending=desc, offset=offset, limit=limit,
+    )
+    return {**result, "offset": offset, "limit": limit}
 
 
 # ---------------------------------------------------------------------
@@ -166,24 +177,70 @@ async def run_fleet_demo():
 # ---------------------------------------------------------------------
 @router.post("/api/screens/reload-all", response_class=JSONResponse)
 async def reload_all_screens():
-    notified: list[int] = []
-    skipped: list[dict] = []
-    for screen in screen_manager.screens:
-        if not screen.connected:
-            skipped.append({"id": screen.id, "reason": "not connected"})
-            continue
-        try:
-            await connection_manager.notify_screen(screen=screen)
-            notified.append(screen.id)
-        except Exception as e:
-            skipped.append({"id": screen.id, "reason": str(e)})
+    outcomes = await connection_manager.notify_many(screen_manager.screens)
     return {
-        "notified": notified,
-        "skipped": skipped,
+        "notified": [o["id"] for o in outcomes if o["ok"]],
+        "skipped": [{"id": o["id"], "reason": o["reason"]} for o in outcomes if not o["ok"]],
+        "outcomes": outcomes,
         "total": len(screen_manager.screens),
     }
 
 
+def _picture_folder(subfolder: str) -> str:
+    # Treat "Root" / "" the same — both mean the top-level pictures dir.
+    # Sanitize subfolder: strip any path separators so we never escape
+    # the pictures directory.
+    sf = (subfolder or "").strip().strip("/\\")
+    if sf.lower() == "root":
+        sf = ""
+    if any(part in ("..", "") for part in sf.split("/")) and sf:
+        raise HTTPException(status_code=400, detail="Invalid subfolder")
+    return os.path.join(PICTURE_FOLDER, sf) if sf else PICTURE_FOLDER
+
+
+async def _picture_stored(stored: dict) -> dict:
+    await media_library.rescan()
+    rel = os.path.relpath(stored["path"], PICTURE_FOLDER).replace(os.sep, "/")
+    # Screen-sized derivatives + placeholder, built in the process pool
+    # before we answer so the first screen to show it gets the small one.
+    derived = False
+    if rel.lower().endswith(pictures.DERIVABLE_EXTENSIONS):
+        derived = await pictures.derive_async(rel) is not None
+    if stored["duplicate"]:
+        message = f"Picture already stored as '{rel}'"
+    else:
+        message = f"Picture '{rel}' uploaded successfully"
+    return {"message": message, "path": rel, "duplicate": stored["duplicate"],
+            "sha256": stored["sha256"], "derived": derived}
+
+
+async def _media_stored(stored: dict, folder: str, label: str) -> dict:
+    await media_library.rescan()
+    name = os.path.relpath(stored["path"], folder).replace(os.sep, "/")
+    if stored["duplicate"]:
+        message = f"{label} already stored as '{name}'"
+    else:
+        message = f"{label} '{name}' uploaded successfully"
+    return {"message": message, "path": name, "duplicate": stored["duplicate"],
+            "sha256": stored["sha256"]}
+
+
+async def _video_stored(stored: dict) -> dict:
+    result = await _media_stored(stored, VIDEO_FOLDER, "Video")
+    # Kiosk renditions are transcoded in the background; screens play the
+    # upload as-is until they're ready.
+    result["transcoding"] = videos.enqueue(result["path"])
+    return result
+
+
+async def _pdf_stored(stored: dict) -> dict:
+    result = await _media_stored(stored, PDF_FOLDER, "PDF")
+    # Page images are rendered in the background (a big deck takes a
+    # while); screens use pdf.js until they're ready.
+    result["rasterising"] = pdfs.enqueue(result["path"])
+    return result
+
+
 # ---------------------------------------------------------------------
 # Upload a picture
 # ---------------------------------------------------------------------
@@ -193,24 +250,12 @@ async def upload_picture(
     subfolder: str = Form(""),
 ):
     try:
-        # Treat "Root" / "" the same — both mean the top-level pictures dir.
-        # Sanitize subfolder: strip any path separators so we never escape
-        # the pictures directory.
-        sf = (subfolder or "").strip().strip("/\\")
-        if sf.lower() == "root":
-            sf = ""
-        if any(part in ("..", "") for part in sf.split("/")) and sf:
-            raise HTTPException(status_code=400, detail="Invalid subfolder")
-
-        target_folder = os.path.join(PICTURE_FOLDER, sf) if sf else PICTURE_FOLDER
-        os.makedirs(target_folder, exist_ok=True)
-
-        file_path = os.path.join(target_folder, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-
-        rel = (sf + "/" + file.filename) if sf else file.filename
-        return {"message": f"Picture '{rel}' uploaded successfully", "path": rel}
+        stored = await save_upload(file, _picture_folder(subfolder), "picture")
+        return await _picture_stored(stored)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -223,10 +268,12 @@ async def upload_picture(
 @router.post("/api/upload/video", response_class=JSONResponse)
 async def upload_video(file: UploadFile = File(...)):
     try:
-        file_path = os.path.join(VIDEO_FOLDER, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        return {"message": f"Video '{file.filename}' uploaded successfully"}
+        stored = await save_upload(file, VIDEO_FOLDER, "video")
+        return await _video_stored(stored)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -237,9 +284,87 @@ async def upload_video(file: UploadFile = File(...)):
 @router.post("/api/upload/pdf", response_class=JSONResponse)
 async def upload_pdf(file: UploadFile = File(...)):
     try:
-        file_path = os.path.join(PDF_FOLDER, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        return {"message": f"PDF '{file.filename}' uploaded successfully"}
+        stored = await save_upload(file, PDF_FOLDER, "pdf")
+        return await _pdf_stored(stored)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---------------------------------------------------------------------
+# Resumable uploads: start, PUT chunks, finalize (see uploads.py)
+# ---------------------------------------------------------------------
+@router.post("/api/upload/sessions", response_class=JSONResponse)
+async def start_upload_session(
+    kind: str = Form(...),
+    filename: str = Form(...),
+    size: int = Form(...),
+    sha256: str = Form(""),
+    subfolder: str = Form(""),
+):
+    """Start (or resume) a chunked upload. Returns the session with its
+    chunk size and the byte ranges already received."""
+    if kind == "picture":
+        folder = _picture_folder(subfolder)
+    elif kind == "video":
+        folder = VIDEO_FOLDER
+    elif kind == "pdf":
+        folder = PDF_FOLDER
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {kind}")
+    try:
+        return await asyncio.to_thread(
+            resumable_uploads.start, folder, filename, size, kind, sha256
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/api/upload/sessions/{session_id}", response_class=JSONResponse)
+async def upload_session_status(session_id: str):
+    try:
+        return resumable_uploads.status(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/api/upload/sessions/{session_id}/chunks/{index}", response_class=JSONResponse)
+async def put_upload_chunk(session_id: str, index: int, request: Request):
+    """Raw chunk bytes as the request body. Re-sending a chunk is fine."""
+    try:
+        return await resumable_uploads.put_chunk(session_id, index, request.stream())
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/api/upload/sessions/{session_id}/finalize", response_class=JSONResponse)
+async def finalize_upload_session(session_id: str):
+    try:
+        stored = await resumable_uploads.finalize(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadHashMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if stored["kind"] == "picture":
+        return await _picture_stored(stored)
+    if stored["kind"] == "video":
+        return await _video_stored(stored)
+    return await _pdf_stored(stored)
+
+
+@router.delete("/api/upload/sessions/{session_id}", response_class=JSONResponse)
+async def abort_upload_session(session_id: str):
+    try:
+        resumable_uploads.abort(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"message": "Upload aborted"}
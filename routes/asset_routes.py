@@ -0,0 +1,40 @@
+# Fingerprinted static assets (see static_assets.py).
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+)
+from fastapi.responses import FileResponse, Response
+
+from static_assets import IMMUTABLE, URL_PREFIX, negotiate, static_assets
+
+
+router = APIRouter()
+
+
+@router.get(URL_PREFIX + "/{digest}/{file:path}")
+async def static_asset(request: Request, digest: str, file: str):
+    """A static file by content digest. The current digest is cached for
+    good. A stale one (a page rendered before the file changed) still gets
+    the current file, but uncached so the next load picks up the new URL."""
+    asset = static_assets.get(file)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    current = asset.digest == digest
+    headers = {
+        "Cache-Control": IMMUTABLE if current else "no-cache",
+        "ETag": f'"{asset.digest}"',
+    }
+    if not asset.bodies:
+        # Images, sounds: already compressed; FileResponse handles Range.
+        return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
+
+    headers["Vary"] = "Accept-Encoding"
+    encoding = negotiate(request.headers.get("accept-encoding"), asset.bodies)
+    if encoding != "identity":
+        # Each encoding is its own representation, so its own strong ETag.
+        headers["ETag"] = f'"{asset.digest}-{encoding}"'
+        headers["Content-Encoding"] = encoding
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
@@ -1,20 +1,29 @@
 # Admin page with form to update screen URLs.
-import os
 from fastapi import (
     APIRouter,
+    HTTPException,
     Request,
 )
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import FileResponse, HTMLResponse
 
-from utils import APP_VERSION
+from models import pdfs, pictures, videos
+from models.media import media_library
+from models.studio_map import zone_for_screen
+from templating import templates
 
 
-templates = Jinja2Templates(directory="templates")
-templates.env.globals["app_version"] = APP_VERSION
 router = APIRouter()
 
 
+def _orientation(screen: int | None) -> str | None:
+    """The zone map's orientation for a screen id ("horizontal" /
+    "vertical"), or None when the screen isn't placed."""
+    if screen is None:
+        return None
+    _, zone = zone_for_screen(screen)
+    return (zone or {}).get("orientation")
+
+
 # ---------------------------------------------------------------------
 # Default content for the screens.
 # ---------------------------------------------------------------------
@@ -53,10 +62,27 @@ async def responsive_text(request: Request, text: str):
 # Video
 # ---------------------------------------------------------------------
 @router.get("/video/{video}", response_class=HTMLResponse)
-async def show_video(request: Request, video: str):
+async def show_video(request: Request, video: str, screen: int | None = None):
     return templates.TemplateResponse(
         "content/video.html",
-        {"request": request, "video": video},
+        # The H.264 rendition for this screen (or the upload until it exists)
+        {"request": request, "video": videos.variant_for(video, _orientation(screen))},
+    )
+
+
+@router.get("/media/videos/{file:path}")
+async def video_rendition(file: str):
+    """Transcoded renditions. Their names carry the source fingerprint, so
+    they never change and kiosks can cache them for good; FileResponse
+    answers the Range requests the <video> element seeks with."""
+    root = videos.DERIVED_FOLDER.resolve()
+    path = (root / file).resolve()
+    if root not in path.parents or path.suffix != ".mp4" or not path.is_file():
+        raise HTTPException(status_code=404, detail="Rendition not found")
+    return FileResponse(
+        path,
+        media_type="video/mp4",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
     )
 
 
@@ -64,7 +90,7 @@ async def show_video(request: Request, video: str):
 # Picture
 # ---------------------------------------------------------------------
 @router.get("/picture/{folder}/{picture}", response_class=HTMLResponse)
-async def show_picture(request: Request, folder: str, picture: str):
+async def show_picture(request: Request, folder: str, picture: str, screen: int | None = None):
     print(f"Picture URL: {folder}")
     print(f"Picture URL: {picture}")
 
@@ -75,12 +101,21 @@ async def show_picture(request: Request, folder: str, picture: str):
 
     return templates.TemplateResponse(
         "content/picture.html",
-        {"request": request, "picture": url},  # Decode the URL-encoded slashes
+        # The derivative sized for this screen (or the original until it exists)
+        {"request": request, "picture": pictures.variant_for(url, _orientation(screen))},
     )
 
 
 @router.get("/pdf/{presentation}", response_class=HTMLResponse)
-async def show_presentation(request: Request, presentation: str):
+async def show_presentation(request: Request, presentation: str, screen: int | None = None):
+    # Pre-rendered page images for this screen; pdf.js on the raw deck
+    # only until they exist (or when PyMuPDF isn't installed).
+    pages = pdfs.pages_for(presentation, _orientation(screen))
+    if pages:
+        return templates.TemplateResponse(
+            "content/pdf_pages.html",
+            {"request": request, "presentation": presentation, "pages": pages},
+        )
     return templates.TemplateResponse(
         "content/pdf.html",
         {"request": request, "presentation": presentation},
@@ -88,18 +123,19 @@ async def show_presentation(request: Request, presentation: str):
 
 
 @router.get("/slideshow/{folder}", response_class=HTMLResponse)
-async def show_slideshow(request: Request, folder: str):
+async def show_slideshow(request: Request, folder: str, screen: int | None = None):
     # Get the list of pictures in the specified folder
-    slideshow_folder = os.path.join("static/pictures", folder)
-    pictures = [
-        file
-        for file in os.listdir(slideshow_folder)
-        if file.lower().endswith(("png", "jpg", "jpeg", "gif"))
-    ]
+    media_library.ensure_running()
+    files = media_library.names("picture", folder)
+    orientation = _orientation(screen)
 
     return templates.TemplateResponse(
         "content/slideshow.html",
-        {"request": request, "folder": folder, "pictures": pictures},
+        {
+            "request": request,
+            "folder": folder,
+            "pictures": [pictures.variant_for(f"{folder}/{file}", orientation) for file in files],
+        },
     )
 
 
@@ -127,14 +163,17 @@ async def screen_share(request: Request, room_id: str):
 
 # ---------------------------------------------------------------------
 # Gradient — animated brand gradient that mimics the zone's lighting.
-# The page renders an initial gradient and then polls the JSON endpoint
-# so the screen tracks its zone's Hue lights live.
+# The page renders an initial gradient; live light changes then arrive
+# over the screen WebSocket (modules/gradient/push.py). The JSON endpoint
+# stays as a slow fallback poll for pages opened without a controller.
 # ---------------------------------------------------------------------
 @router.get("/gradient/{screen_id}", response_class=HTMLResponse)
 async def show_gradient(request: Request, screen_id: int):
     from models.studio_map import screen_gradient_spec
+    from modules.gradient import push
 
-    spec = screen_gradient_spec(screen_id)
+    spec = await screen_gradient_spec(screen_id)
+    push.ensure_running()
     return templates.TemplateResponse(
         "content/gradient.html",
         {"request": request, **spec},
@@ -146,8 +185,11 @@ async def api_screen_gradient(screen_id: int):
     """Live gradient spec (zone + current light colours) for polling."""
     from fastapi.responses import JSONResponse
     from models.studio_map import screen_gradient_spec
+    from modules.gradient import push
 
-    return JSONResponse(screen_gradient_spec(screen_id))
+    # A page still polling after a server restart gets its pushes back.
+    push.ensure_running()
+    return JSONResponse(await screen_gradient_spec(screen_id))
 
 
 @router.get("/api/studio/state")
@@ -157,7 +199,7 @@ async def api_studio_state(plan: str = "popup"):
     from fastapi.responses import JSONResponse
     from models.studio_map import studio_state
 
-    return JSONResponse(studio_state(plan))
+    return JSONResponse(await studio_state(plan))
 
 
 @router.get("/api/studio/brands")
@@ -191,7 +233,7 @@ async def api_studio_save_brand(brand_id: str):
     from fastapi.responses import JSONResponse
     from models.brands import save_brand_profile
 
-    result = save_brand_profile(brand_id)
+    result = await save_brand_profile(brand_id)
     if not result.get("ok"):
         raise HTTPException(status_code=404, detail=result.get("error", "unknown brand"))
     return JSONResponse(result)
@@ -15,6 +15,8 @@ POST /api/modules/refresh               → re-fetch every configured external
 GET  /api/modules/external              → list configured external entries
 """
 
+import asyncio
+
 from fastapi import APIRouter, Body, HTTPException
 from fastapi.responses import JSONResponse
 
@@ -101,7 +103,9 @@ async def start_module(module_id: str):
         raise HTTPException(
             status_code=400, detail=f"{module_id} is not a service module"
         )
-    return m.start()
+    # start()/stop() are sync by contract (systemctl, bridge writes) — run
+    # them off the event loop so a slow service can't stall every socket.
+    return await asyncio.to_thread(m.start)
 
 
 @router.post("/api/modules/{module_id}/stop", response_class=JSONResponse)
@@ -113,7 +117,7 @@ async def stop_module(module_id: str):
         raise HTTPException(
             status_code=400, detail=f"{module_id} is not a service module"
         )
-    return m.stop()
+    return await asyncio.to_thread(m.stop)
 
 
 @router.post("/api/modules/{module_id}/run_test_pattern", response_class=JSONResponse)
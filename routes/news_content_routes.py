@@ -1,62 +1,92 @@
 # News content display routes
-from datetime import datetime
+import hashlib
+import os
 from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from news import news_manager
+from news import images as news_images
+from news.fetcher import ensure_scheduler_running
+from templating import templates
 
-templates = Jinja2Templates(directory="templates")
-# Add datetime to template globals for week number display
-templates.env.globals["now"] = datetime.now
 router = APIRouter(prefix="/news", tags=["news-content"])
 
+# Rendered display pages. A fleet reload used to re-render the same
+# 600-800 line template once per kiosk; now it's rendered once per
+# (mode, playlist) per news_manager.version / template edit, served with a
+# strong ETag, and a kiosk that already has it gets a 304. Keyed on the
+# playlist actually shown, not the URL's id: unknown ids share the
+# fallback's entry, so the cache can't grow past modes x playlists.
+# (mode, resolved playlist id or None) -> ((version, template mtime), etag, body)
+_page_cache: dict = {}
+
+_MODES = {
+    "portrait": ("content/news_portrait.html", 15),
+    "landscape": ("content/news_landscape.html", 15),
+    "presentation": ("content/news_presentation.html", 30),
+}
+
+
+def _template_version(name: str) -> int:
+    try:
+        return os.stat(os.path.join("templates", name)).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x".
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _render_news(request: Request, mode: str, playlist_id: str = None) -> Response:
+    ensure_scheduler_running()
+    template, rotation_seconds = _MODES[mode]
+    stamp = (news_manager.version, _template_version(template))
+    key = (mode, _resolve_playlist(playlist_id))
+    cached = _page_cache.get(key)
+    if cached is None or cached[0] != stamp:
+        body = templates.get_template(template).render(
+            {
+                "request": request,
+                "articles": _get_display_articles(key[1]),
+                "mode": mode,
+                "rotation_seconds": rotation_seconds,
+            }
+        ).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        cached = (stamp, etag, body)
+        _page_cache[key] = cached
+    _, etag, body = cached
+    # no-cache: the kiosk may keep the page but must revalidate each load.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
 
 @router.get("/portrait", response_class=HTMLResponse)
 @router.get("/portrait/{playlist_id}", response_class=HTMLResponse)
 async def news_portrait(request: Request, playlist_id: str = None):
     """Display news in portrait mode (vertical screens)"""
-    articles = _get_display_articles(playlist_id)
-    return templates.TemplateResponse(
-        "content/news_portrait.html",
-        {
-            "request": request,
-            "articles": articles,
-            "mode": "portrait",
-            "rotation_seconds": 15,
-        },
-    )
+    return _render_news(request, "portrait", playlist_id)
 
 
 @router.get("/landscape", response_class=HTMLResponse)
 @router.get("/landscape/{playlist_id}", response_class=HTMLResponse)
 async def news_landscape(request: Request, playlist_id: str = None):
     """Display news in landscape mode (horizontal screens)"""
-    articles = _get_display_articles(playlist_id)
-    return templates.TemplateResponse(
-        "content/news_landscape.html",
-        {
-            "request": request,
-            "articles": articles,
-            "mode": "landscape",
-            "rotation_seconds": 15,
-        },
-    )
+    return _render_news(request, "landscape", playlist_id)
 
 
 @router.get("/presentation", response_class=HTMLResponse)
 @router.get("/presentation/{playlist_id}", response_class=HTMLResponse)
 async def news_presentation(request: Request, playlist_id: str = None):
     """Display news in presentation mode (meetings/demos)"""
-    articles = _get_display_articles(playlist_id)
-    return templates.TemplateResponse(
-        "content/news_presentation.html",
-        {
-            "request": request,
-            "articles": articles,
-            "mode": "presentation",
-            "rotation_seconds": 30,
-        },
-    )
+    return _render_news(request, "presentation", playlist_id)
 
 
 @router.get("/article/{article_id}", response_class=HTMLResponse)
@@ -86,16 +116,32 @@ async def news_article_reader(request: Request, article_id: str, mode: str = "ve
     )
 
 
+@router.get("/img/{digest}/{mode}")
+async def news_image(digest: str, mode: str):
+    """Cached article image variant (news/images.py). Content-addressed, so
+    it never changes and can be cached forever."""
+    found = news_images.variant_path(digest, mode)
+    if found is None:
+        return Response(status_code=404)
+    path, media_type = found
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @router.get("/api/articles", response_class=JSONResponse)
-async def get_news_articles(playlist_id: str = None):
+async def get_news_articles(playlist_id: str = None, mode: str = "landscape"):
     """Get articles as JSON for dynamic updates"""
+    ensure_scheduler_running()
     articles = _get_display_articles(playlist_id)
     return [
         {
             "id": a.id,
             "title": a.title,
             "summary": a.summary,
-            "image_url": a.image_url,
+            "image_url": a.display_image_url(mode),
             "article_url": a.article_url,
             "source_name": a.source_name,
             "published_date": a.published_date.isoformat() if a.published_date else None,
@@ -105,19 +151,24 @@ async def get_news_articles(playlist_id: str = None):
     ]
 
 
-def _get_display_articles(playlist_id: str = None):
-    """Get articles for display - from playlist or approved articles"""
-    if playlist_id:
-        articles = news_manager.get_playlist_articles(playlist_id)
-        if articles:
-            return articles
+def _resolve_playlist(playlist_id: str = None):
+    """Id of the playlist whose articles are shown for a requested id, or
+    None when it falls through to the approved articles"""
+    if playlist_id and news_manager.get_playlist_articles(playlist_id):
+        return playlist_id
 
     # Fall back to active playlist
     active_playlist = news_manager.get_active_playlist()
-    if active_playlist:
-        articles = news_manager.get_playlist_articles(active_playlist.id)
-        if articles:
-            return articles
+    if active_playlist and news_manager.get_playlist_articles(active_playlist.id):
+        return active_playlist.id
+    return None
+
+
+def _get_display_articles(playlist_id: str = None):
+    """Get articles for display - from playlist or approved articles"""
+    resolved = _resolve_playlist(playlist_id)
+    if resolved:
+        return news_manager.get_playlist_articles(resolved)
 
     # Fall back to all approved articles
     return news_manager.get_approved_articles(limit=10)
@@ -1,21 +1,22 @@
 # News management routes for admin panel
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, BackgroundTasks, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from news import news_manager, NewsSource, NewsArticle, ContentType, CategoryType
-from news.fetcher import fetch_all_sources
+from news.fetcher import ensure_scheduler_running, fetch_all_sources
+from news.images import cache_article_images
+from templating import templates
 
 # Available categories for the dropdown
 CATEGORIES = [e.value for e in CategoryType]
 CONTENT_TYPES = [e.value for e in ContentType]
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter(prefix="/admin/news", tags=["news-admin"])
 
 
 @router.get("", response_class=HTMLResponse)
 async def news_dashboard(request: Request):
     """News management dashboard"""
+    ensure_scheduler_running()
     sources = news_manager.get_sources()
     articles = news_manager.get_articles(limit=50)
     playlists = news_manager.get_playlists()
@@ -107,6 +108,7 @@ async def news_articles(request: Request, status: str = None, category: str = No
 
 @router.post("/articles/add")
 async def add_article(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     summary: str = Form(""),
     article_url: str = Form(...),
@@ -127,7 +129,8 @@ async def add_article(
         category=category,
         status="approved",  # Manual items auto-approved
     )
-    news_manager.add_article(article)
+    stored = news_manager.add_article(article)
+    background_tasks.add_task(cache_article_images, [stored])
     return RedirectResponse(url="/admin/news/articles", status_code=303)
 
 
@@ -22,6 +22,7 @@ from routes.audio_routes import router as audio_router
 from routes.music_routes import router as music_router
 from routes.positions_routes import router as positions_router
 from routes.transcribe_routes import router as transcribe_router
+from routes.asset_routes import router as asset_router
 
 
 router = APIRouter()
@@ -43,3 +44,4 @@ router.include_router(audio_router)
 router.include_router(music_router)
 router.include_router(positions_router)
 router.include_router(transcribe_router)
+router.include_router(asset_router)
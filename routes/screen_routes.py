@@ -3,32 +3,15 @@ from fastapi import (
     Request,
 )
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
-from modules import registry
-from modules.base import DisplayModule
-from modules.default import DefaultModule
+from modules.content_url import content_urls
 from screens import screen_manager
-from utils import APP_VERSION
+from templating import templates
 
 
-templates = Jinja2Templates(directory="templates")
-templates.env.globals["app_version"] = APP_VERSION
 router = APIRouter()
 
 
-# Fallback display module used when a screen's `type` doesn't match any
-# registered DisplayModule.
-_DEFAULT_DISPLAY: DisplayModule = DefaultModule()
-
-
-def _resolve_display_module(screen_type: str) -> DisplayModule:
-    module = registry.get(screen_type)
-    if isinstance(module, DisplayModule) and registry.is_enabled(module.id):
-        return module
-    return _DEFAULT_DISPLAY
-
-
 # ---------------------------------------------------------------------
 # Screen page route: each screen accesses its unique page.
 # ---------------------------------------------------------------------
@@ -46,8 +29,8 @@ async def screen_page(request: Request, screen_id: str):
     screen = screen_manager.screens[screen_index]
     base_url = str(request.base_url)  # e.g. 'http://192.168.2.65:8000/'
 
-    module = _resolve_display_module(screen.type)
-    content_url = module.get_screen_url(screen, base_url)
+    module = content_urls.module(screen)
+    content_url = content_urls.url(screen, base_url)
 
     print(f"Screen {screen_id} ({screen.type} -> {module.id}) content URL: {content_url}")
     return templates.TemplateResponse(
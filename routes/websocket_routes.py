@@ -27,7 +27,7 @@ async def websocket_endpoint(websocket: WebSocket, screen_id: str):
             # Keep the connection alive.
             await websocket.receive_text()
     except WebSocketDisconnect:
-        connection_manager.disconnect(screen_id)
+        connection_manager.disconnect(screen_id, websocket)
 
 
 # ---------------------------------------------------------------------
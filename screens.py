@@ -1,4 +1,8 @@
+import asyncio
+import atexit
 import json
+import os
+import threading
 from typing import List, Optional
 from pydantic import BaseModel, Field, ValidationError
 from fastapi import WebSocket
@@ -6,6 +10,13 @@ from fastapi import WebSocket
 # File to store screen URLs
 SCREENS_FILE = "screens.json"
 
+# save_screens() calls landing within this window share one write. Scene
+# applies, walkthroughs and fleet demos save several times a second.
+SAVE_DEBOUNCE_S = 0.5
+
+# Fields that describe a live connection, not content; never persisted.
+_RUNTIME_FIELDS = {"websocket", "connected", "client_host"}
+
 
 class Screen(BaseModel):
     id: int = Field(..., description="Unique identifier for the screen")
@@ -53,6 +64,16 @@ class Screen(BaseModel):
 class ScreenManager:
     def __init__(self):
         self.screens: List[Screen] = []
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._save_task: Optional[asyncio.Task] = None
+        # Serialises flush() callers on the loop, and disk writes across
+        # threads (the to_thread writer vs. a sync write from a script or
+        # atexit).
+        self._flush_lock = asyncio.Lock()
+        self._write_lock = threading.Lock()
+        # Bytes of the last successful write; an identical save is skipped.
+        self._last_written: Optional[bytes] = None
 
     # Load screens from file
     def load_screens(self) -> List[Screen]:
@@ -84,19 +105,86 @@ class ScreenManager:
 
     # Save screens to file
     def save_screens(self):
-        with open(SCREENS_FILE, "w", encoding="utf-8") as file:
-            json.dump(
-                [
-                    {
-                        key: value
-                        for key, value in screen.model_dump().items()
-                        if key not in {"websocket", "connected", "client_host"}
-                    }
-                    for screen in self.screens
-                ],
-                file,
-                indent=4,
-            )
+        """Mark the screens dirty and schedule a write. Calls within
+        SAVE_DEBOUNCE_S coalesce into one write, done off the event loop.
+        Outside a running loop (scripts) it writes immediately. Callers that
+        need the file on disk before continuing `await flush()` instead."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_now()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(SAVE_DEBOUNCE_S, self._start_background_flush)
+
+    async def flush(self):
+        """Write any pending change now and return once it's on disk.
+        Raises OSError if the write fails (the change stays pending)."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            # Snapshot on the loop thread; only the disk I/O moves off it.
+            self._dirty = False
+            data = self._serialize()
+            try:
+                await asyncio.to_thread(self._write, data)
+            except OSError:
+                self._dirty = True
+                raise
+
+    def _start_background_flush(self):
+        self._save_handle = None
+        self._save_task = asyncio.get_running_loop().create_task(self._background_flush())
+
+    async def _background_flush(self):
+        try:
+            await self.flush()
+        except OSError as e:
+            print(f"Error saving screens: {e}")
+
+    def _write_now(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            self._write(self._serialize())
+        except OSError as e:
+            self._dirty = True
+            print(f"Error saving screens: {e}")
+
+    def _serialize(self) -> bytes:
+        return json.dumps(
+            [screen.model_dump(exclude=_RUNTIME_FIELDS) for screen in self.screens],
+            indent=4,
+        ).encode("utf-8")
+
+    def _write(self, data: bytes):
+        """Atomically replace SCREENS_FILE: temp file, fsync, os.replace,
+        fsync the directory. A crash leaves either the old or the new file,
+        never a truncated one."""
+        with self._write_lock:
+            if data == self._last_written:
+                return
+            tmp = SCREENS_FILE + ".tmp"
+            with open(tmp, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp, SCREENS_FILE)
+            try:
+                dir_fd = os.open(os.path.dirname(os.path.abspath(SCREENS_FILE)), os.O_RDONLY)
+            except OSError:
+                pass  # e.g. Windows, where directories can't be opened
+            else:
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            self._last_written = data
 
     def print_screens(self):
         print("Current screen data:")
@@ -106,3 +194,6 @@ class ScreenManager:
 
 screen_manager = ScreenManager()
 screen_manager.load_screens()
+# A change still inside the debounce window when the process exits is
+# written synchronously rather than lost.
+atexit.register(screen_manager._write_now)
@@ -0,0 +1,402 @@
+"""Fake-kiosk load benchmark: many stations against an in-process hub.
+
+Starts the real app (main.py) under uvicorn on a free localhost port, in a
+background thread, from a throwaway working directory. That directory has
+its own screens.json with N screens and copies of this station's scene,
+zone and zone-map data (runtime state, not in git; where a file is
+missing the app seeds its defaults, as on a fresh install). It has no
+data/hue.json and VLC is pointed at a closed port, so a run never touches
+the studio's lights, players or saved state. Then it:
+
+  1. connects the admin status sockets (/ws-screen-status), then N fake
+     kiosks (/ws/{id}), and times each kiosk's connect until the admins
+     see its status update;
+  2. runs each scenario for --rounds rounds, after --warmup unrecorded
+     ones: POST /api/screens/reload-all, a scene apply and a brand apply.
+     Each round waits until the kiosks go quiet before the next starts.
+
+For every message a kiosk receives it records two latencies. Trigger to
+receive runs from the HTTP request being sent. Notify to receive runs from
+the moment the hub started sending that frame, taken by wrapping
+ConnectionManager._send. Per scenario it also records the HTTP round
+trip, CPU time (the hub's thread and the whole process) and RSS. The JSON
+report goes to stdout or --out. `--compare old.json` prints the change
+against an earlier report, e.g. one from the previous commit.
+
+Usage (repo root, venv active):
+    python scripts/bench_kiosks.py --kiosks 50 --rounds 20 --out bench.json
+    python scripts/bench_kiosks.py --kiosks 200 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+# Copied into the throwaway working directory when present; otherwise the
+# managers seed their defaults there. Not hue.json: without it the Hue
+# module is unpaired and no light is touched.
+DATA_FILES = ("scenes.json", "zones.json", "studio_zone_map.json",
+              "news_sources.json", "brand_profiles.json")
+ISOLATED_ENV = {
+    "VLC_HOST": "127.0.0.1",
+    "VLC_PORT": "9",  # discard: brand videos fail fast instead of playing
+    "NEWS_STORE": "json",
+}
+QUIET_S = 0.15  # a round is over once no kiosk got anything for this long
+ROUND_TIMEOUT_S = 5.0
+CONNECT_CONCURRENCY = 32
+
+
+# --- measurements --------------------------------------------------------------
+
+def summarise(values_s: list[float]) -> dict:
+    """Latency summary in ms (nearest-rank percentiles)."""
+    if not values_s:
+        return {"count": 0}
+    ordered = sorted(values_s)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pct(50) * 1000, 2),
+        "p99_ms": round(pct(99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError):
+        # No /proc (macOS): peak instead of current (bytes there, KiB on Linux).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# --- hub ---------------------------------------------------------------------------
+
+def prepare_workdir(kiosks: int) -> Path:
+    work = Path(tempfile.mkdtemp(prefix="kiosk-bench-"))
+    (work / "data").mkdir()
+    for name in DATA_FILES:
+        src = REPO_DIR / "data" / name
+        if src.exists():
+            shutil.copy2(src, work / "data" / name)
+    for name in ("templates", "static"):
+        (work / name).symlink_to(REPO_DIR / name, target_is_directory=True)
+    screens = [{"id": i, "name": f"Bench {i}", "type": "default"} for i in range(1, kiosks + 1)]
+    (work / "screens.json").write_text(json.dumps(screens), encoding="utf-8")
+    return work
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Hub(threading.Thread):
+    """main.app under uvicorn, on its own event loop in this thread."""
+
+    def __init__(self, app, port: int):
+        super().__init__(name="hub", daemon=True)
+        import uvicorn
+
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", lifespan="off",
+        ))
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        await self.server.serve()
+
+    async def started(self):
+        while not self.server.started:
+            if not self.is_alive():
+                raise SystemExit("hub failed to start")
+            await asyncio.sleep(0.05)
+
+    async def thread_time(self) -> float:
+        """CPU seconds used by the hub's thread so far."""
+        async def _now():
+            return time.thread_time()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_now(), self.loop))
+
+    def stop(self):
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+# --- fake clients ------------------------------------------------------------------
+
+class Kiosk:
+    """A station: holds /ws/{id} open and timestamps every frame."""
+
+    def __init__(self, screen_id: int):
+        self.id = screen_id
+        self.connected_at: float | None = None
+        self.received: list[tuple[float, str]] = []
+        self.task: asyncio.Task | None = None
+
+    async def run(self, url: str, opened: asyncio.Event):
+        import websockets
+
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                self.connected_at = time.perf_counter()
+                opened.set()
+                async for raw in ws:
+                    self.received.append((time.perf_counter(), json.loads(raw).get("type")))
+        finally:
+            opened.set()
+
+
+class Admin:
+    """An admin tab on /ws-screen-status."""
+
+    def __init__(self):
+        self.status: dict[str, float] = {}  # screen id -> first "connected" update
+        self.task: asyncio.Task | None = None
+
+    async def run(self, url: str, opened: asyncio.Event):
+        import websockets
+
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                opened.set()
+                async for raw in ws:
+                    msg = json.loads(raw)
+                    if msg.get("type") == "screen_status_update" and msg.get("connected"):
+                        self.status.setdefault(str(msg.get("screen_id")), time.perf_counter())
+        finally:
+            opened.set()
+
+
+async def start_client(client, url: str):
+    opened = asyncio.Event()
+    client.task = asyncio.get_running_loop().create_task(client.run(url, opened))
+    await opened.wait()
+
+
+async def settle(kiosks: list[Kiosk], marks: dict[int, int]):
+    """Wait until no kiosk has received anything new for QUIET_S."""
+    deadline = time.perf_counter() + ROUND_TIMEOUT_S
+    seen = -1
+    while time.perf_counter() < deadline:
+        total = sum(len(k.received) - marks[k.id] for k in kiosks)
+        if total == seen:
+            return
+        seen = total
+        await asyncio.sleep(QUIET_S)
+
+
+# --- run -----------------------------------------------------------------------------
+
+async def bench(args, hub: Hub, send_started: dict[int, list[float]]) -> dict:
+    import httpx
+    from models.brands import BRANDS
+    from models.scenes import scene_manager
+
+    base = f"127.0.0.1:{hub.server.config.port}"
+    await hub.started()
+    report: dict = {}
+
+    # 1. Admins, then kiosks; admins see every kiosk come online.
+    admins = [Admin() for _ in range(args.admins)]
+    for admin in admins:
+        await start_client(admin, f"ws://{base}/ws-screen-status")
+    kiosks = [Kiosk(i) for i in range(1, args.kiosks + 1)]
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(kiosk):
+        async with gate:
+            await start_client(kiosk, f"ws://{base}/ws/{kiosk.id}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connect(k) for k in kiosks))
+    await asyncio.sleep(QUIET_S)
+    status_latency = [
+        admin.status[str(k.id)] - k.connected_at
+        for admin in admins for k in kiosks
+        if k.connected_at is not None and str(k.id) in admin.status
+    ]
+    report["connect"] = {
+        "kiosks": sum(1 for k in kiosks if k.connected_at is not None),
+        "seconds": round(time.perf_counter() - started, 3),
+        "admin_status_latency": summarise(status_latency),
+        "rss_mb": rss_mb(),
+    }
+
+    # 2. Scenarios.
+    scene = args.scene or (scene_manager.scenes[0].id if scene_manager.scenes else None)
+    brand = args.brand or next(iter(BRANDS), None)
+    scenarios = {"reload_all": "/api/screens/reload-all"}
+    if scene:
+        scenarios["scene_apply"] = f"/api/scenes/{scene}/apply"
+    if brand:
+        scenarios["brand_apply"] = f"/api/studio/brand/{brand}/apply"
+
+    report["scenarios"] = {}
+    async with httpx.AsyncClient(base_url=f"http://{base}", timeout=30) as http:
+        for name, path in scenarios.items():
+            trigger, notify, http_s, statuses = [], [], [], {}
+            for _ in range(args.warmup):
+                marks = {k.id: len(k.received) for k in kiosks}
+                await http.post(path)
+                await settle(kiosks, marks)
+            cpu_hub, cpu_proc = await hub.thread_time(), time.process_time()
+            for _ in range(args.rounds):
+                marks = {k.id: len(k.received) for k in kiosks}
+                send_started.clear()
+                t0 = time.perf_counter()
+                response = await http.post(path)
+                http_s.append(time.perf_counter() - t0)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                await settle(kiosks, marks)
+                for k in kiosks:
+                    sends = send_started.get(k.id, [])
+                    for i, (t, _type) in enumerate(k.received[marks[k.id]:]):
+                        trigger.append(t - t0)
+                        if i < len(sends):
+                            notify.append(t - sends[i])
+            report["scenarios"][name] = {
+                "path": path,
+                "rounds": args.rounds,
+                "http_status": statuses,
+                "delivered_per_round": round(len(trigger) / max(args.rounds, 1), 1),
+                "notify_to_receive": summarise(notify),
+                "trigger_to_receive": summarise(trigger),
+                "http": summarise(http_s),
+                "hub_cpu_s": round(await hub.thread_time() - cpu_hub, 3),
+                "process_cpu_s": round(time.process_time() - cpu_proc, 3),
+                "rss_mb": rss_mb(),
+            }
+
+    for client in kiosks + admins:
+        client.task.cancel()
+    await asyncio.gather(*(c.task for c in kiosks + admins), return_exceptions=True)
+    return report
+
+
+def compare(report: dict, baseline: dict) -> str:
+    lines = [f"vs {baseline.get('commit', '?')} -> {report.get('commit', '?')}"]
+
+    def row(label, old, new):
+        if old is None or new is None:
+            return
+        change = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+        lines.append(f"  {label:44s} {old:>9} -> {new:>9}  {change}")
+
+    row("connect.seconds", baseline["connect"]["seconds"], report["connect"]["seconds"])
+    row("connect.admin_status_latency.p99_ms",
+        baseline["connect"]["admin_status_latency"].get("p99_ms"),
+        report["connect"]["admin_status_latency"].get("p99_ms"))
+    for name, new in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for metric in ("notify_to_receive", "trigger_to_receive", "http"):
+            for p in ("p50_ms", "p99_ms"):
+                row(f"{name}.{metric}.{p}", old[metric].get(p), new[metric].get(p))
+        row(f"{name}.hub_cpu_s", old["hub_cpu_s"], new["hub_cpu_s"])
+        row(f"{name}.rss_mb", old["rss_mb"], new["rss_mb"])
+    return "\n".join(lines)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    p.add_argument("--kiosks", type=int, default=50)
+    p.add_argument("--admins", type=int, default=2)
+    p.add_argument("--rounds", type=int, default=20)
+    p.add_argument("--warmup", type=int, default=1, help="unrecorded rounds per scenario first")
+    p.add_argument("--scene", help="scene id to apply (default: the first scene)")
+    p.add_argument("--brand", help="brand id to apply (default: the first brand)")
+    p.add_argument("--out", help="write the JSON report here instead of stdout")
+    p.add_argument("--compare", help="earlier JSON report to compare against")
+    p.add_argument("--verbose", action="store_true", help="show the hub's own output")
+    p.add_argument("--keep", action="store_true", help="keep the working directory")
+    args = p.parse_args()
+
+    work = prepare_workdir(args.kiosks)
+    os.environ.update(ISOLATED_ENV)
+    os.chdir(work)
+    sys.path.insert(0, str(REPO_DIR))
+    stdout = sys.stdout
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with quiet:
+            rss_before = rss_mb()
+            started = time.perf_counter()
+            import main as hub_main
+            from connections import connection_manager
+            from utils import APP_VERSION
+            import_s = time.perf_counter() - started
+
+            # Timestamp each frame as the hub starts sending it.
+            send_started: dict[int, list[float]] = {}
+            original_send = connection_manager._send
+
+            async def timed_send(screen, message, *a, **kw):
+                send_started.setdefault(screen.id, []).append(time.perf_counter())
+                return await original_send(screen, message, *a, **kw)
+
+            connection_manager._send = timed_send
+
+            hub = Hub(hub_main.app, free_port())
+            hub.start()
+            try:
+                report = asyncio.run(bench(args, hub, send_started))
+            finally:
+                hub.stop()
+    finally:
+        os.chdir(REPO_DIR)
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "commit": APP_VERSION,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cpus": os.cpu_count(),
+        "params": {"kiosks": args.kiosks, "admins": args.admins,
+                   "rounds": args.rounds, "warmup": args.warmup},
+        "import_s": round(import_s, 3),
+        "rss_mb_before_import": rss_before,
+        **report,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"[bench] report written to {args.out}", file=sys.stderr)
+    else:
+        print(text, file=stdout)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(compare(report, baseline), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Import-time budget for the server: fails when `import main` gets slow.
+
+Until the app has been imported, uvicorn serves nothing, and every deploy
+restarts it (pi-update.sh), so the import time is how long the screens
+stay blank. This runs `python -X importtime -c "import main"` in a fresh
+interpreter a few times and keeps the fastest run. It prints the biggest
+imports and exits 1 if:
+
+  * the total is over the budget (--budget-ms, or IMPORT_BUDGET_MS), or
+  * a module that must stay off the startup path got imported anyway: the
+    MCP SDK and the MCP servers (mounted lazily, mcps/mount.py), PyMuPDF
+    (pool workers only, models/pdfs.py), requests and spotipy.
+
+The second check doesn't depend on how fast the machine is, so it's the
+reliable one in CI. The default budget is for a dev/CI machine (import main
+takes ~0.6 s there); on the Pi, which is several times slower, pass a
+bigger one.
+
+Usage (repo root, venv active):
+    python scripts/import_budget.py
+    python scripts/import_budget.py --budget-ms 1500 --runs 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1000
+# Modules that must not be imported by `import main`.
+DEFERRED = ("mcp", "mcps.audio.server", "mcps.displays.server", "mcps.lighting.server",
+            "mcps.music.server", "mcps.screens.server", "mcps.vlc.server",
+            "pymupdf", "requests", "spotipy")
+
+
+def profile() -> list[tuple[int, int, int, str]]:
+    """One cold import of main: [(self_us, cumulative_us, depth, module)]."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit("import main failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    p.add_argument("--budget-ms", type=float,
+                   default=float(os.environ.get("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    p.add_argument("--runs", type=int, default=3, help="take the fastest of N runs")
+    p.add_argument("--top", type=int, default=15, help="how many imports to list")
+    args = p.parse_args()
+
+    best = None
+    for _ in range(max(args.runs, 1)):
+        rows = profile()
+        total = next(cum for _s, cum, _d, name in reversed(rows) if name == "main")
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    print(f"[import-budget] import main: {total / 1000:.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    print("  heaviest (cumulative, direct imports of main and routes.routes):")
+    parents = {"main", "routes", "routes.routes"}
+    top = sorted(
+        (r for r in rows if r[3] not in parents and r[2] <= 3),
+        key=lambda r: r[1], reverse=True,
+    )[:args.top]
+    for self_us, cumulative_us, _depth, name in top:
+        print(f"    {cumulative_us / 1000:7.1f} ms  {name}")
+
+    failed = False
+    imported = {name for _s, _c, _d, name in rows}
+    leaked = [m for m in DEFERRED if m in imported]
+    if leaked:
+        failed = True
+        print(f"[import-budget] FAIL: imported at startup but should be lazy: {', '.join(leaked)}")
+    if total / 1000 > args.budget_ms:
+        failed = True
+        print(f"[import-budget] FAIL: {total / 1000:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if not failed:
+        print("[import-budget] ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,8 +32,9 @@ AFTER_REQ_HASH="$(sha256sum requirements.txt | cut -d' ' -f1)"
 echo "after:  $AFTER_SHA"
 
 # Force uvicorn --reload to pick up the new commit even when only static/
-# or templates/ changed (i.e. no .py change). This refreshes the cached
-# APP_VERSION used in template cache-busting (?v={{ app_version }}).
+# or templates/ changed (i.e. no .py change). Templates are compiled and
+# static assets fingerprinted once at startup (templating.py,
+# static_assets.py), so the restart is what makes the new ones live.
 touch utils.py
 
 if [ "$BEFORE_REQ_HASH" != "$AFTER_REQ_HASH" ]; then
@@ -0,0 +1,87 @@
+// BlurHash placeholders (https://blurha.sh). models/pictures.py encodes a
+// hash per picture; this paints it into any <canvas data-blurhash="…">
+// so a screen shows a soft preview while the real image loads.
+(function () {
+  const CHARS =
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~";
+
+  function decode83(str) {
+    let value = 0;
+    for (const c of str) value = value * 83 + CHARS.indexOf(c);
+    return value;
+  }
+
+  function toLinear(v) {
+    v /= 255;
+    return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+  }
+
+  function toSrgb(v) {
+    v = Math.max(0, Math.min(1, v));
+    return v <= 0.0031308
+      ? Math.round(v * 12.92 * 255)
+      : Math.round((1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255);
+  }
+
+  function signPow(v, e) {
+    return Math.sign(v) * Math.pow(Math.abs(v), e);
+  }
+
+  function decode(hash, width, height) {
+    const size = decode83(hash[0]);
+    const numY = Math.floor(size / 9) + 1;
+    const numX = (size % 9) + 1;
+    const maxAc = (decode83(hash[1]) + 1) / 166;
+    const colors = [];
+    for (let i = 0; i < numX * numY; i++) {
+      if (i === 0) {
+        const v = decode83(hash.substring(2, 6));
+        colors.push([toLinear(v >> 16), toLinear((v >> 8) & 255), toLinear(v & 255)]);
+      } else {
+        const v = decode83(hash.substring(4 + i * 2, 6 + i * 2));
+        colors.push([
+          signPow((Math.floor(v / 361) - 9) / 9, 2) * maxAc,
+          signPow(((Math.floor(v / 19) % 19) - 9) / 9, 2) * maxAc,
+          signPow(((v % 19) - 9) / 9, 2) * maxAc,
+        ]);
+      }
+    }
+    const pixels = new Uint8ClampedArray(width * height * 4);
+    for (let y = 0; y < height; y++) {
+      for (let x = 0; x < width; x++) {
+        let r = 0, g = 0, b = 0;
+        for (let j = 0; j < numY; j++) {
+          for (let i = 0; i < numX; i++) {
+            const basis =
+              Math.cos((Math.PI * x * i) / width) * Math.cos((Math.PI * y * j) / height);
+            const c = colors[i + j * numX];
+            r += c[0] * basis;
+            g += c[1] * basis;
+            b += c[2] * basis;
+          }
+        }
+        const p = 4 * (x + y * width);
+        pixels[p] = toSrgb(r);
+        pixels[p + 1] = toSrgb(g);
+        pixels[p + 2] = toSrgb(b);
+        pixels[p + 3] = 255;
+      }
+    }
+    return pixels;
+  }
+
+  function paint(canvas) {
+    const hash = canvas.dataset.blurhash;
+    if (!hash || hash.length < 6) return;
+    // Decode small; CSS stretches it (it's a blur anyway).
+    canvas.width = 32;
+    canvas.height = 32;
+    const ctx = canvas.getContext("2d");
+    ctx.putImageData(new ImageData(decode(hash, 32, 32), 32, 32), 0, 0);
+  }
+
+  window.paintBlurHashes = function (root) {
+    (root || document).querySelectorAll("canvas[data-blurhash]").forEach(paint);
+  };
+  document.addEventListener("DOMContentLoaded", () => window.paintBlurHashes());
+})();
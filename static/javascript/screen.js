@@ -16,7 +16,9 @@ const connect = () => {
     ws.close();
   }
 
-  ws = new WebSocket(window.ws_url);
+  // caps: message types this script handles without reloading. The server
+  // only pushes those to clients that announce them.
+  ws = new WebSocket(window.ws_url + "?caps=gradient");
 
   ws.onmessage = (event) => {
     console.log("Received WS message", event.data);
@@ -26,6 +28,14 @@ const connect = () => {
     let serverUrl = null;
     try {
       const msg = JSON.parse(event.data);
+      // Live gradient colours: hand them to the open gradient page, which
+      // re-renders in place. Never a reload.
+      if (msg && msg.type === "gradient") {
+        if (contentWindow && !contentWindow.closed) {
+          contentWindow.postMessage(msg, window.location.origin);
+        }
+        return;
+      }
       if (msg && msg.content_url) serverUrl = msg.content_url;
     } catch (_) { /* not JSON — ignore */ }
 
@@ -3,6 +3,8 @@
  * Per-zone screen content editor + global screen list with reload-all.
  * Reads the shell's selected zone via Alpine scope chain.
  */
+const RESUMABLE_UPLOAD_MIN_BYTES = 32 * 1024 * 1024;
+
 function v2ScreensView() {
   return {
     screens: [],
@@ -136,11 +138,11 @@ function v2ScreensView() {
       const fd = new FormData();
       fd.append('file', file);
       let endpoint;
+      const sf = kind === 'picture' ? (this.pictureNewSubfolder || this.pictureSubfolder || '').trim() : '';
       if (kind === 'video')   endpoint = '/api/upload/video';
       else if (kind === 'pdf')     endpoint = '/api/upload/pdf';
       else if (kind === 'picture') {
         endpoint = '/api/upload/picture';
-        const sf = (this.pictureNewSubfolder || this.pictureSubfolder || '').trim();
         if (sf) fd.append('subfolder', sf);
       } else {
         this.uploadMsg = 'unknown kind: ' + kind;
@@ -148,8 +150,12 @@ function v2ScreensView() {
         return;
       }
       try {
-        const r = await fetch(endpoint, { method: 'POST', body: fd });
-        const d = await r.json();
+        // Big files go up in resumable chunks so a Wi-Fi drop doesn't
+        // restart a multi-GB video from zero.
+        const { r, d } = file.size > RESUMABLE_UPLOAD_MIN_BYTES
+          ? await this._uploadResumable(kind, file, sf)
+          : await fetch(endpoint, { method: 'POST', body: fd })
+              .then(async (r) => ({ r, d: await r.json() }));
         if (r.ok) {
           this.uploadMsg = 'uploaded ' + (d.path || file.name) + ' ✓';
           this.uploadOk = true;
@@ -160,9 +166,9 @@ function v2ScreensView() {
           if (kind === 'picture' && this.editing.type === 'picture') {
             this.editing.value = d.path || file.name;
           } else if (kind === 'video' && this.editing.type === 'video') {
-            this.editing.value = file.name;
+            this.editing.value = d.path || file.name;
           } else if (kind === 'pdf' && this.editing.type === 'pdf') {
-            this.editing.value = file.name;
+            this.editing.value = d.path || file.name;
           }
         } else {
           this.uploadMsg = 'failed: ' + (d.detail || JSON.stringify(d));
@@ -174,6 +180,42 @@ function v2ScreensView() {
       }
     },
 
+    // Chunked upload against /api/upload/sessions. Starting a session for
+    // the same file again resumes it, so only the missing chunks are sent;
+    // a failed chunk is retried with backoff for a few minutes before
+    // giving up (and a later retry of the whole upload still resumes).
+    async _uploadResumable(kind, file, subfolder) {
+      const form = new URLSearchParams({ kind, filename: file.name, size: String(file.size) });
+      if (subfolder) form.append('subfolder', subfolder);
+      let r = await fetch('/api/upload/sessions', { method: 'POST', body: form });
+      let d = await r.json();
+      if (!r.ok) return { r, d };
+      const session = d;
+      let done = session.chunks - session.missing.length;
+      for (const index of session.missing) {
+        const start = index * session.chunk_size;
+        const blob = file.slice(start, Math.min(start + session.chunk_size, file.size));
+        for (let attempt = 0; ; attempt++) {
+          try {
+            r = await fetch('/api/upload/sessions/' + session.id + '/chunks/' + index,
+                            { method: 'PUT', body: blob });
+            if (r.ok || (r.status >= 400 && r.status < 500)) break;
+          } catch (e) {
+            if (attempt >= 12) throw e;
+          }
+          if (attempt >= 12) break;
+          this.uploadMsg = 'connection lost, retrying ' + file.name + '…';
+          await new Promise((res) => setTimeout(res, Math.min(30000, 1000 * 2 ** attempt)));
+        }
+        if (!r.ok) return { r, d: await r.json().catch(() => ({ detail: r.statusText })) };
+        done++;
+        this.uploadMsg = 'uploading ' + file.name + ' ' + Math.floor(100 * done / session.chunks) + '%';
+      }
+      this.uploadMsg = 'verifying ' + file.name + '…';
+      r = await fetch('/api/upload/sessions/' + session.id + '/finalize', { method: 'POST' });
+      return { r, d: await r.json() };
+    },
+
     async save(zone) {
       const s = this.screenFor(zone);
       if (!s) return;
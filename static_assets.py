@@ -0,0 +1,186 @@
+"""Fingerprinted, precompressed static assets.
+
+The templates used to link `/static/...?v={{ app_version }}`. StaticFiles
+ignores the query string and only sends an ETag, so kiosks and the admin
+SPA revalidated every script, stylesheet and logo on every frame reload.
+And since the buster was the git SHA, a deploy that touched nothing under
+static/ still made every client download everything again.
+
+Now templates call `static_url("css/v2.css")`, which returns
+`/assets/<digest>/css/v2.css`. The digest comes from the file's content,
+so the URL changes exactly when the file does. `/assets/...`
+(routes/asset_routes.py) serves it with `Cache-Control: immutable`, and
+browsers stop asking. Text assets are compressed once, when the table is
+built, with gzip and with brotli when it's installed. Each request then
+gets the best encoding its Accept-Encoding allows, with no per-request
+compression.
+
+The table is built when the app starts. A file edited while the server
+runs is re-hashed the next time a template asks for its URL (one stat per
+call), so editing JS in development still works without a restart.
+`/static` stays mounted for everything else: uploaded media, derived
+renditions and URLs built in JavaScript.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    print("Warning: Brotli not installed. Static assets are precompressed with gzip only.")
+
+STATIC_FOLDER = Path("static")
+URL_PREFIX = "/assets"
+# User media and derived renditions: large, served (and cached) elsewhere.
+SKIP_FOLDERS = ("pictures", "videos", "pdfs", "derived")
+COMPRESSIBLE = (".js", ".mjs", ".css", ".svg", ".json", ".html", ".txt", ".map")
+# Keep an encoding only if it saves at least this much.
+MIN_SAVING = 0.9
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass
+class Asset:
+    path: Path
+    digest: str
+    mtime_ns: int
+    size: int
+    media_type: str
+    # Encoding ("gzip" / "br") -> compressed body; "identity" holds the
+    # original for compressible files. Other files are sent from disk.
+    bodies: dict[str, bytes]
+
+
+def _media_type(path: Path) -> str:
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or path.suffix in (".js", ".mjs", ".json", ".svg"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _load(full: Path, st: os.stat_result) -> Asset:
+    data = full.read_bytes()
+    bodies: dict[str, bytes] = {}
+    if full.suffix.lower() in COMPRESSIBLE:
+        bodies["identity"] = data
+        compressed = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if BROTLI_AVAILABLE:
+            compressed["br"] = brotli.compress(data, quality=11)
+        for encoding, body in compressed.items():
+            if len(body) <= len(data) * MIN_SAVING:
+                bodies[encoding] = body
+    return Asset(
+        path=full,
+        digest=hashlib.sha256(data).hexdigest()[:10],
+        mtime_ns=st.st_mtime_ns,
+        size=len(data),
+        media_type=_media_type(full),
+        bodies=bodies,
+    )
+
+
+def negotiate(accept_encoding: str | None, available) -> str:
+    """Best of `available` ("br" over "gzip") the client accepts, honouring
+    q-values (`gzip;q=0` means no). "identity" if none."""
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return "identity"
+
+
+class StaticAssets:
+    def __init__(self) -> None:
+        self._assets: dict[str, Asset] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalise(path: str) -> str:
+        rel = path.lstrip("/")
+        if rel.startswith("static/"):
+            rel = rel[len("static/"):]
+        return rel
+
+    def build(self) -> None:
+        """Hash and compress every asset under static/ (media excluded)."""
+        assets: dict[str, Asset] = {}
+        for dirpath, dirnames, filenames in os.walk(STATIC_FOLDER):
+            if Path(dirpath) == STATIC_FOLDER:
+                dirnames[:] = [d for d in dirnames if d not in SKIP_FOLDERS]
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                full = Path(dirpath) / name
+                rel = full.relative_to(STATIC_FOLDER).as_posix()
+                try:
+                    assets[rel] = _load(full, full.stat())
+                except OSError:
+                    continue
+        with self._lock:
+            self._assets = assets
+            self._built = True
+        compressed = sum(1 for a in assets.values() if len(a.bodies) > 1)
+        print(f"[assets] fingerprinted {len(assets)} file(s), {compressed} precompressed")
+
+    def get(self, path: str) -> Asset | None:
+        """The current asset for a path relative to static/, re-hashed if
+        the file changed since it was loaded. None if there's no such file."""
+        if not self._built:
+            self.build()
+        rel = self._normalise(path)
+        parts = Path(rel).parts
+        if not parts or ".." in parts or parts[0] in SKIP_FOLDERS:
+            return None
+        full = STATIC_FOLDER / rel
+        try:
+            st = full.stat()
+        except OSError:
+            with self._lock:
+                self._assets.pop(rel, None)
+            return None
+        asset = self._assets.get(rel)
+        if asset is None or asset.mtime_ns != st.st_mtime_ns or asset.size != st.st_size:
+            if not full.is_file():
+                return None
+            asset = _load(full, st)
+            with self._lock:
+                self._assets[rel] = asset
+        return asset
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL for a static file. Files it doesn't manage
+        (media, missing files) keep their plain /static URL."""
+        asset = self.get(path)
+        rel = self._normalise(path)
+        if asset is None:
+            return f"/static/{rel}"
+        return f"{URL_PREFIX}/{asset.digest}/{rel}"
+
+
+# Singleton instance; `static_url` is registered as a Jinja global.
+static_assets = StaticAssets()
+static_url = static_assets.url
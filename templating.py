@@ -0,0 +1,62 @@
+"""The one Jinja environment every router renders with.
+
+Each router used to build its own `Jinja2Templates(directory="templates")`:
+seven template caches, seven sets of globals (some pages had
+`static_url`, others didn't), and every template compiled from source on
+its first render in every one of them. After a deploy the first kiosk to
+connect waited for the compile of the heavy news templates.
+
+Now there's a single environment, shared via `templates`. Compiled
+templates are written to a bytecode cache on disk
+(`__pycache__/templates/`), so a restart only unmarshals them, and
+`precompile()` (called from main.py at startup) loads every template
+before the first request. Every deploy restarts the server (pi-update.sh
+touches utils.py), so the environment doesn't need to stat template files
+on each render. `auto_reload` is off unless TEMPLATES_AUTO_RELOAD=1, which
+`python main.py` sets for development.
+"""
+
+import os
+from datetime import datetime
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateError
+
+from static_assets import static_url
+from utils import APP_VERSION
+
+TEMPLATE_FOLDER = "templates"
+BYTECODE_FOLDER = os.path.join("__pycache__", "templates")
+AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "0") == "1"
+
+os.makedirs(BYTECODE_FOLDER, exist_ok=True)
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_FOLDER),
+    autoescape=True,
+    auto_reload=AUTO_RELOAD,
+    bytecode_cache=FileSystemBytecodeCache(BYTECODE_FOLDER),
+    # Keep every template compiled (there are ~40; Jinja's default is 400,
+    # but be explicit that nothing should be evicted and recompiled).
+    cache_size=-1,
+)
+env.globals["app_version"] = APP_VERSION
+env.globals["static_url"] = static_url
+# For the week number on the news pages.
+env.globals["now"] = datetime.now
+
+templates = Jinja2Templates(env=env)
+
+
+def precompile() -> None:
+    """Load every HTML template so none is compiled on a kiosk's first
+    request. A template that doesn't compile is reported, not fatal: it
+    fails on render, as it did before."""
+    loaded = 0
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+            loaded += 1
+        except TemplateError as e:
+            print(f"[templates] {name} failed to compile: {e}")
+    print(f"[templates] precompiled {loaded} template(s)")
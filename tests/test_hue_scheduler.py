@@ -0,0 +1,96 @@
+"""HueScheduler ordering: coalescing must never move a write past a
+queued write that overlaps it."""
+
+import asyncio
+from types import SimpleNamespace
+
+from modules.hue.scheduler import HueScheduler, _TokenBucket
+
+
+class RecordingClient:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, str, dict]] = []
+
+    async def set_light(self, light_id, state):
+        self.sent.append(("light", light_id, state))
+        return [{"success": {}}]
+
+    async def set_group(self, group_id, action):
+        self.sent.append(("group", group_id, action))
+        return [{"success": {}}]
+
+
+def _scheduler() -> tuple[HueScheduler, RecordingClient]:
+    client = RecordingClient()
+
+    async def get_async_client():
+        return client
+
+    module = SimpleNamespace(
+        get_async_client=get_async_client,
+        # No groups known: nothing folds.
+        mirror=SimpleNamespace(current=SimpleNamespace(groups={}, lights={})),
+    )
+    scheduler = HueScheduler(module)
+    # Don't wait on the bridge's rate limits in tests.
+    scheduler._lights = _TokenBucket(1000.0, 100)
+    scheduler._groups = _TokenBucket(1000.0, 100)
+    return scheduler, client
+
+
+def _run(submit) -> list[tuple[str, str, dict]]:
+    async def go():
+        scheduler, client = _scheduler()
+        await asyncio.gather(*submit(scheduler))
+        return client.sent
+
+    return asyncio.run(go())
+
+
+def test_light_write_does_not_jump_a_queued_group_write():
+    sent = _run(lambda s: [
+        s.set_light("1", {"on": True}),
+        s.set_group("0", {"on": False}),
+        s.set_light("1", {"bri": 100}),
+    ])
+    assert sent == [
+        ("light", "1", {"on": True}),
+        ("group", "0", {"on": False}),
+        ("light", "1", {"bri": 100}),
+    ]
+
+
+def test_group_write_does_not_jump_a_queued_light_write():
+    sent = _run(lambda s: [
+        s.set_group("0", {"on": False}),
+        s.set_light("1", {"on": True}),
+        s.set_group("0", {"bri": 100}),
+    ])
+    assert sent == [
+        ("group", "0", {"on": False}),
+        ("light", "1", {"on": True}),
+        ("group", "0", {"bri": 100}),
+    ]
+
+
+def test_coalesced_light_write_keeps_its_place():
+    sent = _run(lambda s: [
+        s.set_light("1", {"on": True}),
+        s.set_light("2", {"on": True}),
+        s.set_light("1", {"bri": 100}),
+    ])
+    assert sent == [
+        ("light", "1", {"on": True, "bri": 100}),
+        ("light", "2", {"on": True}),
+    ]
+
+
+def test_scene_recall_is_not_merged_with_a_group_write():
+    sent = _run(lambda s: [
+        s.recall_scene("abc"),
+        s.set_group("0", {"on": True}),
+    ])
+    assert sent == [
+        ("group", "0", {"scene": "abc"}),
+        ("group", "0", {"on": True}),
+    ]
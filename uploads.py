@@ -0,0 +1,389 @@
+"""Streaming media uploads: bounded, hashed, atomic, de-duplicated.
+
+The upload routes used to do `f.write(await file.read())`, which holds the
+whole file in RAM — on a 4 GB Pi a multi-GB brand video is enough to push
+the server into swap. `save_upload()` instead copies the spooled upload to
+a temp file next to its destination in 1 MiB chunks, in a worker thread.
+It enforces a per-kind size limit and computes the SHA-256 on the way
+through. Finally it `os.replace()`s the temp file into place, so a screen
+never loads a half-written file.
+
+The hashes are kept in `data/media_hashes.json` (path -> sha256, size,
+mtime). If the destination folder already holds a file with the upload's
+bytes, and its size and mtime are unchanged since it was hashed, the temp
+file is dropped and the existing path is returned instead of storing a
+second copy. Only the same folder counts: a picture in two slideshow
+folders needs to be in both.
+
+Large files from the admin panel arrive as resumable chunked uploads
+instead (`ResumableUploads`, at the bottom), which end in the same place.
+
+Limits can be overridden per kind with `UPLOAD_MAX_MB_PICTURE`,
+`UPLOAD_MAX_MB_VIDEO` and `UPLOAD_MAX_MB_PDF`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Optional
+
+from fastapi import UploadFile
+
+HASH_INDEX = "data/media_hashes.json"
+CHUNK_SIZE = 1024 * 1024
+
+_DEFAULT_MAX_MB = {"picture": 50, "pdf": 200, "video": 8 * 1024}
+
+_index_lock = threading.Lock()
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeded its kind's size limit; nothing was stored."""
+
+
+def max_bytes(kind: str) -> int:
+    raw = os.environ.get(f"UPLOAD_MAX_MB_{kind.upper()}", "").strip()
+    try:
+        mb = int(raw) if raw else _DEFAULT_MAX_MB[kind]
+    except ValueError:
+        mb = _DEFAULT_MAX_MB[kind]
+    return mb * 1024 * 1024
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """The upload's file name without any directory part, so a crafted
+    name like `../../main.py` can't escape the media folder."""
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    if name in ("", ".", ".."):
+        raise ValueError("Invalid file name")
+    return name
+
+
+# --- hash index -------------------------------------------------------------
+
+def _load_index() -> dict:
+    try:
+        with open(HASH_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index: dict):
+    os.makedirs(os.path.dirname(HASH_INDEX), exist_ok=True)
+    tmp = HASH_INDEX + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, HASH_INDEX)
+
+
+def _still_matches(path: str, entry: dict) -> bool:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+
+def find_by_hash(sha256: str, folder: str) -> Optional[str]:
+    """Path of an unchanged file directly in `folder` with these bytes."""
+    folder = os.path.normpath(folder)
+    with _index_lock:
+        index = _load_index()
+    for path, entry in index.items():
+        if (entry.get("sha256") == sha256 and os.path.dirname(path) == folder
+                and _still_matches(path, entry)):
+            return path
+    return None
+
+
+def known_hash(path: str) -> Optional[str]:
+    """SHA-256 recorded for `path` when it was uploaded, if it's unchanged."""
+    path = os.path.normpath(path)
+    with _index_lock:
+        entry = _load_index().get(path)
+    return entry["sha256"] if entry and _still_matches(path, entry) else None
+
+
+def _record(sha256: str, path: str):
+    st = os.stat(path)
+    with _index_lock:
+        index = _load_index()
+        index[path] = {"sha256": sha256, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        _save_index(index)
+
+
+# --- storing ----------------------------------------------------------------
+
+def _store(src, folder: str, name: str, limit: int) -> dict:
+    folder = os.path.normpath(folder)
+    os.makedirs(folder, exist_ok=True)
+    # Same directory as the destination, so the final rename is atomic.
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := src.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLarge(
+                        f"'{name}' is larger than the {limit // (1024 * 1024)} MB limit"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return _place(tmp, folder, name, digest.hexdigest(), size)
+
+
+def _place(tmp: str, folder: str, name: str, sha256: str, size: int) -> dict:
+    """Move a complete, hashed temp file to `folder/name`, or drop it if
+    the folder already holds the same bytes."""
+    dest = os.path.join(folder, name)
+    try:
+        existing = find_by_hash(sha256, folder)
+        if existing is not None:
+            os.remove(tmp)
+            print(f"[uploads] {dest} is identical to {existing}; not stored again")
+            return {"path": existing, "sha256": sha256, "size": size, "duplicate": True}
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _record(sha256, dest)
+    return {"path": dest, "sha256": sha256, "size": size, "duplicate": False}
+
+
+async def save_upload(file: UploadFile, folder: str, kind: str) -> dict:
+    """Store an upload under `folder`. Returns {"path", "sha256", "size",
+    "duplicate"}; when "duplicate" is True, "path" is the existing file
+    with the same bytes and nothing new was written. Raises UploadTooLarge
+    over the kind's limit and ValueError for an unusable file name."""
+    name = safe_filename(file.filename)
+    limit = max_bytes(kind)
+    if file.size is not None and file.size > limit:
+        raise UploadTooLarge(f"'{name}' is larger than the {limit // (1024 * 1024)} MB limit")
+    # One thread hop for the whole copy: the spooled upload is read (and
+    # the destination written) synchronously off the event loop.
+    return await asyncio.to_thread(_store, file.file, folder, name, limit)
+
+
+# --- resumable uploads --------------------------------------------------------
+# init -> PUT chunk N (any order, retried freely) -> finalize. The admin
+# panel uses this for large files, so a Wi-Fi drop halfway through a 2 GB
+# video costs one chunk rather than the whole upload. Chunks go straight
+# to their offset in a sparse file preallocated to the final size, next to
+# the destination. Session state is a small JSON file in data/uploads/ so
+# an upload also survives a server restart.
+
+SESSION_DIR = "data/uploads"
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Sessions nobody has touched for this long are abandoned; their part
+# file is removed the next time a session is started.
+SESSION_TTL_S = 24 * 3600
+
+
+class UploadHashMismatch(ValueError):
+    """The assembled file's SHA-256 isn't the one the client declared."""
+
+
+def _ranges(chunks: list, chunk_size: int, size: int) -> list:
+    """Received chunk indices as merged [start, end) byte ranges."""
+    ranges = []
+    for i in sorted(chunks):
+        start, end = i * chunk_size, min((i + 1) * chunk_size, size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+class ResumableUploads:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    # --- state ---------------------------------------------------------
+
+    def _state_path(self, session_id: str) -> str:
+        if not session_id.isalnum():
+            raise LookupError("Unknown upload session")
+        return os.path.join(SESSION_DIR, session_id + ".json")
+
+    def _load(self, session_id: str) -> dict:
+        try:
+            with open(self._state_path(session_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise LookupError("Unknown upload session")
+
+    def _save(self, session: dict):
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        path = self._state_path(session["id"])
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        os.replace(path + ".tmp", path)
+
+    def _all(self) -> list:
+        try:
+            names = os.listdir(SESSION_DIR)
+        except OSError:
+            return []
+        sessions = []
+        for name in names:
+            if name.endswith(".json"):
+                try:
+                    sessions.append(self._load(name[:-5]))
+                except LookupError:
+                    pass
+        return sessions
+
+    def _remove(self, session: dict):
+        for path in (session["part"], self._state_path(session["id"])):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def status(self, session_id: str) -> dict:
+        """Public view of a session: what's been received, what's missing."""
+        session = self._load(session_id)
+        count = -(-session["size"] // session["chunk_size"]) or 1
+        received = set(session["chunks"])
+        return {
+            "id": session["id"],
+            "filename": session["name"],
+            "size": session["size"],
+            "chunk_size": session["chunk_size"],
+            "chunks": count,
+            "received": _ranges(session["chunks"], session["chunk_size"], session["size"]),
+            "missing": [i for i in range(count) if i not in received],
+        }
+
+    # --- protocol ------------------------------------------------------
+
+    def start(self, folder: str, filename: str, size: int, kind: str,
+              sha256: Optional[str] = None) -> dict:
+        """Open a session for `folder/filename`, or resume the unfinished
+        one for the same file (same folder, name, size and declared hash)."""
+        name = safe_filename(filename)
+        folder = os.path.normpath(folder)
+        limit = max_bytes(kind)
+        if size < 0:
+            raise ValueError("Invalid size")
+        if size > limit:
+            raise UploadTooLarge(f"'{name}' is larger than the {limit // (1024 * 1024)} MB limit")
+        sha256 = (sha256 or "").strip().lower() or None
+        with self._lock:
+            now = time.time()
+            for session in self._all():
+                if now - session["touched"] > SESSION_TTL_S:
+                    print(f"[uploads] dropping abandoned upload of {session['name']}")
+                    self._remove(session)
+                elif (session["folder"], session["name"], session["size"], session["sha256"]) == (
+                    folder, name, size, sha256
+                ):
+                    session["touched"] = now
+                    self._save(session)
+                    return self.status(session["id"])
+            session_id = uuid.uuid4().hex
+            os.makedirs(folder, exist_ok=True)
+            part = os.path.join(folder, f".upload-{session_id}.part")
+            with open(part, "wb") as f:
+                # Sparse: no blocks are allocated until chunks land.
+                f.truncate(size)
+            session = {
+                "id": session_id,
+                "folder": folder,
+                "name": name,
+                "kind": kind,
+                "size": size,
+                "sha256": sha256,
+                "chunk_size": UPLOAD_CHUNK_SIZE,
+                "part": part,
+                "chunks": [],
+                "touched": now,
+            }
+            self._save(session)
+        return self.status(session_id)
+
+    def _write_chunk(self, session_id: str, index: int, data: bytes) -> dict:
+        session = self._load(session_id)
+        chunk_size, size = session["chunk_size"], session["size"]
+        offset = index * chunk_size
+        if index < 0 or offset >= max(size, 1):
+            raise ValueError(f"Chunk {index} is out of range")
+        expected = min(chunk_size, size - offset)
+        if len(data) != expected:
+            raise ValueError(f"Chunk {index} must be {expected} bytes, got {len(data)}")
+        fd = os.open(session["part"], os.O_WRONLY)
+        try:
+            os.pwrite(fd, data, offset)
+        finally:
+            os.close(fd)
+        with self._lock:
+            # Re-read: other chunks of this session may have landed meanwhile.
+            session = self._load(session_id)
+            if index not in session["chunks"]:
+                session["chunks"].append(index)
+            session["touched"] = time.time()
+            self._save(session)
+        return self.status(session_id)
+
+    async def put_chunk(self, session_id: str, index: int, body) -> dict:
+        """Store chunk `index` from the async byte iterator `body` (the
+        request stream). Reads at most one chunk's worth."""
+        session = self._load(session_id)
+        limit = session["chunk_size"]
+        data = bytearray()
+        async for part in body:
+            data += part
+            if len(data) > limit:
+                raise ValueError(f"Chunk {index} is larger than the {limit} byte chunk size")
+        return await asyncio.to_thread(self._write_chunk, session_id, index, bytes(data))
+
+    def _finalize(self, session_id: str) -> dict:
+        session = self._load(session_id)
+        missing = self.status(session_id)["missing"]
+        if missing and session["size"]:
+            raise ValueError(f"Upload incomplete: {len(missing)} chunk(s) missing")
+        digest = hashlib.sha256()
+        with open(session["part"], "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        if session["sha256"] and sha256 != session["sha256"]:
+            # Can't tell which chunk is bad: start over.
+            with self._lock:
+                session["chunks"] = []
+                self._save(session)
+            raise UploadHashMismatch(
+                f"SHA-256 mismatch for '{session['name']}': got {sha256}; all chunks must be re-sent"
+            )
+        with open(session["part"], "rb+") as f:
+            os.fsync(f.fileno())
+        with self._lock:
+            os.remove(self._state_path(session_id))
+        stored = _place(session["part"], session["folder"], session["name"], sha256, session["size"])
+        return {**stored, "kind": session["kind"]}
+
+    async def finalize(self, session_id: str) -> dict:
+        """Verify and move the assembled file into place; same result as
+        `save_upload()` plus the session's "kind". Raises ValueError while chunks are missing and
+        UploadHashMismatch if the declared hash doesn't match."""
+        return await asyncio.to_thread(self._finalize, session_id)
+
+    def abort(self, session_id: str):
+        with self._lock:
+            self._remove(self._load(session_id))
+
+
+resumable_uploads = ResumableUploads()